@@ -0,0 +1,60 @@
+"""
+Shared bar loader for the MNQ tuning sweeps (tune_mnq.py and its tune_mnq_*.py wrappers).
+Parses data/mnq_1m.csv once and keeps a pickled snapshot of the raw parse next to the CSV; later
+runs load the snapshot while it is newer than the CSV. The column defaults / bar_idx / volume
+rescale run on every load, so a change to _prepare never sees stale snapshot bars.
+"""
+from __future__ import annotations
+
+import os
+import sys
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+
+def _prepare(df: pd.DataFrame) -> pd.DataFrame:
+    for col in ["open", "high", "low", "close"]:
+        if col not in df.columns:
+            print(f"Missing {col}")
+            sys.exit(1)
+    if "buy_volume" not in df.columns:
+        df["buy_volume"] = 50
+    if "sell_volume" not in df.columns:
+        df["sell_volume"] = 50
+    df["bar_idx"] = range(len(df))
+    bv = df["buy_volume"].to_numpy(dtype=np.float64, copy=True)
+    sv = df["sell_volume"].to_numpy(dtype=np.float64, copy=True)
+    total_vol = bv + sv
+    if np.nanmean(total_vol) > 500:
+        # Per-bar cap at ~120 contracts, done in place on the column buffers
+        total_vol[total_vol == 0] = 1.0
+        scale = np.divide(120.0, total_vol, out=total_vol)
+        np.minimum(scale, 1.0, out=scale)
+        for col, arr in (("buy_volume", bv), ("sell_volume", sv)):
+            np.multiply(arr, scale, out=arr)
+            np.maximum(arr, 1.0, out=arr)
+            df[col] = arr
+    return df
+
+
+def load_mnq_bars(csv_path: Path) -> pd.DataFrame:
+    """Prepared bars for csv_path, parsed from the .pkl snapshot when it is at least as new as the CSV."""
+    if not csv_path.exists():
+        print(f"Missing data/{csv_path.name}")
+        sys.exit(1)
+    snap = csv_path.with_suffix(".pkl")
+    try:
+        if snap.stat().st_mtime_ns >= csv_path.stat().st_mtime_ns:
+            return _prepare(pd.read_pickle(snap))
+    except Exception:  # no snapshot yet, or unreadable: rebuild it
+        pass
+    df = pd.read_csv(csv_path)
+    tmp = snap.with_suffix(".pkl.tmp")
+    try:
+        df.to_pickle(tmp)
+        os.replace(tmp, snap)
+    except OSError:
+        pass  # read-only data dir: just parse the CSV next time
+    return _prepare(df)
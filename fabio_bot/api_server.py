@@ -136,6 +136,7 @@ def api_info():
             "GET /api/account": "Balance, equity, margin",
             "GET /api/positions": "Open positions",
             "GET /api/history": "Trade history",
+            "GET /api/dashboard": "Account, positions and history in one call",
             "GET /api/tick": "Bid/ask/last",
             "POST /api/trade": "Place market order (body: side, quantity)",
             "POST /api/positions/{ticket}/close": "Close position",
@@ -194,12 +195,7 @@ def api_status():
     }
 
 
-@app.get("/api/account")
-def api_account():
-    c = get_client()
-    acc = c.get_account_info()
-    if not acc:
-        raise HTTPException(status_code=503, detail="No account info")
+def _account_to_dict(acc) -> dict:
     return {
         "login": acc.login,
         "balance": acc.balance,
@@ -212,10 +208,7 @@ def api_account():
     }
 
 
-@app.get("/api/positions")
-def api_positions():
-    c = get_client()
-    positions = c.get_positions()
+def _positions_to_list(positions) -> List[dict]:
     out = []
     for p in positions:
         out.append({
@@ -233,10 +226,7 @@ def api_positions():
     return out
 
 
-@app.get("/api/history")
-def api_history(days: int = 7):
-    c = get_client()
-    deals = c.get_deals_history(days=days)
+def _deals_to_list(deals) -> List[dict]:
     out = []
     for d in deals:
         try:
@@ -259,6 +249,40 @@ def api_history(days: int = 7):
     return out[:200]
 
 
+@app.get("/api/account")
+def api_account():
+    c = get_client()
+    acc = c.get_account_info()
+    if not acc:
+        raise HTTPException(status_code=503, detail="No account info")
+    return _account_to_dict(acc)
+
+
+@app.get("/api/positions")
+def api_positions():
+    return _positions_to_list(get_client().get_positions())
+
+
+@app.get("/api/history")
+def api_history(days: int = 7):
+    return _deals_to_list(get_client().get_deals_history(days=days))
+
+
+@app.get("/api/dashboard")
+def api_dashboard(days: int = 7):
+    """Account, positions and history in one call (broker requests run concurrently)."""
+    c = get_client()
+    if hasattr(c, "get_snapshot"):
+        acc, positions, deals = c.get_snapshot(days=days)
+    else:
+        acc, positions, deals = c.get_account_info(), c.get_positions(), c.get_deals_history(days=days)
+    return {
+        "account": _account_to_dict(acc) if acc else None,
+        "positions": _positions_to_list(positions),
+        "history": _deals_to_list(deals),
+    }
+
+
 @app.get("/api/bars")
 def api_bars(timeframe: str = "1m", count: int = 100):
     c = get_client()
@@ -11,7 +11,7 @@ import os
 import sys
 from dataclasses import dataclass, field
 from pathlib import Path
-from typing import List, Optional, Tuple
+from typing import Any, Dict, List, Optional, Tuple
 
 import numpy as np
 import pandas as pd
@@ -30,6 +30,8 @@ logger = logging.getLogger(__name__)
 PIPS_NQ = 0.25
 SIZE_MULT = 1.0
 TICK_VALUE_NQ = 5.0
+# The only bar columns prepare_bars / run_backtest read (date is optional)
+BACKTEST_COLUMNS = ["close", "buy_volume", "sell_volume", "bar_idx", "date"]
 
 
 @dataclass
@@ -136,6 +138,76 @@ def bars_to_tick_stream(df: pd.DataFrame, ticks_per_bar: int = 20) -> pd.DataFra
     return pd.DataFrame(rows)
 
 
+def _bar_tick_batch(
+    price_level: int, buy_vol: float, sell_vol: float, size_mult: float
+) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """Synthetic ticks for one bar as (price_levels, size_levels, is_bid) arrays.
+    Buys then sells, ~5 contracts each; when side volume is large, one tick is big
+    (35, above the typical 30 threshold) so the big-trade cluster can form."""
+    small = int(5 * size_mult)
+    big = int(35 * size_mult)
+    sizes: List[int] = []
+    n_bid = 0
+    for vol in (buy_vol, sell_vol):
+        n = max(1, int(vol / 5))
+        if vol >= 45 and n >= 2:
+            sizes.append(big)
+            sizes.extend([small] * (n - 2))
+        else:
+            sizes.extend([small] * n)
+        if not n_bid:
+            n_bid = len(sizes)
+    is_bid = np.zeros(len(sizes), dtype=bool)
+    is_bid[:n_bid] = True
+    return np.full(len(sizes), price_level, dtype=np.int64), np.array(sizes, dtype=np.int64), is_bid
+
+
+def synthetic_bar_deltas(df_bars: pd.DataFrame, size_mult: float = SIZE_MULT) -> np.ndarray:
+    """Per-bar delta the backtest analyzer sees from _bar_tick_batch, for all bars at once."""
+    small = int(5 * size_mult) / size_mult
+    big = int(35 * size_mult) / size_mult
+
+    def side(vol: np.ndarray) -> np.ndarray:
+        n = np.maximum(1, (vol / 5).astype(np.int64))
+        has_big = (vol >= 45) & (n >= 2)
+        return np.where(has_big, big + small * (n - 2), small * n)
+
+    buy = df_bars["buy_volume"].to_numpy(np.float64) if "buy_volume" in df_bars else np.full(len(df_bars), 50.0)
+    sell = df_bars["sell_volume"].to_numpy(np.float64) if "sell_volume" in df_bars else np.full(len(df_bars), 50.0)
+    return side(buy) - side(sell)
+
+
+def prepare_bars(df_bars: pd.DataFrame, size_mult: float = SIZE_MULT) -> Dict[str, Any]:
+    """Parameter-independent per-bar inputs for run_backtest: closes, bar indices, day-reset
+    flags and the synthetic tick batches. Build once and pass as run_backtest(prepared=...)
+    when scoring many parameter sets over the same bars."""
+    n = len(df_bars)
+    labels = df_bars.index.tolist()
+    closes = df_bars["close"].to_numpy(np.float64).tolist()
+    if "bar_idx" in df_bars.columns:
+        bar_idxs = [int(b) for b in df_bars["bar_idx"].tolist()]
+    else:
+        bar_idxs = [int(i) for i in labels]
+    buys = df_bars["buy_volume"].tolist() if "buy_volume" in df_bars.columns else [50] * n
+    sells = df_bars["sell_volume"].tolist() if "sell_volume" in df_bars.columns else [50] * n
+    pips = PIPS_NQ
+    ticks = [_bar_tick_batch(int(c / pips), bv, sv, size_mult) for c, bv, sv in zip(closes, buys, sells)]
+    # Real data with a date column resets risk on date change (from the second bar on);
+    # other bars fall back to the fixed reset interval.
+    date_gate = [False] * n
+    new_day = [False] * n
+    if "date" in df_bars.columns:
+        dates = df_bars["date"].tolist()
+        for k in range(1, n):
+            if bar_idxs[k] > 0 and labels[k] > 0:
+                date_gate[k] = True
+                new_day[k] = dates[k] != dates[k - 1]
+    return {
+        "close": closes, "bar_idx": bar_idxs, "ticks": ticks,
+        "date_gate": date_gate, "new_day": new_day,
+    }
+
+
 def run_backtest(
     df_bars: pd.DataFrame,
     initial_balance: float = 100_000.0,
@@ -155,19 +227,44 @@ def run_backtest(
     session_start_bar: int = 0,
     session_end_bar: int = 0,
     trend_ma_bars: int = 0,
+    prepared: Optional[Dict[str, Any]] = None,
 ) -> BacktestResult:
     """Run backtest over bar data by simulating ticks and signal logic.
     Optional: session_bars_per_day/start/end for RTH filter (1m: 1440, 570, 960);
     trend_ma_bars > 0: only long when close > MA(close), only short when close < MA.
+    prepared: prepare_bars(df_bars), to reuse across runs over the same bars; trend MA and
+    session masks are cached on it per filter setting.
     """
     pips = PIPS_NQ
     size_mult = SIZE_MULT
     if tick_value is None:
         tick_value = TICK_VALUE_NQ
-    df_bars = df_bars.copy()
+    if prepared is None:
+        prepared = prepare_bars(df_bars, size_mult)
+    closes = prepared["close"]
+    bar_idxs = prepared["bar_idx"]
+    ticks = prepared["ticks"]
+    date_gate = prepared["date_gate"]
+    new_day = prepared["new_day"]
+    # Filter arrays depend only on the bars and the filter settings, so they are memoized on
+    # prepared: a sweep reusing it builds each MA window / session window once.
+    trend_ma = None
     if trend_ma_bars > 0:
-        df_bars["_trend_ma"] = df_bars["close"].rolling(int(trend_ma_bars), min_periods=1).mean()
+        ma_cache = prepared.setdefault("trend_ma", {})
+        trend_ma = ma_cache.get(int(trend_ma_bars))
+        if trend_ma is None:
+            trend_ma = df_bars["close"].rolling(int(trend_ma_bars), min_periods=1).mean().tolist()
+            ma_cache[int(trend_ma_bars)] = trend_ma
     use_session = session_bars_per_day > 0 and session_end_bar > session_start_bar
+    in_session = None
+    if use_session:
+        session_key = (session_bars_per_day, session_start_bar, session_end_bar)
+        session_cache = prepared.setdefault("in_session", {})
+        in_session = session_cache.get(session_key)
+        if in_session is None:
+            bar_in_day = np.asarray(bar_idxs, dtype=np.int64) % session_bars_per_day
+            in_session = ((bar_in_day >= session_start_bar) & (bar_in_day <= session_end_bar)).tolist()
+            session_cache[session_key] = in_session
     analyzer = OrderFlowAnalyzer(
         pips=pips,
         size_multiplier=size_mult,
@@ -213,45 +310,23 @@ def run_backtest(
     last_reset_bar = 0
     reset_interval_bars = 400  # ~1 session for 1m bars
 
-    for i, row in df_bars.iterrows():
-        bar_idx = int(row.get("bar_idx", i))
+    for k in range(len(closes)):
+        bar_idx = bar_idxs[k]
         # New "day" reset: clear consecutive losses / daily counts only (keep session_equity = initial so 3% DD cap applies to full run)
-        if "date" in df_bars.columns and bar_idx > 0 and i > 0:
-            bar_date = row.get("date")
-            prev_date = df_bars.iloc[i - 1].get("date")
-            if bar_date != prev_date:
+        if date_gate[k]:
+            if new_day[k]:
                 risk_mgr.reset_daily()
         elif bar_idx - last_reset_bar >= reset_interval_bars:
             risk_mgr.reset_daily()
             last_reset_bar = bar_idx
-        o, h, l, c = row["open"], row["high"], row["low"], row["close"]
-        buy_vol = row.get("buy_volume", 50)
-        sell_vol = row.get("sell_volume", 50)
-        # Simulate ticks within bar for CVD; inject occasional big ticks (30+ contracts) so signals can trigger
-        price_level = int(c / pips)
-        big_size = 35  # above typical 30 threshold
-        n_buy = max(1, int(buy_vol / 5))
-        n_sell = max(1, int(sell_vol / 5))
-        # When volume is large, make one tick "big" so big_trade cluster can form
-        if buy_vol >= 45 and n_buy >= 2:
-            analyzer.on_trade(price_level, int(big_size * size_mult), True)
-            for _ in range(n_buy - 2):
-                analyzer.on_trade(price_level, int(5 * size_mult), True)
-        else:
-            for _ in range(n_buy):
-                analyzer.on_trade(price_level, int(5 * size_mult), True)
-        if sell_vol >= 45 and n_sell >= 2:
-            analyzer.on_trade(price_level, int(big_size * size_mult), False)
-            for _ in range(n_sell - 2):
-                analyzer.on_trade(price_level, int(5 * size_mult), False)
-        else:
-            for _ in range(n_sell):
-                analyzer.on_trade(price_level, int(5 * size_mult), False)
+        c = closes[k]
+        # Simulated ticks within bar for CVD, with occasional big ticks (30+ contracts) so signals can trigger
+        analyzer.on_trades_batch(*ticks[k])
         # New bar
         bar = analyzer.start_new_bar()
         if bar is None:
             continue
-        profile = analyzer.build_volume_profile()
+        profile = analyzer.get_profile_cached()
         last_price = c
         sig = signal_gen.generate(analyzer, profile, last_price, atr, pips)
 
@@ -325,13 +400,11 @@ def run_backtest(
             continue
 
         # Optional: only take new trades in session window (e.g. US RTH) and with trend
-        if use_session:
-            bar_in_day = bar_idx % session_bars_per_day
-            if bar_in_day < session_start_bar or bar_in_day > session_end_bar:
-                equity_curve.append(balance)
-                continue
+        if use_session and not in_session[k]:
+            equity_curve.append(balance)
+            continue
         if trend_ma_bars > 0 and sig.signal != Signal.NONE:
-            ma = row.get("_trend_ma", c)
+            ma = trend_ma[k]
             if sig.signal == Signal.LONG and c <= ma:
                 equity_curve.append(balance)
                 continue
@@ -339,7 +412,13 @@ def run_backtest(
                 equity_curve.append(balance)
                 continue
 
-        can_trade, _ = risk_mgr.can_trade(balance)
+        can_trade, why = risk_mgr.can_trade(balance)
+        if why in ("daily_drawdown_limit", "paused_daily_drawdown"):
+            # Flat and past the drawdown cap from peak: balance can no longer move, and
+            # reset_daily() re-pauses on the same check, so no later bar can trade. Skip the
+            # rest of the replay; the equity curve stays flat exactly as the full loop leaves it.
+            equity_curve.extend([balance] * (len(closes) - k))
+            break
         if not can_trade or sig.signal == Signal.NONE or sig.strength < min_signal_strength:
             equity_curve.append(balance)
             continue
@@ -437,28 +516,11 @@ def get_latest_signal(
         o, h, l, c = row["open"], row["high"], row["low"], row["close"]
         buy_vol = row.get("buy_volume", 50)
         sell_vol = row.get("sell_volume", 50)
-        price_level = int(c / pips)
-        big_size = 35
-        n_buy = max(1, int(buy_vol / 5))
-        n_sell = max(1, int(sell_vol / 5))
-        if buy_vol >= 45 and n_buy >= 2:
-            analyzer.on_trade(price_level, int(big_size * size_mult), True)
-            for _ in range(n_buy - 2):
-                analyzer.on_trade(price_level, int(5 * size_mult), True)
-        else:
-            for _ in range(n_buy):
-                analyzer.on_trade(price_level, int(5 * size_mult), True)
-        if sell_vol >= 45 and n_sell >= 2:
-            analyzer.on_trade(price_level, int(big_size * size_mult), False)
-            for _ in range(n_sell - 2):
-                analyzer.on_trade(price_level, int(5 * size_mult), False)
-        else:
-            for _ in range(n_sell):
-                analyzer.on_trade(price_level, int(5 * size_mult), False)
+        analyzer.on_trades_batch(*_bar_tick_batch(int(c / pips), buy_vol, sell_vol, size_mult))
         bar = analyzer.start_new_bar()
         if bar is None:
             continue
-        profile = analyzer.build_volume_profile()
+        profile = analyzer.get_profile_cached()
         last_price = c
         sig_result = signal_gen.generate(analyzer, profile, last_price, atr, pips)
         last_sig = sig_result.signal
@@ -85,6 +85,11 @@ class DemoClient:
     def get_deals_history(self, days: int = 7, symbol: Optional[str] = None) -> List[_DemoDeal]:
         return []
 
+    def get_snapshot(
+        self, days: int = 7, symbol: Optional[str] = None
+    ) -> Tuple[_DemoAccountInfo, List[_DemoPosition], List[_DemoDeal]]:
+        return self.get_account_info(), self.get_positions(symbol), self.get_deals_history(days, symbol)
+
     def get_bars(
         self,
         timeframe: str = "1m",
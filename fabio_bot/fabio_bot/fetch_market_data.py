@@ -6,15 +6,28 @@ from __future__ import annotations
 
 import logging
 import time
+from datetime import datetime
 from pathlib import Path
 from typing import Optional
 
 import numpy as np
 import pandas as pd
 
+try:
+    from ciso8601 import parse_datetime as _parse_iso
+except ImportError:
+    _parse_iso = None
+
 logger = logging.getLogger(__name__)
 
 
+def _iso_to_epoch(ts: str) -> int:
+    """Epoch seconds from an ISO-8601 string (C parser when ciso8601 is installed)."""
+    if _parse_iso is not None:
+        return int(_parse_iso(ts).timestamp())
+    return int(datetime.fromisoformat(ts.replace("Z", "+00:00")).timestamp())
+
+
 def fetch_nq_yahoo_chart_api(
     symbol: str = "NQ=F",
     interval: str = "1d",
@@ -31,7 +44,6 @@ def fetch_nq_yahoo_chart_api(
         return pd.DataFrame()
     if start and end:
         try:
-            from datetime import datetime
             t1 = int(datetime.strptime(start, "%Y-%m-%d").timestamp())
             t2 = int(datetime.strptime(end, "%Y-%m-%d").timestamp())
         except Exception:
@@ -335,7 +347,7 @@ def fetch_alpaca_1m(
     import urllib.request
     import urllib.error
     import json as _json
-    from datetime import datetime, timezone, timedelta
+    from datetime import timezone, timedelta
 
     key_id = (key_id or "").strip() or __import__("os").environ.get("ALPACA_KEY_ID", "").strip()
     secret_key = (secret_key or "").strip() or __import__("os").environ.get("ALPACA_SECRET_KEY", "").strip()
@@ -424,8 +436,7 @@ def fetch_alpaca_1m(
         if not t_str:
             continue
         try:
-            dt = datetime.fromisoformat(t_str.replace("Z", "+00:00"))
-            minute_id = int(dt.timestamp()) // 60
+            minute_id = _iso_to_epoch(t_str) // 60
         except Exception:
             continue
         minute_ohlc[minute_id] = {
@@ -443,8 +454,7 @@ def fetch_alpaca_1m(
         if not t_str:
             continue
         try:
-            dt = datetime.fromisoformat(t_str.replace("Z", "+00:00"))
-            minute_id = int(dt.timestamp()) // 60
+            minute_id = _iso_to_epoch(t_str) // 60
         except Exception:
             continue
         if minute_id not in minute_ohlc:
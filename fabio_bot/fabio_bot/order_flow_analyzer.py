@@ -5,9 +5,11 @@ Designed for use with Bookmap trade/depth/MBO handlers and for backtest tick str
 from __future__ import annotations
 
 import logging
-from collections import deque
+from collections import defaultdict, deque
 from dataclasses import dataclass, field
-from typing import Any, Deque, Dict, List, Optional, Tuple
+from typing import Any, DefaultDict, Deque, Dict, List, Optional, Tuple
+
+import numpy as np
 
 logger = logging.getLogger(__name__)
 
@@ -37,6 +39,22 @@ class BarSnapshot:
     big_sells: int
 
 
+# Row layout of the rolling bar buffer; field order matches BarSnapshot
+BAR_DTYPE = np.dtype([
+    ("open", "f8"),
+    ("high", "f8"),
+    ("low", "f8"),
+    ("close", "f8"),
+    ("buy_volume", "f8"),
+    ("sell_volume", "f8"),
+    ("delta", "f8"),
+    ("total_volume", "f8"),
+    ("trade_count", "i4"),
+    ("big_buys", "i4"),
+    ("big_sells", "i4"),
+])
+
+
 @dataclass
 class VolumeProfileResult:
     """Session volume profile output."""
@@ -63,6 +81,25 @@ class AbsorptionState:
     absorption_bearish: bool = False  # Buys absorbed
 
 
+def _value_area_bounds(vols: np.ndarray, idx_poc: int, target_vol: float) -> Tuple[int, int]:
+    """
+    (lo, hi) indices of the value area: starting at the POC, repeatedly add the larger of the
+    next level below / above (ties go below) until target_vol is reached or levels run out.
+    That greedy walk is a merge of the two outward sequences, which orders levels exactly
+    like a stable descending sort on each side's running minimum, so it runs as one argsort
+    and a cumsum (sequential, so the stopping point matches the scalar loop bit for bit).
+    """
+    below = vols[idx_poc - 1::-1] if idx_poc > 0 else vols[:0]
+    above = vols[idx_poc + 1:]
+    keys = np.concatenate((np.minimum.accumulate(below), np.minimum.accumulate(above)))
+    order = np.argsort(-keys, kind="stable")
+    cum = np.cumsum(np.concatenate((vols[idx_poc:idx_poc + 1], np.concatenate((below, above))[order])))
+    reached = cum >= target_vol
+    steps = int(np.argmax(reached)) if reached.any() else len(order)
+    n_below = int(np.count_nonzero(order[:steps] < len(below)))
+    return idx_poc - n_below, idx_poc + steps - n_below
+
+
 class OrderFlowAnalyzer:
     """
     Real-time order flow state: CVD, big trades, absorption, volume profile.
@@ -80,6 +117,7 @@ class OrderFlowAnalyzer:
     ):
         self.pips = pips
         self.size_multiplier = size_multiplier
+        self._inv_size_mult = 1.0 / size_multiplier
         self.big_trade_threshold = big_trade_threshold
         self.absorption_ticks = absorption_ticks
         self.value_area_pct = value_area_pct
@@ -102,12 +140,18 @@ class OrderFlowAnalyzer:
         self._bar_big_sells = 0
         self._bar_trades = 0
 
-        # Rolling bars for volume profile
-        self._bars: Deque[BarSnapshot] = deque(maxlen=profile_rolling_bars)
+        # Rolling bars for volume profile: ring buffer written twice (row i and i + N)
+        # so the last n bars are always a contiguous view, no copy or reorder needed
+        self._bars_arr = np.zeros(2 * profile_rolling_bars, dtype=BAR_DTYPE)
+        self._bars_head = 0  # total bars committed since reset
 
         # Trades at price for profile (price -> volume)
-        self._volume_at_price: Dict[float, float] = {}
+        self._volume_at_price: DefaultDict[float, float] = defaultdict(float)
         self._price_level_multiplier = 1.0  # round price to levels if needed
+        # Profile cache: rebuilt only after new trades; price ladder re-sorted only when levels are added
+        self._profile_dirty = True
+        self._profile_cache: Optional[VolumeProfileResult] = None
+        self._price_order: np.ndarray = np.empty(0, dtype=np.intp)  # insertion index -> price rank
 
         # Absorption
         self._absorption = AbsorptionState()
@@ -123,7 +167,7 @@ class OrderFlowAnalyzer:
         return price_level * self.pips
 
     def _to_size(self, size_level: int) -> float:
-        return size_level / self.size_multiplier
+        return size_level * self._inv_size_mult
 
     def on_trade(
         self,
@@ -132,8 +176,9 @@ class OrderFlowAnalyzer:
         is_bid: bool,
     ) -> None:
         """Call from Bookmap trade handler. Updates CVD, bar, big trades, profile."""
-        price = self._to_price(price_level)
-        size = self._to_size(size_level)
+        # Inlined _to_price/_to_size: this runs once per trade
+        price = price_level * self.pips
+        size = size_level * self._inv_size_mult
 
         # CVD
         if is_bid:
@@ -144,9 +189,11 @@ class OrderFlowAnalyzer:
 
         # Bar
         if self._bar_open == 0.0:
-            self._bar_open = price
-        self._bar_high = max(self._bar_high, price) if self._bar_high else price
-        self._bar_low = min(self._bar_low, price) if self._bar_low != float("inf") else price
+            self._bar_open = self._bar_high = self._bar_low = price
+        if price > self._bar_high:
+            self._bar_high = price
+        elif price < self._bar_low:
+            self._bar_low = price
         self._bar_close = price
         if is_bid:
             self._bar_buy_vol += size
@@ -162,7 +209,8 @@ class OrderFlowAnalyzer:
 
         # Volume at price (for profile)
         p = round(price / self.pips) * self.pips
-        self._volume_at_price[p] = self._volume_at_price.get(p, 0) + size
+        self._volume_at_price[p] += size
+        self._profile_dirty = True
 
         # Absorption: same price level with lots of size
         if self._absorption.last_price == 0:
@@ -187,24 +235,120 @@ class OrderFlowAnalyzer:
             and self._absorption.accumulated_bid_vol > self._absorption.accumulated_ask_vol * 1.5
         )
 
+    def on_trades_batch(
+        self,
+        price_levels: np.ndarray,
+        size_levels: np.ndarray,
+        is_bid: np.ndarray,
+    ) -> None:
+        """
+        Apply a run of trades (all within the current bar) in one call.
+        Same end state as calling on_trade for each element in order; meant for
+        backtest replays where ticks are known up front.
+        """
+        n = len(price_levels)
+        if n == 0:
+            return
+        prices = np.asarray(price_levels, dtype=np.float64) * self.pips
+        sizes = np.asarray(size_levels, dtype=np.float64) * self._inv_size_mult
+        bid = np.asarray(is_bid, dtype=bool)
+        ask = ~bid
+        buy_vol = float(sizes[bid].sum())
+        sell_vol = float(sizes[ask].sum())
+
+        # CVD
+        self._buy_volume += buy_vol
+        self._sell_volume += sell_vol
+        self._cvd = self._buy_volume - self._sell_volume
+
+        # Bar
+        p_hi = float(prices.max())
+        p_lo = float(prices.min())
+        if self._bar_open == 0.0:
+            self._bar_open = self._bar_high = self._bar_low = float(prices[0])
+        self._bar_high = max(self._bar_high, p_hi)
+        self._bar_low = min(self._bar_low, p_lo)
+        self._bar_close = float(prices[-1])
+        self._bar_buy_vol += buy_vol
+        self._bar_sell_vol += sell_vol
+        big = sizes >= self.big_trade_threshold
+        if big.any():
+            self._bar_big_buys += int(np.count_nonzero(big & bid))
+            self._bar_big_sells += int(np.count_nonzero(big & ask))
+            self._recent_big_trades.extend(
+                zip(prices[big].tolist(), sizes[big].tolist(), bid[big].tolist())
+            )
+        self._bar_trades += n
+
+        # Volume at price (for profile)
+        vap = self._volume_at_price
+        if p_hi == p_lo:
+            vap[round(p_lo / self.pips) * self.pips] += buy_vol + sell_vol
+        else:
+            levels, first, inverse = np.unique(
+                np.round(prices / self.pips) * self.pips, return_index=True, return_inverse=True
+            )
+            vols = np.bincount(inverse, weights=sizes)
+            # New levels enter vap in first-traded order, as on_trade adds them: the profile's
+            # POC/HVN/LVN/value-area tie-breaks follow insertion order
+            order = np.argsort(first)
+            for p, v in zip(levels[order].tolist(), vols[order].tolist()):
+                vap[p] += v
+        self._profile_dirty = True
+
+        # Absorption: bulk update when the whole run stays inside the band, else replay in order
+        ab = self._absorption
+        if ab.last_price == 0:
+            ab.last_price = float(prices[0])
+        band = self.absorption_ticks * self.pips
+        if p_hi - ab.last_price <= band and ab.last_price - p_lo <= band:
+            ab.unchanged_ticks += n
+            ab.accumulated_bid_vol += buy_vol
+            ab.accumulated_ask_vol += sell_vol
+        else:
+            for price, size, b in zip(prices.tolist(), sizes.tolist(), bid.tolist()):
+                if abs(price - ab.last_price) <= band:
+                    ab.unchanged_ticks += 1
+                    if b:
+                        ab.accumulated_bid_vol += size
+                    else:
+                        ab.accumulated_ask_vol += size
+                else:
+                    ab.unchanged_ticks = 0
+                    ab.accumulated_bid_vol = size if b else 0
+                    ab.accumulated_ask_vol = size if not b else 0
+                    ab.last_price = price
+        ab.absorption_bullish = (
+            ab.unchanged_ticks >= self.absorption_ticks
+            and ab.accumulated_ask_vol > ab.accumulated_bid_vol * 1.5
+        )
+        ab.absorption_bearish = (
+            ab.unchanged_ticks >= self.absorption_ticks
+            and ab.accumulated_bid_vol > ab.accumulated_ask_vol * 1.5
+        )
+
     def start_new_bar(self) -> Optional[BarSnapshot]:
         """Call on interval (e.g. every 15s). Commits current bar and returns it."""
         if self._bar_open == 0.0:
             return None
-        snap = BarSnapshot(
-            open=self._bar_open,
-            high=self._bar_high,
-            low=self._bar_low,
-            close=self._bar_close,
-            buy_volume=self._bar_buy_vol,
-            sell_volume=self._bar_sell_vol,
-            delta=self._bar_buy_vol - self._bar_sell_vol,
-            total_volume=self._bar_buy_vol + self._bar_sell_vol,
-            trade_count=self._bar_trades,
-            big_buys=self._bar_big_buys,
-            big_sells=self._bar_big_sells,
+        row = (
+            self._bar_open,
+            self._bar_high,
+            self._bar_low,
+            self._bar_close,
+            self._bar_buy_vol,
+            self._bar_sell_vol,
+            self._bar_buy_vol - self._bar_sell_vol,
+            self._bar_buy_vol + self._bar_sell_vol,
+            self._bar_trades,
+            self._bar_big_buys,
+            self._bar_big_sells,
         )
-        self._bars.append(snap)
+        slot = self._bars_head % self.profile_rolling_bars
+        self._bars_arr[slot] = row
+        self._bars_arr[slot + self.profile_rolling_bars] = row
+        self._bars_head += 1
+        snap = BarSnapshot(*row)
         self._current_bar = snap
         # Reset bar
         self._bar_open = self._bar_close
@@ -226,8 +370,19 @@ class OrderFlowAnalyzer:
     def get_current_bar(self) -> Optional[BarSnapshot]:
         return self._current_bar
 
+    def get_recent_bar_array(self, n: int = 20) -> np.ndarray:
+        """Last n committed bars (oldest first) as a read-only view of BAR_DTYPE rows."""
+        size = self.profile_rolling_bars
+        n = min(n, self._bars_head, size)
+        if n <= 0:
+            return self._bars_arr[:0]
+        end = (self._bars_head - 1) % size + size + 1
+        view = self._bars_arr[end - n:end]
+        view.flags.writeable = False
+        return view
+
     def get_recent_bars(self, n: int = 20) -> List[BarSnapshot]:
-        return list(self._bars)[-n:]
+        return [BarSnapshot(*row) for row in self.get_recent_bar_array(n).tolist()]
 
     def get_big_trade_cluster(self, lookback: int = 30) -> Tuple[int, int]:
         """Count big buys and big sells in recent trades."""
@@ -239,6 +394,13 @@ class OrderFlowAnalyzer:
     def get_absorption(self) -> AbsorptionState:
         return self._absorption
 
+    def get_profile_cached(self) -> VolumeProfileResult:
+        """Last built profile, rebuilt only if trades arrived since."""
+        if self._profile_dirty or self._profile_cache is None:
+            self._profile_cache = self.build_volume_profile()
+            self._profile_dirty = False
+        return self._profile_cache
+
     def build_volume_profile(self) -> VolumeProfileResult:
         """Build profile from current volume_at_price (session or rolling)."""
         if not self._volume_at_price:
@@ -253,33 +415,25 @@ class OrderFlowAnalyzer:
                 poc=0.0, vah=0.0, val=0.0, total_volume=0.0, value_pct=self.value_area_pct,
                 by_price=by_price, hvn_prices=[], lvn_prices=[],
             )
-        poc_price = max(by_price, key=by_price.get)
+        # Work on insertion-ordered arrays: argmax / stable argsort pick the same first-seen
+        # level on ties as max() and the heap selections over the dict did.
+        n = len(by_price)
+        prices = list(by_price)
+        vols = np.fromiter(by_price.values(), dtype=np.float64, count=n)
+        i_poc = int(np.argmax(vols))
+        poc_price = prices[i_poc]
         # Value area: 70% of volume around POC (expand from POC until we have value_pct of volume)
-        sorted_prices = sorted(by_price.keys())
-        target_vol = total * self.value_area_pct
-        idx_poc = sorted_prices.index(poc_price)
-        vol_so_far = by_price[poc_price]
-        lo, hi = idx_poc, idx_poc
-        while vol_so_far < target_vol and (lo > 0 or hi < len(sorted_prices) - 1):
-            add_lo = by_price[sorted_prices[lo - 1]] if lo > 0 else 0
-            add_hi = by_price[sorted_prices[hi + 1]] if hi < len(sorted_prices) - 1 else 0
-            if add_lo >= add_hi and lo > 0:
-                lo -= 1
-                vol_so_far += add_lo
-            elif hi < len(sorted_prices) - 1:
-                hi += 1
-                vol_so_far += add_hi
-            elif lo > 0:
-                lo -= 1
-                vol_so_far += add_lo
-            else:
-                break
-        val = sorted_prices[lo]
-        vah = sorted_prices[hi]
-        # HVN: top 5 price levels by volume; LVN: bottom 5
-        by_vol = sorted(by_price.items(), key=lambda x: -x[1])
-        hvn_prices = [p for p, _ in by_vol[:5]]
-        lvn_prices = [p for p, _ in by_vol[-5:] if by_price[p] > 0]
+        if len(self._price_order) != n:  # levels are only ever appended between resets
+            self._price_order = np.argsort(np.fromiter(prices, dtype=np.float64, count=n), kind="stable")
+        order = self._price_order
+        idx_poc = int(np.flatnonzero(order == i_poc)[0])
+        lo, hi = _value_area_bounds(vols[order], idx_poc, total * self.value_area_pct)
+        val = prices[order[lo]]
+        vah = prices[order[hi]]
+        # HVN: top 5 price levels by volume; LVN: bottom 5 (head / tail of one stable sort)
+        by_vol = np.argsort(-vols, kind="stable")
+        hvn_prices = [prices[i] for i in by_vol[:5].tolist()]
+        lvn_prices = [prices[i] for i in by_vol[-5:].tolist() if vols[i] > 0]
         return VolumeProfileResult(
             poc=poc_price,
             vah=vah,
@@ -297,8 +451,11 @@ class OrderFlowAnalyzer:
         self._sell_volume = 0.0
         self._cvd = 0.0
         self._volume_at_price.clear()
+        self._price_order = np.empty(0, dtype=np.intp)
+        self._profile_cache = None
+        self._profile_dirty = True
         self._recent_big_trades.clear()
-        self._bars.clear()
+        self._bars_head = 0
         self._current_bar = None
         self._bar_open = 0.0
         self._bar_high = 0.0
@@ -310,19 +467,29 @@ class OrderFlowAnalyzer:
         self._bar_big_sells = 0
         self._bar_trades = 0
 
-    def is_near_lvn(self, price: float, profile: VolumeProfileResult, ticks: int = 10) -> bool:
-        """True if price is within ticks of a low-volume node."""
+    def is_near_lvn(
+        self, price: float, profile: VolumeProfileResult, ticks: int = 10, dist: Optional[float] = None
+    ) -> bool:
+        """True if price is within ticks of a low-volume node; dist (price units) overrides ticks when precomputed."""
         if not profile.lvn_prices:
             return False
-        pip = self.pips
-        return any(abs(price - p) <= ticks * pip for p in profile.lvn_prices)
-
-    def is_near_hvn(self, price: float, profile: VolumeProfileResult, ticks: int = 10) -> bool:
-        """True if price is within ticks of POC or HVN."""
+        if dist is None:
+            dist = ticks * self.pips
+        return any(abs(price - p) <= dist for p in profile.lvn_prices)
+
+    def is_near_hvn(
+        self, price: float, profile: VolumeProfileResult, ticks: int = 10, dist: Optional[float] = None
+    ) -> bool:
+        """True if price is within ticks of POC or HVN; dist (price units) overrides ticks when precomputed."""
         if not profile.hvn_prices:
             return False
-        pip = self.pips
-        return any(abs(price - p) <= ticks * pip for p in profile.hvn_prices) or abs(price - profile.poc) <= ticks * pip
-
-    def is_near_poc(self, price: float, profile: VolumeProfileResult, ticks: int = 15) -> bool:
-        return abs(price - profile.poc) <= ticks * self.pips
+        if dist is None:
+            dist = ticks * self.pips
+        return any(abs(price - p) <= dist for p in profile.hvn_prices) or abs(price - profile.poc) <= dist
+
+    def is_near_poc(
+        self, price: float, profile: VolumeProfileResult, ticks: int = 15, dist: Optional[float] = None
+    ) -> bool:
+        if dist is None:
+            dist = ticks * self.pips
+        return abs(price - profile.poc) <= dist
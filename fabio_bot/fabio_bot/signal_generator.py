@@ -6,9 +6,11 @@ from __future__ import annotations
 
 import logging
 from dataclasses import dataclass
-from enum import Enum
+from enum import IntEnum
 from typing import Optional, TYPE_CHECKING
 
+import numpy as np
+
 if TYPE_CHECKING:
     from .order_flow_analyzer import (
         BarSnapshot,
@@ -20,12 +22,12 @@ if TYPE_CHECKING:
 logger = logging.getLogger(__name__)
 
 
-class MarketState(Enum):
-    BALANCED = "balanced"   # Range / mean-reversion
-    UNBALANCED = "unbalanced"  # Trend / continuation
+class MarketState(IntEnum):
+    BALANCED = 0   # Range / mean-reversion
+    UNBALANCED = 1  # Trend / continuation
 
 
-class Signal(Enum):
+class Signal(IntEnum):
     NONE = 0
     LONG = 1
     SHORT = -1
@@ -80,6 +82,17 @@ class SignalGenerator:
         self.atr_stop_multiplier = atr_stop_multiplier
         self.rr_first = rr_first
         self.rr_second = rr_second
+        self._pips = 0.0
+        self._atr_scale = 0.0
+        self._lvn_dist = self._hvn_dist = self._poc_dist = 0.0
+
+    def on_pips_change(self, pips: float) -> None:
+        """Cache pip-scaled thresholds so generate() does no per-call divides."""
+        self._pips = pips
+        self._atr_scale = self.atr_stop_multiplier / pips
+        self._lvn_dist = self.lvn_ticks * pips
+        self._hvn_dist = self.hvn_ticks * pips
+        self._poc_dist = self.poc_ticks * pips
 
     def classify_market_state(
         self,
@@ -90,12 +103,12 @@ class SignalGenerator:
         """Balanced if price oscillating around POC; unbalanced if breaking LVN with volume."""
         if not profile.by_price or profile.total_volume == 0:
             return MarketState.BALANCED
-        bars = analyzer.get_recent_bars(20)
-        if len(bars) < 10:
+        closes = analyzer.get_recent_bar_array(20)["close"]
+        if len(closes) < 10:
             return MarketState.BALANCED
         # Simple rule: if price mostly inside value area -> balanced
-        inside = sum(1 for b in bars if profile.val <= b.close <= profile.vah)
-        if inside >= len(bars) * 0.6:
+        inside = int(np.count_nonzero((closes >= profile.val) & (closes <= profile.vah)))
+        if inside >= len(closes) * 0.6:
             return MarketState.BALANCED
         return MarketState.UNBALANCED
 
@@ -110,27 +123,29 @@ class SignalGenerator:
         """
         Scan for long/short. Returns SignalResult with NONE if no setup.
         """
-        bars = analyzer.get_recent_bars(10)
-        if not bars:
+        bars = analyzer.get_recent_bar_array(10)
+        if not len(bars):
             return SignalResult(Signal.NONE, "no_bars", 0.0, 0, 0, 0)
 
-        bar = bars[-1]
+        bars_tv = bars["total_volume"]
         cvd = analyzer.get_cvd()
-        bar_delta = bar.delta
+        bar_delta = float(bars["delta"][-1])
         big_buys, big_sells = analyzer.get_big_trade_cluster(30)
         absorption = analyzer.get_absorption()
 
         # Effective thresholds (stricter min_d for higher-quality signals)
         min_d = self.min_delta * self.delta_sensitivity
         min_d_strong = min_d * self.min_delta_multiplier
-        stop_ticks = max(10, int((atr / pips) * self.atr_stop_multiplier))
+        if pips != self._pips:
+            self.on_pips_change(pips)
+        stop_ticks = max(10, int(atr * self._atr_scale))
         t1 = int(stop_ticks * self.rr_first)
         t2 = int(stop_ticks * self.rr_second)
 
         state = self.classify_market_state(analyzer, profile, last_price)
-        near_lvn = analyzer.is_near_lvn(last_price, profile, self.lvn_ticks)
-        near_hvn = analyzer.is_near_hvn(last_price, profile, self.hvn_ticks)
-        near_poc = analyzer.is_near_poc(last_price, profile, self.poc_ticks)
+        near_lvn = analyzer.is_near_lvn(last_price, profile, dist=self._lvn_dist)
+        near_hvn = analyzer.is_near_hvn(last_price, profile, dist=self._hvn_dist)
+        near_poc = analyzer.is_near_poc(last_price, profile, dist=self._poc_dist)
 
         def _check_strength_and_return(sig: Signal, reason: str, strength: float) -> SignalResult:
             if strength < self.min_signal_strength:
@@ -151,7 +166,7 @@ class SignalGenerator:
             and big_edge_long
             and long_absorption_ok
         ):
-            at_support = near_lvn or (state == MarketState.BALANCED and profile.val and last_price <= profile.val + self.poc_ticks * pips)
+            at_support = near_lvn or (state == MarketState.BALANCED and profile.val and last_price <= profile.val + self._poc_dist)
             if not self.require_at_structure or at_support:
                 strength = min(1.0,
                     0.35 * min(1.0, cvd / (min_d_strong * 2))
@@ -169,7 +184,7 @@ class SignalGenerator:
             and big_edge_short
             and short_absorption_ok
         ):
-            at_resistance = near_hvn or (state == MarketState.BALANCED and profile.vah and last_price >= profile.vah - self.poc_ticks * pips)
+            at_resistance = near_hvn or (state == MarketState.BALANCED and profile.vah and last_price >= profile.vah - self._poc_dist)
             if not self.require_at_structure or at_resistance:
                 strength = min(1.0,
                     0.35 * min(1.0, abs(cvd) / (min_d_strong * 2))
@@ -181,8 +196,8 @@ class SignalGenerator:
 
         # Balanced mean-reversion: fade extremes at POC (high win rate when volume exhaustion clear)
         if state == MarketState.BALANCED and near_poc and profile.total_volume > 0:
-            avg_vol = sum(b.total_volume for b in bars[:-1]) / max(1, len(bars) - 1)
-            if bar.total_volume > avg_vol * 1.3:
+            avg_vol = float(bars_tv[:-1].mean()) if len(bars_tv) > 1 else 0.0
+            if bars_tv[-1] > avg_vol * 1.3:
                 if bar_delta < -min_d * 0.6 and last_price >= profile.poc:
                     return _check_strength_and_return(Signal.SHORT, "mean_revert_poc_exhaustion", 0.72)
                 if bar_delta > min_d * 0.6 and last_price <= profile.poc:
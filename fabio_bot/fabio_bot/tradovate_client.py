@@ -5,17 +5,74 @@ Dashboard calls our FastAPI endpoints; this client talks to Tradovate.
 """
 from __future__ import annotations
 
+import json
 import logging
+import re
+import threading
 import time
+from concurrent.futures import ThreadPoolExecutor
 from dataclasses import dataclass
-from typing import Any, List, Optional, Tuple
+from datetime import datetime
+from operator import attrgetter, itemgetter
+from typing import Any, Dict, Iterator, List, Optional, Tuple
 
 import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+try:
+    import ijson
+except ImportError:
+    ijson = None
 
 logger = logging.getLogger(__name__)
 
+CONTRACTS_TTL_SEC = 300  # contract universe changes rarely
+TOKEN_TTL_SEC = 90 * 60
+TOKEN_REFRESH_LEAD_SEC = 300  # background refresh this long before expiry
+# Futures contract name = root + month code + 1-2 digit year, e.g. MNQZ5 -> MNQ
+_CONTRACT_ROOT_RE = re.compile(r"^([A-Z0-9]+?)[FGHJKMNQUVXZ]\d{1,2}$")
+# ISO timestamp that carries its own zone: trailing Z or +HH:MM / -HHMM
+_ISO_TZ_SUFFIX_RE = re.compile(r"(?:Z|[+-]\d{2}:?\d{2})$")
+
+
+def _loads(content: bytes) -> Any:
+    """Decode a response body; orjson when installed (faster on contract/fill lists)."""
+    if orjson is not None:
+        return orjson.loads(content)
+    return json.loads(content)
+
+
+def _dumps(obj: Any) -> bytes:
+    if orjson is not None:
+        return orjson.dumps(obj)
+    return json.dumps(obj).encode("utf-8")
+
 
-@dataclass
+def _local_iso_secs(value: str) -> Optional[int]:
+    """Epoch seconds for a naive ISO timestamp read as local time; None when unparseable."""
+    try:
+        return int(datetime.fromisoformat(value).timestamp())
+    except ValueError:
+        return None
+
+
+def _iso_secs(value: str) -> Optional[int]:
+    """Epoch seconds for an ISO timestamp: Z / offset values as given, naive ones as local time."""
+    if not _ISO_TZ_SUFFIX_RE.search(value):
+        return _local_iso_secs(value)
+    try:
+        return int(datetime.fromisoformat(value.replace("Z", "+00:00")).timestamp())
+    except ValueError:
+        return None
+
+
+@dataclass(slots=True, frozen=True)
 class _AccountInfo:
     """Same shape as Demo for api_server."""
     login: int
@@ -28,7 +85,7 @@ class _AccountInfo:
     currency: str
 
 
-@dataclass
+@dataclass(slots=True, frozen=True)
 class _Position:
     ticket: int
     symbol: str
@@ -42,7 +99,7 @@ class _Position:
     time: int
 
 
-@dataclass
+@dataclass(slots=True, frozen=True)
 class _Deal:
     ticket: int
     symbol: str
@@ -54,7 +111,7 @@ class _Deal:
     comment: str
 
 
-@dataclass
+@dataclass(slots=True, frozen=True)
 class _Bar:
     time: int
     open: float
@@ -93,24 +150,41 @@ class TradovateClient:
         self.app_version = app_version
         self._token: Optional[str] = None
         self._token_expiry = 0.0
+        self._token_lock = threading.Lock()
+        self._refresh_thread: Optional[threading.Thread] = None
+        self._stop_refresh = threading.Event()
         self._session = requests.Session()
+        # Larger pool for concurrent dashboard fan-out; retry idempotent calls on gateway errors
+        # (urllib3 does not retry POST by default, so orders are never re-sent)
+        adapter = HTTPAdapter(
+            pool_connections=16,
+            pool_maxsize=32,
+            max_retries=Retry(total=2, backoff_factor=0.2, status_forcelist=[502, 503, 504], raise_on_status=False),
+        )
+        self._session.mount("https://", adapter)
+        self._session.mount("http://", adapter)
+        self._session.headers["User-Agent"] = f"{self.app_id}/{self.app_version}"
+        # Static headers live on the session; Authorization is set by _ensure_token
+        self._session.headers.update({"Accept": "application/json", "Content-Type": "application/json"})
         self._connected = False
         self._account_id: Optional[int] = None
+        self._pool: Optional[ThreadPoolExecutor] = None  # lazy; for get_snapshot fan-out
+        # (fetched_at, contract/list rows, NAME -> id, ROOT -> id)
+        self._contracts_cache: Optional[Tuple[float, List[dict], Dict[str, Any], Dict[str, Any]]] = None
+        # (fetched_at of the rows it was built from, deduped + sorted selector list)
+        self._contracts_sorted: Optional[Tuple[float, List[dict]]] = None
 
     def connect(self) -> bool:
         if not self._ensure_token():
             return False
         try:
-            r = self._session.get(
-                f"{self.base_url}/v1/account/list",
-                headers={"Authorization": f"Bearer {self._token}", "Accept": "application/json"},
-                timeout=15,
-            )
+            r = self._session.get(f"{self.base_url}/v1/account/list", timeout=15)
             r.raise_for_status()
-            accounts = r.json() if r.content else []
+            accounts = _loads(r.content) if r.content else []
             if isinstance(accounts, list) and len(accounts) > 0:
                 self._account_id = accounts[0].get("id")
             self._connected = True
+            self._start_token_refresh()
             logger.info("Tradovate connected. Symbol=%s", self.symbol)
             return True
         except Exception as e:
@@ -120,6 +194,34 @@ class TradovateClient:
     def _ensure_token(self) -> bool:
         if self._token and time.time() < self._token_expiry - 120:
             return True
+        with self._token_lock:
+            if self._token and time.time() < self._token_expiry - 120:
+                return True  # refreshed by another thread while we waited
+            return self._request_token()
+
+    def _start_token_refresh(self) -> None:
+        if self._refresh_thread is not None and self._refresh_thread.is_alive() and not self._stop_refresh.is_set():
+            return
+        # Fresh Event per thread: one stopped by disconnect() may still be finishing a wait or
+        # request, and keeps its own set flag so it exits without taking this session's refresher
+        self._stop_refresh = threading.Event()
+        self._refresh_thread = threading.Thread(
+            target=self._refresh_loop, args=(self._stop_refresh,), name="tradovate-token", daemon=True
+        )
+        self._refresh_thread.start()
+
+    def _refresh_loop(self, stop: threading.Event) -> None:
+        """Renew the token ahead of expiry so trading calls never block on auth."""
+        delay = 0.0
+        while not stop.wait(delay):
+            with self._token_lock:
+                if time.time() >= self._token_expiry - TOKEN_REFRESH_LEAD_SEC and not self._request_token():
+                    delay = 30.0  # retry soon; _ensure_token still covers the hot path
+                    continue
+            delay = max(1.0, self._token_expiry - TOKEN_REFRESH_LEAD_SEC - time.time())
+
+    def _request_token(self) -> bool:
+        """POST auth/accesstokenrequest. Caller holds _token_lock."""
         url = f"{self.base_url}/v1/auth/accesstokenrequest"
         payload = {
             "name": self.name,
@@ -130,9 +232,10 @@ class TradovateClient:
             "sec": self.sec,
         }
         try:
-            r = self._session.post(url, json=payload, timeout=15)
+            # Authorization=None drops the (possibly stale) session token for this request only
+            r = self._session.post(url, data=_dumps(payload), headers={"Authorization": None}, timeout=15)
             r.raise_for_status()
-            data = r.json()
+            data = _loads(r.content)
             err = data.get("errorText") or data.get("error")
             if err:
                 logger.warning("Tradovate auth error: %s", err)
@@ -140,13 +243,18 @@ class TradovateClient:
             self._token = data.get("accessToken")
             if not self._token:
                 return False
-            self._token_expiry = time.time() + 90 * 60
+            self._token_expiry = time.time() + TOKEN_TTL_SEC
+            self._session.headers["Authorization"] = f"Bearer {self._token}"
             return True
         except Exception as e:
             logger.warning("Tradovate auth failed: %s", e)
             return False
 
     def disconnect(self) -> None:
+        self._stop_refresh.set()
+        if self._pool is not None:
+            self._pool.shutdown(wait=False)
+            self._pool = None
         self._session.close()
         self._connected = False
 
@@ -161,16 +269,15 @@ class TradovateClient:
     def _get(self, path: str, params: Optional[dict] = None) -> Any:
         if not self.ensure_connected():
             return None
+        return self._fetch(path, params)
+
+    def _fetch(self, path: str, params: Optional[dict] = None) -> Any:
+        """GET without the connection check; callers have already run ensure_connected."""
         url = f"{self.base_url}/v1/{path.lstrip('/')}"
         try:
-            r = self._session.get(
-                url,
-                headers={"Authorization": f"Bearer {self._token}", "Accept": "application/json"},
-                params=params,
-                timeout=15,
-            )
+            r = self._session.get(url, params=params, timeout=15)
             r.raise_for_status()
-            return r.json() if r.content else None
+            return _loads(r.content) if r.content else None
         except Exception as e:
             logger.debug("Tradovate GET %s: %s", path, e)
             return None
@@ -180,36 +287,90 @@ class TradovateClient:
             return None
         url = f"{self.base_url}/v1/{path.lstrip('/')}"
         try:
-            r = self._session.post(
-                url,
-                headers={"Authorization": f"Bearer {self._token}", "Content-Type": "application/json", "Accept": "application/json"},
-                json=json_body,
-                timeout=15,
-            )
+            r = self._session.post(url, data=_dumps(json_body), timeout=15)
             r.raise_for_status()
-            return r.json() if r.content else None
+            return _loads(r.content) if r.content else None
         except Exception as e:
             logger.debug("Tradovate POST %s: %s", path, e)
             return None
 
+    def _get_contracts_cached(self) -> Optional[Tuple[float, List[dict], Dict[str, Any], Dict[str, Any]]]:
+        """contract/list rows plus NAME -> id and ROOT -> id maps, refetched at most every CONTRACTS_TTL_SEC."""
+        cached = self._contracts_cache
+        if cached is not None and time.time() - cached[0] < CONTRACTS_TTL_SEC:
+            return cached
+        data = self._get("contract/list")
+        if not isinstance(data, list):
+            return cached  # keep serving stale rows if the refresh failed
+        return self._store_contracts(data)
+
+    def _store_contracts(self, data: List[dict]) -> Tuple[float, List[dict], Dict[str, Any], Dict[str, Any]]:
+        sym_to_id = {}
+        root_to_id = {}
+        for c in data:
+            name = (c.get("name") or c.get("symbol") or "").upper()
+            sym_to_id.setdefault(name, c.get("id"))
+            m = _CONTRACT_ROOT_RE.match(name)
+            if m:
+                root_to_id.setdefault(m.group(1), c.get("id"))  # first listed (front month) wins
+        self._contracts_cache = (time.time(), data, sym_to_id, root_to_id)
+        return self._contracts_cache
+
+    def _iter_stream(self, path: str) -> Iterator[dict]:
+        """Yield top-level array items as they arrive (ijson); caller may stop early.
+        HTTP/read/parse errors propagate, so a cut-off list is never mistaken for a complete one."""
+        if not self.ensure_connected():
+            return
+        url = f"{self.base_url}/v1/{path.lstrip('/')}"
+        with self._session.get(url, stream=True, timeout=15) as r:
+            r.raise_for_status()
+            r.raw.decode_content = True
+            yield from ijson.items(r.raw, "item", use_float=True)  # floats, as _loads gives
+
     def _resolve_contract_id(self, symbol: Optional[str] = None) -> Optional[int]:
         sym = (symbol or self.symbol).upper()
         if self._contract_id and not symbol:
             return self._contract_id
-        data = self._get("contract/list")
-        if not isinstance(data, list):
+        cached = self._contracts_cache
+        if ijson is not None and (cached is None or time.time() - cached[0] >= CONTRACTS_TTL_SEC):
+            # Cold cache: note the exact name match while streaming; the full read fills the cache
+            rows: List[dict] = []
+            found = None
+            try:
+                for c in self._iter_stream("contract/list"):
+                    if found is None and (c.get("name") or c.get("symbol") or "").upper() == sym:
+                        found = c.get("id")
+                    rows.append(c)
+            except Exception as e:
+                logger.debug("Tradovate GET contract/list (stream): %s", e)
+                rows = []  # partial read: never cache it; the full fetch below retries
+            if rows:
+                self._store_contracts(rows)
+            if found is not None:
+                return found
+        cached = self._get_contracts_cached()
+        if cached is None:
             return None
+        _, data, sym_to_id, root_to_id = cached
+        cid = sym_to_id.get(sym)
+        if cid is None:
+            cid = root_to_id.get(sym)
+        if cid is not None:
+            return cid
         for c in data:
             name = (c.get("name") or c.get("symbol") or "").upper()
-            if sym in name or name == sym:
+            if sym in name:
                 return c.get("id")
         return None
 
     def get_contracts(self) -> List[dict]:
         """Return all Tradovate contracts (pairs) for symbol selector. Items: { id, name, symbol }."""
-        data = self._get("contract/list")
-        if not isinstance(data, list):
+        cached = self._get_contracts_cached()
+        if cached is None:
             return []
+        fetched_at, data = cached[0], cached[1]
+        if self._contracts_sorted is not None and self._contracts_sorted[0] == fetched_at:
+            return list(self._contracts_sorted[1])  # copy: callers may mutate, the cache must not change
         out = []
         seen = set()
         for c in data:
@@ -222,7 +383,9 @@ class TradovateClient:
                 "name": name,
                 "symbol": (c.get("symbol") or name).strip(),
             })
-        return sorted(out, key=lambda x: (x.get("name") or ""))
+        out.sort(key=itemgetter("name"))  # names are non-empty strings (filtered above)
+        self._contracts_sorted = (fetched_at, out)
+        return list(out)
 
     def place_market_order(self, is_buy: bool, quantity: float, comment: str = "", symbol: Optional[str] = None) -> Tuple[bool, str]:
         """Place market order. symbol optional; uses self.symbol if not set. Returns (success, message)."""
@@ -254,7 +417,36 @@ class TradovateClient:
     def get_account_info(self) -> Optional[_AccountInfo]:
         if not self.ensure_connected():
             return None
-        data = self._get("account/list")
+        return self._parse_account(self._fetch("account/list"))
+
+    def get_positions(self, symbol: Optional[str] = None) -> List[_Position]:
+        if not self.ensure_connected():
+            return []
+        return self._parse_positions(self._fetch("position/list"), symbol)
+
+    def get_deals_history(self, days: int = 7, symbol: Optional[str] = None) -> List[_Deal]:
+        if not self.ensure_connected():
+            return []
+        return self._parse_deals(self._fetch("fill/list"), symbol)
+
+    def get_snapshot(
+        self, days: int = 7, symbol: Optional[str] = None
+    ) -> Tuple[Optional[_AccountInfo], List[_Position], List[_Deal]]:
+        """Account, positions and fills for one dashboard refresh: one auth check, three concurrent GETs."""
+        if not self.ensure_connected():
+            return None, [], []
+        if self._pool is None:
+            self._pool = ThreadPoolExecutor(max_workers=3, thread_name_prefix="tradovate")
+        acc = self._pool.submit(self._fetch, "account/list")
+        positions = self._pool.submit(self._fetch, "position/list")
+        fills = self._pool.submit(self._fetch, "fill/list")
+        return (
+            self._parse_account(acc.result()),
+            self._parse_positions(positions.result(), symbol),
+            self._parse_deals(fills.result(), symbol),
+        )
+
+    def _parse_account(self, data: Any) -> Optional[_AccountInfo]:
         if not isinstance(data, list) or len(data) == 0:
             return None
         acc = data[0]
@@ -271,70 +463,70 @@ class TradovateClient:
             currency="USD",
         )
 
-    def get_positions(self, symbol: Optional[str] = None) -> List[_Position]:
-        if not self.ensure_connected():
-            return []
-        data = self._get("position/list")
+    def _parse_positions(self, data: Any, symbol: Optional[str]) -> List[_Position]:
         if not isinstance(data, list):
             return []
+        # Locals for the per-row builtins/class (LOAD_FAST instead of LOAD_GLOBAL in the loop)
+        _float, _abs, _int, _P = float, abs, int, _Position
+        want = symbol.upper() if symbol else None
+        default_sym = self.symbol
+        now = _int(time.time())
         out = []
+        append = out.append
         for p in data:
-            sym = (p.get("contract") or p.get("symbol") or "").upper() or self.symbol
-            if symbol and sym != symbol.upper():
+            get = p.get
+            sym = (get("contract") or get("symbol") or "").upper() or default_sym
+            if want and sym != want:
                 continue
-            is_buy = (p.get("positionType") or p.get("side") or "").upper().startswith("B") or p.get("quantity", 0) > 0
-            qty = abs(float(p.get("quantity") or p.get("size") or 0))
-            price = float(p.get("avgPrice") or p.get("price") or 0)
-            pl = float(p.get("realizedPnl") or p.get("profit") or 0)
-            out.append(_Position(
-                ticket=int(p.get("id") or 0),
+            is_buy = (get("positionType") or get("side") or "").upper().startswith("B") or get("quantity", 0) > 0
+            price = _float(get("avgPrice") or get("price") or 0)
+            append(_P(
+                ticket=_int(get("id") or 0),
                 symbol=sym,
                 type=0 if is_buy else 1,
-                volume=qty,
+                volume=_abs(_float(get("quantity") or get("size") or 0)),
                 price_open=price,
                 price_current=price,
                 sl=0.0,
                 tp=0.0,
-                profit=pl,
-                time=int(time.time()),
+                profit=_float(get("realizedPnl") or get("profit") or 0),
+                time=now,
             ))
         return out
 
-    def get_deals_history(self, days: int = 7, symbol: Optional[str] = None) -> List[_Deal]:
-        if not self.ensure_connected():
-            return []
-        data = self._get("fill/list")
+    def _parse_deals(self, data: Any, symbol: Optional[str]) -> List[_Deal]:
         if not isinstance(data, list):
             return []
+        want = symbol.upper() if symbol else None
+        now = int(time.time())
         out = []
         for f in data[:200]:
+            if not isinstance(f, dict):
+                continue
             sym = (f.get("contractSymbol") or f.get("symbol") or self.symbol).upper()
-            if symbol and sym != symbol.upper():
+            if want and sym != want:
                 continue
             is_buy = (f.get("side") or "").upper().startswith("B") or (f.get("quantity") or 0) > 0
-            qty = abs(float(f.get("quantity") or f.get("size") or 0))
-            price = float(f.get("price") or 0)
-            pl = float(f.get("realizedPnl") or f.get("profit") or 0)
             ts = f.get("timestamp") or f.get("time")
             if isinstance(ts, str) and "T" in ts:
-                try:
-                    from datetime import datetime
-                    t = int(datetime.fromisoformat(ts.replace("Z", "+00:00")).timestamp())
-                except Exception:
-                    t = int(time.time())
+                t = _iso_secs(ts)
             else:
-                t = int(ts or time.time())
+                try:
+                    t = int(ts or now)
+                except (TypeError, ValueError):
+                    t = None
             out.append(_Deal(
                 ticket=int(f.get("id") or 0),
                 symbol=sym,
                 type=0 if is_buy else 1,
-                volume=qty,
-                price=price,
-                profit=pl,
-                time=t,
+                volume=abs(float(f.get("quantity") or f.get("size") or 0)),
+                price=float(f.get("price") or 0),
+                profit=float(f.get("realizedPnl") or f.get("profit") or 0),
+                time=now if t is None else t,  # unparseable -> now
                 comment=f.get("orderId") or "",
             ))
-        return sorted(out, key=lambda d: d.time, reverse=True)[:200]
+        out.sort(key=attrgetter("time"), reverse=True)  # stable: equal times keep feed order
+        return out
 
     def get_bars(self, timeframe: str = "1m", count: int = 500, start_pos: int = 0) -> List[_Bar]:
         # Tradovate REST may have chart endpoint; stub for now
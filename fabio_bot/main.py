@@ -26,6 +26,20 @@ from fabio_bot.signal_generator import Signal, SignalGenerator
 from fabio_bot.risk_manager import RiskManager
 from fabio_bot.execution_engine import ExecutionEngine, BracketRequest
 
+
+def _noop(*args: Any, **kwargs: Any) -> None:
+    return None
+
+
+# Resolved once so handlers call these unconditionally (no-ops outside Bookmap)
+_bm_send_user_message = bm.send_user_message if bm else _noop
+_bm_subscribe_to_depth = bm.subscribe_to_depth if bm else _noop
+_bm_subscribe_to_trades = bm.subscribe_to_trades if bm else _noop
+_bm_subscribe_to_mbo = bm.subscribe_to_mbo if bm else _noop
+_bm_subscribe_to_order_info = bm.subscribe_to_order_info if bm else _noop
+_bm_subscribe_to_position_updates = bm.subscribe_to_position_updates if bm else _noop
+_bm_subscribe_to_balance_updates = bm.subscribe_to_balance_updates if bm else _noop
+
 # --- Config ---
 CONFIG_PATH = os.path.join(_ROOT, "config.yaml")
 config = load_config(CONFIG_PATH) if os.path.exists(CONFIG_PATH) else {}
@@ -36,9 +50,12 @@ mode = config.get("mode", "simulation")
 scalp_cfg = config.get("scalp", {})
 # When mode is scalp, overlay scalp params for 1m-only max trades
 if mode == "scalp" and scalp_cfg:
-    strategy = {**strategy, **{k: scalp_cfg[k] for k in ("min_signal_strength", "min_delta", "min_delta_multiplier", "big_trade_edge", "big_trade_threshold") if k in scalp_cfg}}
-    targets_cfg = {**targets_cfg, **{k: scalp_cfg[k] for k in ("rr_first", "rr_second") if k in scalp_cfg}}
-    risk_cfg = {**risk_cfg, **{k: scalp_cfg[k] for k in ("max_daily_trades",) if k in scalp_cfg}}
+    strategy = dict(strategy)
+    strategy.update((k, scalp_cfg[k]) for k in ("min_signal_strength", "min_delta", "min_delta_multiplier", "big_trade_edge", "big_trade_threshold") if k in scalp_cfg)
+    targets_cfg = dict(targets_cfg)
+    targets_cfg.update((k, scalp_cfg[k]) for k in ("rr_first", "rr_second") if k in scalp_cfg)
+    risk_cfg = dict(risk_cfg)
+    risk_cfg.update((k, scalp_cfg[k]) for k in ("max_daily_trades",) if k in scalp_cfg)
 
 # --- Logging ---
 log_dir = os.path.join(_ROOT, "logs")
@@ -56,23 +73,56 @@ logging.basicConfig(
 )
 logger = logging.getLogger("fabio_bot")
 
-# --- Per-instrument state (alias -> state) ---
-_instrument_state: Dict[str, Dict[str, Any]] = {}
-_interval_counter: Dict[str, int] = {}
 BAR_INTERVAL_SEC = int(scalp_cfg.get("interval_seconds", strategy.get("interval_seconds", 15))) if mode == "scalp" and scalp_cfg else strategy.get("interval_seconds", 15)
+INTERVALS_PER_BAR = max(1, int(BAR_INTERVAL_SEC * 10))  # on_interval fires every 0.1s
+
+
+class InstrumentState:
+    """Per-instrument bot state. Slotted: read on every depth/trade event."""
 
+    __slots__ = (
+        "analyzer", "signal_gen", "risk", "execution", "pips", "size_multiplier",
+        "last_price", "atr", "position", "in_position", "tick", "next_bar",
+    )
+
+    def __init__(
+        self,
+        analyzer: OrderFlowAnalyzer,
+        signal_gen: SignalGenerator,
+        risk: RiskManager,
+        pips: float,
+        size_multiplier: float,
+    ):
+        self.analyzer = analyzer
+        self.signal_gen = signal_gen
+        self.risk = risk
+        self.execution: Optional[ExecutionEngine] = None
+        self.pips = pips
+        self.size_multiplier = size_multiplier
+        self.last_price = 0.0
+        self.atr = 20.0
+        self.position = 0
+        self.in_position = False
+        # on_interval ticks (0.1s) seen and the tick at which the next bar closes
+        self.tick = 0
+        self.next_bar = INTERVALS_PER_BAR
 
-def _get_state(alias: str, pips: float, size_multiplier: float) -> Dict[str, Any]:
+
+# --- Per-instrument state (alias -> state) ---
+_instrument_state: Dict[str, InstrumentState] = {}
+
+
+def _get_state(alias: str, pips: float, size_multiplier: float) -> InstrumentState:
     if alias not in _instrument_state:
-        _instrument_state[alias] = {
-            "analyzer": OrderFlowAnalyzer(
+        _instrument_state[alias] = InstrumentState(
+            analyzer=OrderFlowAnalyzer(
                 pips=pips,
                 size_multiplier=size_multiplier,
                 big_trade_threshold=float(strategy.get("big_trade_threshold", 30)),
                 absorption_ticks=int(strategy.get("absorption_ticks", 3)),
                 value_area_pct=float(strategy.get("vah_val_pct", 0.70)),
             ),
-            "signal_gen": SignalGenerator(
+            signal_gen=SignalGenerator(
                 min_delta=float(strategy.get("min_delta", 500)),
                 delta_sensitivity=float(strategy.get("delta_sensitivity", 1.0)),
                 big_trade_confirm_min=2,
@@ -85,7 +135,7 @@ def _get_state(alias: str, pips: float, size_multiplier: float) -> Dict[str, Any
                 rr_second=float(targets_cfg.get("rr_second", 1.8)),
                 atr_stop_multiplier=float(risk_cfg.get("atr_stop_multiplier", 1.5)),
             ),
-            "risk": RiskManager(
+            risk=RiskManager(
                 risk_pct=float(strategy.get("risk_pct", 0.01)),
                 max_daily_drawdown_pct=float(risk_cfg.get("max_daily_drawdown_pct", 0.03)),
                 max_consecutive_losses=int(risk_cfg.get("max_consecutive_losses", 3)),
@@ -95,15 +145,9 @@ def _get_state(alias: str, pips: float, size_multiplier: float) -> Dict[str, Any
                 tick_value=float(risk_cfg.get("tick_value", 5)),
                 use_globex=bool(strategy.get("use_globex", False)),
             ),
-            "execution": None,
-            "pips": pips,
-            "size_multiplier": size_multiplier,
-            "last_price": 0.0,
-            "atr": 20.0,
-            "position": 0,
-            "in_position": False,
-        }
-        _interval_counter[alias] = 0
+            pips=pips,
+            size_multiplier=size_multiplier,
+        )
     return _instrument_state[alias]
 
 
@@ -119,33 +163,31 @@ def handle_subscribe_instrument(
 ) -> None:
     logger.info("Subscribe instrument: %s (pips=%s, size_mult=%s)", alias, pips, size_multiplier)
     state = _get_state(alias, pips, size_multiplier)
-    state["execution"] = ExecutionEngine(addon=addon, pips=pips, tick_value=risk_cfg.get("tick_value", 5))
-    state["pips"] = pips
-    state["size_multiplier"] = size_multiplier
-    if bm:
-        bm.subscribe_to_depth(addon, alias, 1)
-        bm.subscribe_to_trades(addon, alias, 2)
-        if supported_features.get("mbo"):
-            bm.subscribe_to_mbo(addon, alias, 3)
-        if supported_features.get("trading"):
-            bm.subscribe_to_order_info(addon, alias, 4)
-            bm.subscribe_to_position_updates(addon, alias, 5)
-            bm.subscribe_to_balance_updates(addon, alias, 6)
-    state["risk"].reset_daily()
+    state.execution = ExecutionEngine(addon=addon, pips=pips, tick_value=risk_cfg.get("tick_value", 5))
+    state.pips = pips
+    state.size_multiplier = size_multiplier
+    _bm_subscribe_to_depth(addon, alias, 1)
+    _bm_subscribe_to_trades(addon, alias, 2)
+    if supported_features.get("mbo"):
+        _bm_subscribe_to_mbo(addon, alias, 3)
+    if supported_features.get("trading"):
+        _bm_subscribe_to_order_info(addon, alias, 4)
+        _bm_subscribe_to_position_updates(addon, alias, 5)
+        _bm_subscribe_to_balance_updates(addon, alias, 6)
+    state.risk.reset_daily()
 
 
 def handle_unsubscribe_instrument(addon: Any, alias: str) -> None:
     logger.info("Unsubscribe instrument: %s", alias)
     _instrument_state.pop(alias, None)
-    _interval_counter.pop(alias, None)
 
 
 def on_depth(addon: Any, alias: str, is_bid: bool, price_level: int, size_level: int) -> None:
     state = _instrument_state.get(alias)
     if not state:
         return
-    price = price_level * state["pips"]
-    state["last_price"] = price
+    price = price_level * state.pips
+    state.last_price = price
 
 
 def on_trade(
@@ -163,40 +205,39 @@ def on_trade(
     state = _instrument_state.get(alias)
     if not state:
         return
-    state["analyzer"].on_trade(price_level, size_level, is_bid)
-    state["last_price"] = price_level * state["pips"]
+    state.analyzer.on_trade(price_level, size_level, is_bid)
+    state.last_price = price_level * state.pips
 
 
 def on_interval(addon: Any, alias: str) -> None:
     state = _instrument_state.get(alias)
-    if not state or state.get("in_position"):
+    if not state or state.in_position:
         return
-    _interval_counter[alias] = _interval_counter.get(alias, 0) + 1
     # Every 0.1s; bar = 15s -> 150 intervals
-    intervals_per_bar = max(1, int(BAR_INTERVAL_SEC * 10))
-    if _interval_counter[alias] % intervals_per_bar != 0:
+    state.tick += 1
+    if state.tick < state.next_bar:
         return
-    analyzer = state["analyzer"]
+    state.next_bar += INTERVALS_PER_BAR
+    analyzer = state.analyzer
     bar = analyzer.start_new_bar()
-    last_price = state["last_price"]
+    last_price = state.last_price
     if last_price <= 0:
         return
-    profile = analyzer.build_volume_profile()
-    sig_result = state["signal_gen"].generate(
-        analyzer, profile, last_price, state["atr"], state["pips"]
+    profile = analyzer.get_profile_cached()
+    sig_result = state.signal_gen.generate(
+        analyzer, profile, last_price, state.atr, state.pips
     )
     if sig_result.signal == Signal.NONE:
         return
-    risk_mgr = state["risk"]
+    risk_mgr = state.risk
     can_trade, reason = risk_mgr.can_trade(1_000_000.0)
     if not can_trade:
-        if bm:
-            bm.send_user_message(addon, alias, f"Blocked: {reason}")
+        _bm_send_user_message(addon, alias, f"Blocked: {reason}")
         return
-    size = risk_mgr.position_size(1_000_000.0, sig_result.stop_ticks, state["pips"])
+    size = risk_mgr.position_size(1_000_000.0, sig_result.stop_ticks, state.pips)
     if size <= 0:
         return
-    exec_engine = state["execution"]
+    exec_engine = state.execution
     if exec_engine and mode != "backtest":
         req = BracketRequest(
             alias=alias,
@@ -206,25 +247,24 @@ def on_interval(addon: Any, alias: str) -> None:
             stop_ticks=sig_result.stop_ticks,
             target1_ticks=sig_result.target1_ticks,
             target2_ticks=sig_result.target2_ticks,
-            pips=state["pips"],
+            pips=state.pips,
             scale_out_pct=float(targets_cfg.get("scale_out_pct", 0.5)),
         )
         order_id = exec_engine.place_bracket(req)
         if order_id:
-            state["in_position"] = True
-            if bm:
-                bm.send_user_message(
-                    addon, alias,
-                    f"Signal: {sig_result.signal.name} | {sig_result.reason} | size={size}",
-                )
+            state.in_position = True
+            _bm_send_user_message(
+                addon, alias,
+                f"Signal: {sig_result.signal.name} | {sig_result.reason} | size={size}",
+            )
 
 
 def on_position_update(addon: Any, position_update: Dict[str, Any]) -> None:
     alias = position_update.get("instrumentAlias", "")
     state = _instrument_state.get(alias)
     if state is not None:
-        state["position"] = position_update.get("position", 0)
-        state["in_position"] = state["position"] != 0
+        state.position = position_update.get("position", 0)
+        state.in_position = state.position != 0
 
 
 def on_order_executed(addon: Any, alias: str, event: Dict[str, Any]) -> None:
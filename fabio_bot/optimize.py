@@ -8,6 +8,7 @@ import json
 import logging
 import os
 import sys
+from concurrent.futures import ProcessPoolExecutor
 from pathlib import Path
 from typing import Any, Dict, List, Tuple
 
@@ -17,7 +18,7 @@ import pandas as pd
 ROOT = Path(__file__).resolve().parent
 sys.path.insert(0, str(ROOT))
 
-from backtest import generate_sample_bars, run_backtest
+from backtest import generate_sample_bars, prepare_bars, run_backtest
 
 logging.basicConfig(level=logging.WARNING)
 logger = logging.getLogger(__name__)
@@ -48,6 +49,7 @@ def run_one(
     min_delta_multiplier: float,
     big_trade_edge: int,
     big_trade_threshold: float,
+    prepared: Dict[str, Any] = None,
 ) -> Tuple[Dict[str, Any], float]:
     res = run_backtest(
         df,
@@ -60,42 +62,68 @@ def run_one(
         rr_second=rr_second,
         min_delta_multiplier=min_delta_multiplier,
         big_trade_edge=big_trade_edge,
+        prepared=prepared,
     )
     m = res.to_metrics()
     sc = score_result(m["win_rate"], m["profit_factor"], m["total_trades"], m["max_drawdown_pct"])
     return m, sc
 
 
+# Worker-side copy of the bars (and their prepare_bars inputs), set once per process by
+# the pool initializer so the DataFrame is pickled per worker rather than per parameter combo.
+_WORKER_DF: pd.DataFrame = None
+_WORKER_PREPARED: Dict[str, Any] = None
+
+
+def _init_worker(df: pd.DataFrame) -> None:
+    global _WORKER_DF, _WORKER_PREPARED
+    _WORKER_DF = df
+    _WORKER_PREPARED = prepare_bars(df)
+
+
+def _run_one_worker(p: Dict[str, Any]) -> Tuple[Dict[str, Any], float]:
+    return run_one(_WORKER_DF, **p, prepared=_WORKER_PREPARED)
+
+
 def main():
     print("Loading data...")
     df = generate_sample_bars(n_bars=OPTIMIZE_BARS, seed=42, order_flow_rich=True)
     # Backtest injects big ticks per-bar when processing; no need to modify df here.
 
-    param_grid = [
-        {"min_signal_strength": ms, "min_delta": md, "rr_first": r1, "rr_second": r2,
-         "min_delta_multiplier": mdm, "big_trade_edge": be, "big_trade_threshold": bt}
-        for ms in [0.70, 0.75, 0.78, 0.82]
-        for md in [360, 420, 480]
-        for r1 in [0.65, 0.75, 0.82]
-        for r2 in [1.5, 1.8, 2.0]
-        for mdm in [1.2, 1.3, 1.4]
-        for be in [2, 3]
-        for bt in [28, 32]
+    # Axes in the order of the original nested grid; sampled indices are decoded
+    # row-major so only the chosen combos are ever built as dicts.
+    axes = [
+        ("min_signal_strength", [0.70, 0.75, 0.78, 0.82]),
+        ("min_delta", [360, 420, 480]),
+        ("rr_first", [0.65, 0.75, 0.82]),
+        ("rr_second", [1.5, 1.8, 2.0]),
+        ("min_delta_multiplier", [1.2, 1.3, 1.4]),
+        ("big_trade_edge", [2, 3]),
+        ("big_trade_threshold", [28, 32]),
     ]
+    sizes = [len(values) for _, values in axes]
+    total = int(np.prod(sizes))
     np.random.seed(123)
-    if len(param_grid) > 50:
-        param_grid = [param_grid[i] for i in np.random.choice(len(param_grid), 50, replace=False)]
+    idxs = np.random.choice(total, 50, replace=False) if total > 50 else np.arange(total)
+    param_grid = [
+        {name: values[j] for (name, values), j in zip(axes, combo)}
+        for combo in zip(*np.unravel_index(idxs, sizes))
+    ]
 
     print(f"Running {len(param_grid)} parameter combinations (target: ~80% win rate, good PF)...")
     results: List[Tuple[Dict, float, Dict[str, Any]]] = []
-    for i, p in enumerate(param_grid):
-        try:
-            m, sc = run_one(df, **p)
-            results.append((m, sc, p))
-        except Exception as e:
-            logger.warning("Run failed %s: %s", p, e)
-        if (i + 1) % 20 == 0:
-            print(f"  {i+1}/{len(param_grid)} done...")
+    workers = min(len(param_grid), os.cpu_count() or 1)
+    with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker, initargs=(df,)) as ex:
+        futures = [ex.submit(_run_one_worker, p) for p in param_grid]
+        # Collect in submission order so ties sort the same as a sequential run
+        for i, (fut, p) in enumerate(zip(futures, param_grid)):
+            try:
+                m, sc = fut.result()
+                results.append((m, sc, p))
+            except Exception as e:
+                logger.warning("Run failed %s: %s", p, e)
+            if (i + 1) % 20 == 0:
+                print(f"  {i+1}/{len(param_grid)} done...")
 
     # Sort by score desc, then by win_rate desc
     results.sort(key=lambda x: (-x[1], -x[0]["win_rate"], -x[0]["profit_factor"]))
@@ -3,24 +3,69 @@ Optimize scalp params on real 1m data to improve win rate, profit factor, and ma
 Supports NQ (default) and MNQ via --data and --tick-value.
 """
 import argparse
+import hashlib
 import json
 import logging
+import math
+import os
+import random
+import sqlite3
 import sys
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing.shared_memory import SharedMemory
 from pathlib import Path
 
 ROOT = Path(__file__).resolve().parent
 sys.path.insert(0, str(ROOT))
 
+import numpy as np
 import pandas as pd
 
-from backtest import run_backtest
+try:
+    import optuna
+except ImportError:
+    optuna = None
+
+try:
+    import pyarrow  # noqa: F401  (enables pandas' multithreaded pyarrow CSV engine)
+    CSV_ENGINE = "pyarrow"
+except ImportError:
+    CSV_ENGINE = "c"
+
+from backtest import prepare_bars, run_backtest, synthetic_bar_deltas
 
 logging.basicConfig(level=logging.WARNING)
 
 DATA_1M = ROOT / "data" / "nq_1m_live.csv"
+CACHE_DB = ROOT / "data" / "backtest_cache.sqlite"
+# Results are only reused while these (and the bars / tick value) are unchanged
+STRATEGY_SOURCES = ("backtest.py", "fabio_bot/order_flow_analyzer.py", "fabio_bot/signal_generator.py", "fabio_bot/risk_manager.py")
 INITIAL_BALANCE = 50_000.0
 MIN_TRADES = 20  # Allow fewer trades for higher-quality (stricter filters)
 
+# Base search space, tuned for high WR, high PF, low DD (stricter filters + tight DD cap).
+# Shared by the random grid and the --tpe sampler; order matches the original nested grid.
+BASE_SPACE = {
+    "min_signal_strength": [0.62, 0.64, 0.66, 0.68],  # Stricter = higher WR, fewer bad trades
+    "min_delta": [420, 450, 480, 500],
+    "rr_first": [0.52, 0.56, 0.60, 0.62],
+    "rr_second": [1.15, 1.22, 1.30, 1.36],
+    "min_delta_multiplier": [1.22, 1.28, 1.34],
+    "big_trade_threshold": [28, 30, 32],
+    "risk_pct": [0.005, 0.006, 0.007],
+    "atr_stop_multiplier": [1.28, 1.38, 1.46, 1.54],
+    "max_daily_drawdown_pct": [0.015, 0.02, 0.025],
+    "big_trade_edge": [2, 3],
+}
+
+
+def read_bars(path: Path) -> pd.DataFrame:
+    """Load a bar CSV, parsing with pyarrow when installed. Price/volume columns are read
+    as float64 (no per-column type inference; results match the default reader)."""
+    cols = pd.read_csv(path, nrows=0).columns
+    dtype = {c: "float64" for c in ("open", "high", "low", "close", "volume", "buy_volume", "sell_volume") if c in cols}
+    return pd.read_csv(path, engine=CSV_ENGINE, dtype=dtype)
+
 
 def score(wr: float, pf: float, dd_pct: float, trades: int, pnl: float = 0) -> float:
     """Higher better. Maximize WR, PF; minimize DD; prefer positive P/L."""
@@ -36,15 +81,270 @@ def score(wr: float, pf: float, dd_pct: float, trades: int, pnl: float = 0) -> f
     return wr_term + pf_term + dd_term + pnl_term
 
 
+def candidate_bars(bar_delta: np.ndarray, cvd: np.ndarray, p: dict) -> int:
+    """Upper bound on entries for p: bars passing the signal generator's delta/CVD gates
+    (the backtest runs with delta_sensitivity=1). Each trade needs at least one such bar."""
+    min_d = p["min_delta"]
+    strong = min_d * p["min_delta_multiplier"]
+    passing = (
+        ((cvd >= strong) & (bar_delta > 0))
+        | ((cvd <= -strong) & (bar_delta < 0))
+        | (np.abs(bar_delta) > min_d * 0.6)  # POC mean-reversion path
+    )
+    return int(np.count_nonzero(passing))
+
+
+def run_params(df: pd.DataFrame, p: dict, tick_val: float, prepared: dict = None):
+    res = run_backtest(
+        df,
+        initial_balance=INITIAL_BALANCE,
+        risk_pct=p["risk_pct"],
+        big_trade_threshold=p["big_trade_threshold"],
+        min_delta=p["min_delta"],
+        min_signal_strength=p["min_signal_strength"],
+        rr_first=p["rr_first"],
+        rr_second=p["rr_second"],
+        min_delta_multiplier=p["min_delta_multiplier"],
+        big_trade_edge=p["big_trade_edge"],
+        atr_stop_multiplier=p["atr_stop_multiplier"],
+        max_daily_drawdown_pct=p.get("max_daily_drawdown_pct", 0.03),
+        tick_value=tick_val,
+        prepared=prepared,
+    )
+    m = res.to_metrics()
+    sc = score(m["win_rate"], m["profit_factor"], m["max_drawdown_pct"], m["total_trades"], m["total_pnl"])
+    return sc, m
+
+
+# Worker-side view of the bars and tick value, set once per process by the pool
+# initializer so only the small param dict is pickled per task.
+_WORKER_SHM = None
+_WORKER_DF = None
+_WORKER_TICK_VAL = 5.0
+_WORKER_PREPARED = None
+_WORKER_DELTA = None
+_WORKER_CVD = None
+
+
+def _share_bars(df: pd.DataFrame):
+    """Copy the columns run_backtest reads into one shared-memory block that workers map
+    zero-copy. Returns (shm, spec), or (None, df) for frames with a date column."""
+    if "date" in df.columns:
+        return None, df
+    cols = [c for c in ("close", "buy_volume", "sell_volume", "bar_idx") if c in df.columns]
+    dtype = np.result_type(*(df[c].dtype for c in cols if c != "bar_idx"))
+    shape = (len(df), len(cols))
+    shm = SharedMemory(create=True, size=max(1, len(df) * len(cols) * dtype.itemsize))
+    np.ndarray(shape, dtype, buffer=shm.buf)[:] = df[cols].to_numpy(dtype)
+    return shm, (shm.name, shape, dtype.str, cols)
+
+
+def _init_worker(bars, tick_val: float) -> None:
+    global _WORKER_SHM, _WORKER_DF, _WORKER_TICK_VAL, _WORKER_PREPARED, _WORKER_DELTA, _WORKER_CVD
+    if isinstance(bars, pd.DataFrame):
+        df = bars
+    else:
+        name, shape, dtype, cols = bars
+        _WORKER_SHM = SharedMemory(name=name)  # the parent owns (and unlinks) the block
+        df = pd.DataFrame(np.ndarray(shape, np.dtype(dtype), buffer=_WORKER_SHM.buf), columns=cols, copy=False)
+    _WORKER_DF = df
+    _WORKER_TICK_VAL = tick_val
+    _WORKER_PREPARED = prepare_bars(df)
+    _WORKER_DELTA = synthetic_bar_deltas(df)
+    _WORKER_CVD = np.cumsum(_WORKER_DELTA)
+
+
+def _eval_params(p: dict):
+    n = candidate_bars(_WORKER_DELTA, _WORKER_CVD, p)
+    if n < MIN_TRADES:
+        # Too few signal bars to ever reach MIN_TRADES: score() would return -1e9 anyway
+        return -1e9, {"total_trades": None, "pruned": True}, p
+    sc, m = run_params(_WORKER_DF, p, _WORKER_TICK_VAL, _WORKER_PREPARED)
+    return sc, m, p
+
+
+def _make_pool(df: pd.DataFrame, tick_val: float, n_tasks: int):
+    """Pool whose workers see df through shared memory. Returns (executor, shm); pass both
+    to _close_pool when done."""
+    shm, bars = _share_bars(df)
+    workers = min(n_tasks, os.cpu_count() or 1)
+    return ProcessPoolExecutor(max_workers=workers, initializer=_init_worker, initargs=(bars, tick_val)), shm
+
+
+def _close_pool(ex: ProcessPoolExecutor, shm) -> None:
+    ex.shutdown(cancel_futures=True)  # caller may have stopped early: drop queued combos
+    if shm is not None:
+        shm.close()
+        shm.unlink()
+
+
+def sample_grid(space: dict, k: int) -> list:
+    """random.sample of k combos from the Cartesian product of space (nested-loop order)
+    without building it: sampling range(total) draws the same indices as sampling the list."""
+    names = list(space)
+    sizes = [len(space[n]) for n in names]
+    total = math.prod(sizes)
+    grid = []
+    for idx in random.sample(range(total), min(k, total)):
+        picks = []
+        for size in reversed(sizes):
+            idx, j = divmod(idx, size)
+            picks.append(j)
+        grid.append({n: space[n][j] for n, j in zip(names, reversed(picks))})
+    return grid
+
+
+PARAM_KEYS = tuple(BASE_SPACE)  # every grid dict carries exactly these keys
+
+
+def param_key(p: dict) -> tuple:
+    # Fixed key order instead of sorting items; round() leaves ints unchanged
+    return tuple([round(p[k], 6) for k in PARAM_KEYS])
+
+
+class DiskCache:
+    """param_key -> (score, metrics) like the in-run cache dict, persisted in sqlite so later
+    runs (e.g. repeated --fine) skip combos already backtested. Rows are scoped to a hash of
+    the bars, the tick value and the strategy sources."""
+
+    def __init__(self, path: Path, df: pd.DataFrame, tick_val: float):
+        h = hashlib.blake2b(digest_size=8)
+        h.update(pd.util.hash_pandas_object(df, index=False).to_numpy().tobytes())
+        for src in STRATEGY_SOURCES:
+            h.update((ROOT / src).read_bytes())
+        self._scope = f"{h.hexdigest()}:{tick_val}"
+        path.parent.mkdir(parents=True, exist_ok=True)
+        self._conn = sqlite3.connect(path)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS bt (scope TEXT, params TEXT, score REAL, metrics TEXT, PRIMARY KEY (scope, params))"
+        )
+        rows = self._conn.execute("SELECT params, score, metrics FROM bt WHERE scope = ?", (self._scope,))
+        self._mem = {tuple(json.loads(k)): (sc, json.loads(m)) for k, sc, m in rows}
+
+    def __len__(self) -> int:
+        return len(self._mem)
+
+    def __contains__(self, key: tuple) -> bool:
+        return key in self._mem
+
+    def __getitem__(self, key: tuple):
+        return self._mem[key]
+
+    def __setitem__(self, key: tuple, value) -> None:
+        self._mem[key] = value
+        sc, m = value
+        with self._conn:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO bt VALUES (?, ?, ?, ?)", (self._scope, json.dumps(list(key)), sc, json.dumps(m))
+            )
+
+    def close(self) -> None:
+        self._conn.close()
+
+
+def eval_grid(df: pd.DataFrame, tick_val: float, grid: list, cache: dict = None):
+    """Yield (score, metrics, params) per combo in grid order, backtests spread over all cores.
+    cache maps param_key -> (score, metrics) and is shared across stages of one run (same df
+    and tick value); cached combos are not re-run."""
+    if cache is None:
+        cache = {}
+    todo = {}
+    for p in grid:
+        key = param_key(p)
+        if key not in cache:
+            todo.setdefault(key, p)
+    if not todo:
+        for p in grid:
+            yield (*cache[param_key(p)], p)
+        return
+    ex, shm = _make_pool(df, tick_val, len(todo))
+    try:
+        fresh = ex.map(_eval_params, todo.values(), chunksize=4)
+        for p in grid:
+            key = param_key(p)
+            if key not in cache:
+                sc, m, _ = next(fresh)
+                cache[key] = (sc, m)
+            yield (*cache[key], p)
+    finally:
+        _close_pool(ex, shm)
+
+
+def tpe_search(df: pd.DataFrame, tick_val: float, n_trials: int, storage: str = None, cache: dict = None):
+    """Like eval_grid over BASE_SPACE, but trials are proposed by Optuna's TPE sampler.
+    Trials are asked in batches of one per core so the pool stays busy; repeats proposed
+    by the sampler are answered from cache."""
+    if cache is None:
+        cache = {}
+    study = optuna.create_study(
+        study_name="optimize_1m", direction="maximize", storage=storage, load_if_exists=bool(storage),
+        sampler=optuna.samplers.TPESampler(seed=789),
+    )
+    batch = os.cpu_count() or 1
+    ex, shm = _make_pool(df, tick_val, min(batch, n_trials))
+    try:
+        done = 0
+        while done < n_trials:
+            trials = [study.ask() for _ in range(min(batch, n_trials - done))]
+            grid = [{k: t.suggest_categorical(k, v) for k, v in BASE_SPACE.items()} for t in trials]
+            todo = {}
+            for p in grid:
+                key = param_key(p)
+                if key not in cache:
+                    todo.setdefault(key, p)
+            for key, (sc, m, _) in zip(todo, ex.map(_eval_params, todo.values())):
+                cache[key] = (sc, m)
+            for t, p in zip(trials, grid):
+                sc, m = cache[param_key(p)]
+                study.tell(t, sc)
+                yield sc, m, p
+            done += len(trials)
+    finally:
+        _close_pool(ex, shm)
+
+
+def early_stop(results, patience: int, min_improvement: float, best: float = -1e9):
+    """Pass results through, stopping once `patience` runs in a row fail to beat the
+    best score (starting at `best`) by more than `min_improvement`. patience=0 disables."""
+    stale = 0
+    try:
+        for r in results:
+            yield r
+            if r[0] > best + min_improvement:
+                stale = 0
+            else:
+                stale += 1
+                if patience and stale >= patience:
+                    print(f"  No improvement in {stale} runs; stopping early.")
+                    return
+            best = max(best, r[0])
+    finally:
+        results.close()
+
+
 def main():
     parser = argparse.ArgumentParser(description="Optimize 1m scalp params for WR, PF, low DD")
     parser.add_argument("--data", type=str, default="", help="CSV path (e.g. data/mnq_1m.csv). Default: data/nq_1m_live.csv")
     parser.add_argument("--tick-value", type=float, default=None, help="Tick value (MNQ=1, NQ=5). Auto from --data path if not set.")
     parser.add_argument("--quick", action="store_true", help="Smaller grid (60 + 24 local) for faster run.")
     parser.add_argument("--fine", action="store_true", help="Fine-tune only: load best_params, run tiny grid around it (~48 runs).")
+    parser.add_argument("--tpe", action="store_true", help="Sample the base stage with Optuna TPE instead of a random grid (needs optuna).")
+    parser.add_argument("--fp64", action="store_true", help="Keep bar columns float64 (bit-exact with older runs; default downcasts to float32).")
+    parser.add_argument("--patience", type=int, default=40, help="Stop a stage after this many runs without improvement (0 = run all).")
+    parser.add_argument("--min-improvement", type=float, default=0.5, help="Score gain that counts as an improvement for --patience.")
+    parser.add_argument("--shard", type=str, default="", help="Run only base-stage shard i of N (\"i/N\", 0-based) and save it for --merge-shards; run shards on any hosts sharing data/.")
+    parser.add_argument("--merge-shards", type=int, default=0, metavar="N", help="Pick the best of N saved base-stage shards, then run the local search.")
+    parser.add_argument("--no-disk-cache", action="store_true", help=f"Do not read or write {CACHE_DB.name} (re-run every combo).")
+    parser.add_argument("--storage", type=str, default=None, help="Optuna storage URL for --tpe, e.g. sqlite:///data/optuna.db (resumes the study).")
     args, _ = parser.parse_known_args()
 
     data_path = Path(args.data) if args.data else DATA_1M
+    out_name = "best_params_mnq_1m.json" if "mnq" in str(data_path).lower() else "best_params_1m.json"
+    shard_i, shard_n = (int(x) for x in args.shard.split("/")) if args.shard else (0, 1)
+    if not 0 <= shard_i < shard_n:
+        print(f"Bad --shard {args.shard!r}; expected i/N with 0 <= i < N.")
+        return 1
     tick_val = args.tick_value
     if tick_val is None and "mnq" in data_path.name.lower():
         tick_val = 1.0
@@ -54,7 +354,7 @@ def main():
     if not data_path.exists():
         print(f"Missing {data_path}. Run: python backtest.py --fetch-real --symbol MNQ=F --scalp --save-csv data/mnq_1m.csv")
         return 1
-    df = pd.read_csv(data_path)
+    df = read_bars(data_path)
     for col in ["open", "high", "low", "close"]:
         if col not in df.columns:
             print(f"CSV missing {col}")
@@ -63,18 +363,25 @@ def main():
         df["buy_volume"] = 50
     if "sell_volume" not in df.columns:
         df["sell_volume"] = 50
-    df["bar_idx"] = range(len(df))
-    if (df["buy_volume"] + df["sell_volume"]).mean() > 500:
+    df["bar_idx"] = np.arange(len(df), dtype=np.int32)
+    # Mean total volume from at most ~10k evenly spaced bars (exact for smaller files)
+    step = max(1, len(df) // 10_000)
+    if np.add(df["buy_volume"].to_numpy()[::step], df["sell_volume"].to_numpy()[::step]).mean() > 500:
         total_vol = df["buy_volume"] + df["sell_volume"]
         scale = (120.0 / total_vol.replace(0, 1)).clip(upper=1.0)
         df["buy_volume"] = (df["buy_volume"] * scale).clip(lower=1)
         df["sell_volume"] = (df["sell_volume"] * scale).clip(lower=1)
+    if not args.fp64:
+        # Half the bytes shipped to each worker; quarter-tick NQ prices are exact in float32
+        df = df.astype({c: np.float32 for c in ("open", "high", "low", "close", "buy_volume", "sell_volume")})
 
-    import random
+    # param_key -> (score, metrics): lets the local stage and later runs skip combos already scored
+    cache = {} if args.no_disk_cache else DiskCache(CACHE_DB, df, tick_val)
+    if len(cache):
+        print(f"  {len(cache)} cached results for this data.")
 
     # --- Fine mode: tiny grid around existing best params ---
     if args.fine:
-        out_name = "best_params_mnq_1m.json" if "mnq" in str(data_path).lower() else "best_params_1m.json"
         best_file = ROOT / "data" / out_name
         if not best_file.exists():
             print(f"No {best_file}. Run full optimization first.")
@@ -104,36 +411,23 @@ def main():
         atr_vals = [x for x in atr_vals if 1.2 <= x <= 1.75]
         dd_vals = sorted(set([0.015, 0.02, 0.022, 0.025, b.get("max_daily_drawdown_pct", 0.025)]))
         bte_vals = [2, 3] if b.get("big_trade_edge", 2) == 2 else [2, 3]
-        fine_grid = [
-            {"min_signal_strength": ms, "min_delta": md, "rr_first": r1, "rr_second": r2,
-             "min_delta_multiplier": mdm, "big_trade_edge": bte, "big_trade_threshold": bt,
-             "risk_pct": risk, "atr_stop_multiplier": atr, "max_daily_drawdown_pct": dd_cap}
-            for ms in (ms_vals or [b["min_signal_strength"]])
-            for md in (md_vals or [b["min_delta"]])
-            for r1 in (r1_vals or [b["rr_first"]])
-            for r2 in (r2_vals or [b["rr_second"]])
-            for mdm in (mdm_vals or [b["min_delta_multiplier"]])
-            for bt in (bt_vals or [b["big_trade_threshold"]])
-            for risk in (risk_vals or [b["risk_pct"]])
-            for atr in (atr_vals or [b["atr_stop_multiplier"]])
-            for dd_cap in dd_vals
-            for bte in bte_vals
-        ]
-        fine_grid = random.sample(fine_grid, min(48, len(fine_grid)))
+        fine_space = {
+            "min_signal_strength": ms_vals or [b["min_signal_strength"]],
+            "min_delta": md_vals or [b["min_delta"]],
+            "rr_first": r1_vals or [b["rr_first"]],
+            "rr_second": r2_vals or [b["rr_second"]],
+            "min_delta_multiplier": mdm_vals or [b["min_delta_multiplier"]],
+            "big_trade_threshold": bt_vals or [b["big_trade_threshold"]],
+            "risk_pct": risk_vals or [b["risk_pct"]],
+            "atr_stop_multiplier": atr_vals or [b["atr_stop_multiplier"]],
+            "max_daily_drawdown_pct": dd_vals,
+            "big_trade_edge": bte_vals,
+        }
+        fine_grid = sample_grid(fine_space, 48)
         best_score = -1e9
         best_metrics = None
         best_params = None
-        for i, p in enumerate(fine_grid):
-            res = run_backtest(
-                df, initial_balance=INITIAL_BALANCE, risk_pct=p["risk_pct"],
-                big_trade_threshold=p["big_trade_threshold"], min_delta=p["min_delta"],
-                min_signal_strength=p["min_signal_strength"], rr_first=p["rr_first"],
-                rr_second=p["rr_second"], min_delta_multiplier=p["min_delta_multiplier"],
-                big_trade_edge=p["big_trade_edge"], atr_stop_multiplier=p["atr_stop_multiplier"],
-                max_daily_drawdown_pct=p.get("max_daily_drawdown_pct", 0.03), tick_value=tick_val,
-            )
-            m = res.to_metrics()
-            sc = score(m["win_rate"], m["profit_factor"], m["max_drawdown_pct"], m["total_trades"], m["total_pnl"])
+        for i, (sc, m, p) in enumerate(early_stop(eval_grid(df, tick_val, fine_grid, cache), args.patience, args.min_improvement)):
             if sc > best_score:
                 best_score = sc
                 best_metrics = m
@@ -156,53 +450,50 @@ def main():
         print(f"Saved to {out}")
         return 0
 
-    # Grid tuned for high WR, high PF, low DD (stricter filters + tight DD cap)
-    base = [
-        {"min_signal_strength": ms, "min_delta": md, "rr_first": r1, "rr_second": r2,
-         "min_delta_multiplier": mdm, "big_trade_edge": bte, "big_trade_threshold": bt,
-         "risk_pct": risk, "atr_stop_multiplier": atr, "max_daily_drawdown_pct": dd_cap}
-        for ms in [0.62, 0.64, 0.66, 0.68]   # Stricter = higher WR, fewer bad trades
-        for md in [420, 450, 480, 500]
-        for r1 in [0.52, 0.56, 0.60, 0.62]
-        for r2 in [1.15, 1.22, 1.30, 1.36]
-        for mdm in [1.22, 1.28, 1.34]
-        for bt in [28, 30, 32]
-        for risk in [0.005, 0.006, 0.007]
-        for atr in [1.28, 1.38, 1.46, 1.54]
-        for dd_cap in [0.015, 0.02, 0.025]
-        for bte in [2, 3]
-    ]
     random.seed(789)
     grid_size = 60 if args.quick else 150
-    param_grid = random.sample(base, min(grid_size, len(base)))
+    if args.tpe and optuna is None:
+        print("--tpe needs optuna (pip install optuna); using the random grid.")
+    if args.tpe and optuna is not None and not (args.shard or args.merge_shards):
+        optuna.logging.set_verbosity(optuna.logging.WARNING)
+        results = tpe_search(df, tick_val, grid_size, storage=args.storage, cache=cache)
+        grid_total = grid_size
+    else:
+        # Every shard samples the same seeded grid and keeps its own slice
+        param_grid = sample_grid(BASE_SPACE, grid_size)[shard_i::shard_n]
+        results = eval_grid(df, tick_val, [] if args.merge_shards else param_grid, cache)
+        grid_total = len(param_grid)
 
     best_score = -1e9
     best_metrics = None
     best_params = None
-    for i, p in enumerate(param_grid):
-        res = run_backtest(
-            df,
-            initial_balance=INITIAL_BALANCE,
-            risk_pct=p["risk_pct"],
-            big_trade_threshold=p["big_trade_threshold"],
-            min_delta=p["min_delta"],
-            min_signal_strength=p["min_signal_strength"],
-            rr_first=p["rr_first"],
-            rr_second=p["rr_second"],
-            min_delta_multiplier=p["min_delta_multiplier"],
-            big_trade_edge=p["big_trade_edge"],
-            atr_stop_multiplier=p["atr_stop_multiplier"],
-            max_daily_drawdown_pct=p.get("max_daily_drawdown_pct", 0.03),
-            tick_value=tick_val,
-        )
-        m = res.to_metrics()
-        sc = score(m["win_rate"], m["profit_factor"], m["max_drawdown_pct"], m["total_trades"], m["total_pnl"])
+    for i, (sc, m, p) in enumerate(early_stop(results, args.patience, args.min_improvement)):
         if sc > best_score:
             best_score = sc
             best_metrics = m
             best_params = dict(p)
         if (i + 1) % 16 == 0:
-            print(f"  {i+1}/{len(param_grid)}...")
+            print(f"  {i+1}/{grid_total}...")
+
+    shard_stem = Path(out_name).stem
+    if args.shard:
+        shard_file = ROOT / "data" / f"{shard_stem}.shard{shard_i}of{shard_n}.json"
+        shard_file.parent.mkdir(parents=True, exist_ok=True)
+        with open(shard_file, "w") as f:
+            json.dump({"score": best_score, "metrics": best_metrics, "params": best_params}, f, indent=2)
+        print(f"Shard {shard_i}/{shard_n} best score {best_score:.2f}. Saved to {shard_file}")
+        return 0
+    if args.merge_shards:
+        for k in range(args.merge_shards):
+            shard_file = ROOT / "data" / f"{shard_stem}.shard{k}of{args.merge_shards}.json"
+            if not shard_file.exists():
+                print(f"Missing {shard_file}; run --shard {k}/{args.merge_shards} first.")
+                return 1
+            with open(shard_file) as f:
+                shard = json.load(f)
+            if shard["params"] is not None and shard["score"] > best_score:
+                best_score, best_metrics, best_params = shard["score"], shard["metrics"], shard["params"]
+        print(f"  Merged {args.merge_shards} shards. Best score: {best_score:.2f}")
 
     if best_params is None:
         print("No valid run.")
@@ -221,7 +512,7 @@ def main():
     atr_vals = [max(1.2, b["atr_stop_multiplier"] - 0.06), b["atr_stop_multiplier"], min(1.8, b["atr_stop_multiplier"] + 0.06)]
     dd_vals = sorted(set([0.015, 0.02, 0.025, 0.03, b.get("max_daily_drawdown_pct", 0.03)]))
     bte_vals = sorted(set([2, 3, b.get("big_trade_edge", 2)]))
-    local_grid = [
+    local_grid = (
         {"min_signal_strength": ms, "min_delta": md, "rr_first": r1, "rr_second": r2,
          "min_delta_multiplier": mdm, "big_trade_edge": bte, "big_trade_threshold": bt,
          "risk_pct": risk, "atr_stop_multiplier": atr, "max_daily_drawdown_pct": dd_cap}
@@ -235,35 +526,15 @@ def main():
         for atr in atr_vals
         for dd_cap in dd_vals
         for bte in bte_vals
-    ]
-    # Dedupe and sample (local grid can be large)
-    seen = set()
-    local_list = []
+    )
+    # Dedupe (first occurrence wins) as the grid is generated, then sample
+    unique = {}
     for p in local_grid:
-        key = tuple(sorted((k, round(v, 6) if isinstance(v, float) else v) for k, v in p.items()))
-        if key not in seen:
-            seen.add(key)
-            local_list.append(p)
+        unique.setdefault(param_key(p), p)
+    local_list = list(unique.values())
     local_size = 24 if args.quick else 36
     local_list = random.sample(local_list, min(local_size, len(local_list)))
-    for p in local_list:
-        res = run_backtest(
-            df,
-            initial_balance=INITIAL_BALANCE,
-            risk_pct=p["risk_pct"],
-            big_trade_threshold=p["big_trade_threshold"],
-            min_delta=p["min_delta"],
-            min_signal_strength=p["min_signal_strength"],
-            rr_first=p["rr_first"],
-            rr_second=p["rr_second"],
-            min_delta_multiplier=p["min_delta_multiplier"],
-            big_trade_edge=p["big_trade_edge"],
-            atr_stop_multiplier=p["atr_stop_multiplier"],
-            max_daily_drawdown_pct=p.get("max_daily_drawdown_pct", 0.03),
-            tick_value=tick_val,
-        )
-        m = res.to_metrics()
-        sc = score(m["win_rate"], m["profit_factor"], m["max_drawdown_pct"], m["total_trades"], m["total_pnl"])
+    for sc, m, p in early_stop(eval_grid(df, tick_val, local_list, cache), args.patience, args.min_improvement, best_score):
         if sc > best_score:
             best_score = sc
             best_metrics = m
@@ -277,7 +548,6 @@ def main():
     print(f"  Total Trades:   {best_metrics['total_trades']}")
     print(f"  Total P/L:     ${best_metrics['total_pnl']:,.2f}")
     print(f"  Params: {best_params}")
-    out_name = "best_params_mnq_1m.json" if "mnq" in str(data_path).lower() else "best_params_1m.json"
     out = ROOT / "data" / out_name
     out.parent.mkdir(parents=True, exist_ok=True)
     with open(out, "w") as f:
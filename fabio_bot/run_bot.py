@@ -7,8 +7,9 @@ from __future__ import annotations
 
 import logging
 import os
+import signal
 import sys
-import time
+import threading
 from pathlib import Path
 
 ROOT = Path(__file__).resolve().parent
@@ -76,12 +77,15 @@ def main() -> int:
     logger.info("Bot started. Symbol=%s. Sending heartbeat for dashboard.", symbol)
     push("info", "Tradovate bot started.")
 
-    try:
-        while True:
-            heartbeat()
-            time.sleep(30)
-    except KeyboardInterrupt:
-        logger.info("Bot stopped.")
+    # SIGINT/SIGTERM wake the wait immediately instead of after up to 30s
+    stop = threading.Event()
+    for sig in (signal.SIGINT, signal.SIGTERM):
+        signal.signal(sig, lambda *_: stop.set())
+    while not stop.is_set():
+        heartbeat()
+        stop.wait(30)
+    logger.info("Bot stopped.")
+    client.disconnect()
     return 0
 
 
@@ -4,12 +4,18 @@ Single-file Nasdaq-100 (MNQ) signal script. Copy this ENTIRE file and run anywhe
   - PythonAnywhere: paste into a .py file, then Run.
   - Local: save as run_signal_anywhere.py and run:  python run_signal_anywhere.py
 Uses only stdlib (urllib, json). No pip install. Fetches Yahoo 1m, runs order-flow logic, prints Signal/Entry/SL/TP1/TP2.
+Repeat runs within CACHE_TTL_SEC reuse the last response from the temp dir; pass --no-cache to refetch.
 """
 from __future__ import print_function
 
+import hashlib
 import json
+import os
+import sys
+import tempfile
 import time
 import urllib.request
+from collections import deque
 
 # ---------- Config (tune if you like) ----------
 SYMBOL = "MNQ=F"
@@ -24,9 +30,35 @@ RR_FIRST = 0.58
 RR_SECOND = 1.42
 ATR_STOP_MULT = 1.32
 PIPS = 0.25
+CACHE_TTL_SEC = 90  # reuse the last Yahoo response for repeated runs; --no-cache to bypass
 
 # ---------- Fetch Yahoo Chart API ----------
-def fetch_yahoo_1m(symbol=SYMBOL, period_sec=PERIOD_SEC):
+def _cache_path(symbol, period_sec):
+    key = hashlib.blake2b((symbol + "|" + INTERVAL + "|" + str(period_sec)).encode(), digest_size=8).hexdigest()
+    return os.path.join(tempfile.gettempdir(), "yfcache_" + key + ".json")
+
+
+def _write_cache(cache_path, raw):
+    """Atomic replace, so a concurrent run never reads a half-written response."""
+    tmp = cache_path + ".tmp" + str(os.getpid())
+    try:
+        with open(tmp, "wb") as f:
+            f.write(raw)
+        os.replace(tmp, cache_path)
+    except OSError:
+        pass
+
+
+def fetch_yahoo_1m(symbol=SYMBOL, period_sec=PERIOD_SEC, use_cache=True):
+    cache_path = _cache_path(symbol, period_sec)
+    raw = None
+    if use_cache:
+        try:
+            if time.time() - os.path.getmtime(cache_path) < CACHE_TTL_SEC:
+                with open(cache_path, "rb") as f:
+                    raw = f.read()
+        except OSError:
+            raw = None
     t2 = int(time.time())
     t1 = t2 - period_sec
     url = (
@@ -35,9 +67,12 @@ def fetch_yahoo_1m(symbol=SYMBOL, period_sec=PERIOD_SEC):
         + "&interval=" + INTERVAL + "&events=history"
     )
     req = urllib.request.Request(url, headers={"User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) Chrome/120.0.0.0"})
+    fresh = raw is None
     try:
-        with urllib.request.urlopen(req, timeout=15) as r:
-            data = json.loads(r.read().decode())
+        if fresh:
+            with urllib.request.urlopen(req, timeout=15) as r:
+                raw = r.read()
+        data = json.loads(raw.decode())
     except Exception as e:
         print("Fetch error:", e)
         return []
@@ -45,6 +80,9 @@ def fetch_yahoo_1m(symbol=SYMBOL, period_sec=PERIOD_SEC):
         res = data.get("chart", {}).get("result", [])
         if not res:
             return []
+        if fresh:
+            # Cache only a payload that parsed and has a result: error/rate-limit bodies are never replayed
+            _write_cache(cache_path, raw)
         r0 = res[0]
         ts = r0.get("timestamp", [])
         q = r0.get("indicators", {}).get("quote", [{}])[0]
@@ -57,24 +95,29 @@ def fetch_yahoo_1m(symbol=SYMBOL, period_sec=PERIOD_SEC):
         if n < 50:
             return []
         bars = []
-        for i in range(n):
-            if o[i] is None or c[i] is None:
+        append = bars.append
+        # zip stops at the shortest series (same n as above); stays stdlib-only
+        for _, oi, hi, li, ci, vi in zip(ts, o, h, l_, c, v):
+            if oi is None or ci is None:
                 continue
-            vol = (v[i] or 0) if i < len(v) else 0
-            vol = max(0, float(vol))
+            vol = float(vi or 0)
+            if vol < 0:
+                vol = 0.0
             # Approximate buy/sell from close vs open
-            rng = (h[i] - l_[i]) if (h[i] and l_[i] and h[i] != l_[i]) else 0.25
-            ratio = (c[i] - o[i]) / rng if rng else 0
-            ratio = max(-1, min(1, ratio))
-            buy_pct = 0.5 + 0.5 * ratio
-            buy_vol = vol * buy_pct
+            rng = (hi - li) if (hi and li and hi != li) else 0.25
+            ratio = (ci - oi) / rng
+            if ratio > 1:
+                ratio = 1
+            elif ratio < -1:
+                ratio = -1
+            buy_vol = vol * (0.5 + 0.5 * ratio)
             sell_vol = vol - buy_vol
             if buy_vol < 1:
                 buy_vol = 1
             if sell_vol < 1:
                 sell_vol = 1
-            bars.append({
-                "open": float(o[i]), "high": float(h[i]), "low": float(l_[i]), "close": float(c[i]),
+            append({
+                "open": float(oi), "high": float(hi), "low": float(li), "close": float(ci),
                 "buy_volume": buy_vol, "sell_volume": sell_vol,
             })
         return bars
@@ -90,25 +133,40 @@ class SimpleAnalyzer:
         self.big_thresh = big_thresh
         self.cvd = 0.0
         self.bars = []
-        self.recent_big_buys = []
-        self.recent_big_sells = []
+        # Last 30 bars' big-trade flags, with running sums so counts are O(1)
+        self.recent_big_buys = deque(maxlen=30)
+        self.recent_big_sells = deque(maxlen=30)
+        self._big_buy_sum = 0
+        self._big_sell_sum = 0
         self.vol_at_price = {}
+        # POC kept up to date in push_bar; ties go to the earliest-seen price like max() would
+        self._price_rank = {}
+        self._poc = None
 
     def push_bar(self, o, h, l, c, buy_vol, sell_vol):
         self.cvd += (buy_vol - sell_vol)
         n_big_buy = 1 if buy_vol >= self.big_thresh * 1.2 else 0
         n_big_sell = 1 if sell_vol >= self.big_thresh * 1.2 else 0
+        if len(self.recent_big_buys) == 30:
+            # append below evicts the oldest flag
+            self._big_buy_sum -= self.recent_big_buys[0]
+            self._big_sell_sum -= self.recent_big_sells[0]
         self.recent_big_buys.append(n_big_buy)
         self.recent_big_sells.append(n_big_sell)
-        if len(self.recent_big_buys) > 30:
-            self.recent_big_buys.pop(0)
-            self.recent_big_sells.pop(0)
+        self._big_buy_sum += n_big_buy
+        self._big_sell_sum += n_big_sell
         price = round(c / self.pips) * self.pips
-        self.vol_at_price[price] = self.vol_at_price.get(price, 0) + buy_vol + sell_vol
+        vap = self.vol_at_price
+        vol = vap.get(price, 0) + buy_vol + sell_vol
+        vap[price] = vol
+        rank = self._price_rank.setdefault(price, len(self._price_rank))
+        poc = self._poc
+        if poc is None or vol > vap[poc] or (vol == vap[poc] and rank < self._price_rank[poc]):
+            self._poc = price
         self.bars.append({"open": o, "high": h, "low": l, "close": c, "buy_vol": buy_vol, "sell_vol": sell_vol, "delta": buy_vol - sell_vol})
 
     def get_big_counts(self):
-        return sum(self.recent_big_buys or [0]), sum(self.recent_big_sells or [0])
+        return self._big_buy_sum, self._big_sell_sum
 
     def get_cvd(self):
         return self.cvd
@@ -117,9 +175,9 @@ class SimpleAnalyzer:
         return self.bars[-n:] if self.bars else []
 
     def get_poc(self):
-        if not self.vol_at_price:
+        if self._poc is None:
             return 0.0
-        return max(self.vol_at_price, key=self.vol_at_price.get)
+        return self._poc
 
 
 # ---------- Signal logic ----------
@@ -152,7 +210,7 @@ def get_signal(analyzer, last_price, atr, min_delta=MIN_DELTA, min_mult=MIN_DELT
 # ---------- Main ----------
 def main():
     print("Fetching", SYMBOL, INTERVAL, "data...")
-    bars = fetch_yahoo_1m()
+    bars = fetch_yahoo_1m(use_cache="--no-cache" not in sys.argv)
     if not bars:
         print("No bars. Try again or check symbol.")
         return
@@ -160,18 +218,15 @@ def main():
     analyzer = SimpleAnalyzer()
     atr = 15.0 * PIPS
     last_price = 0.0
-    stop_ticks, t1_ticks, t2_ticks = 20, 12, 36
-    sig = "NONE"
-    strength = 0.0
-    reason = "no_bars"
+    push_bar = analyzer.push_bar
     for b in bars:
         o, h, l, c = b["open"], b["high"], b["low"], b["close"]
-        bv, sv = b["buy_volume"], b["sell_volume"]
-        analyzer.push_bar(o, h, l, c, bv, sv)
+        push_bar(o, h, l, c, b["buy_volume"], b["sell_volume"])
         last_price = c
         if (h - l) > 0:
             atr = (h - l) * 0.5 + atr * 0.5
-        sig, strength, reason, stop_ticks, t1_ticks, t2_ticks = get_signal(analyzer, last_price, atr)
+    # Only the signal on the latest bar is reported, so evaluate it once after the replay
+    sig, strength, reason, stop_ticks, t1_ticks, t2_ticks = get_signal(analyzer, last_price, atr)
 
     # SL/TP prices
     if sig == "LONG":
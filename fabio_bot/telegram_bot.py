@@ -8,11 +8,17 @@ Env: TELEGRAM_BOT_TOKEN, TELEGRAM_CHAT_ID.
 """
 from __future__ import annotations
 
+import functools
+import itertools
 import json
 import logging
 import os
 import sys
+import threading
 import time
+import urllib.error
+import urllib.parse
+import urllib.request
 from concurrent.futures import ThreadPoolExecutor, TimeoutError as FuturesTimeoutError
 from pathlib import Path
 from typing import Optional
@@ -20,8 +26,21 @@ from typing import Optional
 ROOT = Path(__file__).resolve().parent
 sys.path.insert(0, str(ROOT))
 
+import numpy as np
 import pandas as pd
 
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+try:
+    import requests
+    from requests.adapters import HTTPAdapter
+    from urllib3.util.retry import Retry
+except ImportError:
+    requests = None
+
 logging.basicConfig(
     level=logging.INFO,
     format="%(asctime)s [%(levelname)s] %(name)s: %(message)s",
@@ -29,8 +48,23 @@ logging.basicConfig(
 )
 logger = logging.getLogger("telegram_bot")
 
+# Keep-alive sessions for api.telegram.org so each call reuses a pooled TLS connection. The
+# getUpdates long poll gets its own pool so a 50s hold never competes with reply sends.
+# Retries cover connection failures only (urllib3 never re-sends a POST after a read error).
+_SESSION = _POLL_SESSION = None
+if requests is not None:
+    _SESSION = requests.Session()
+    _SESSION.mount("https://", HTTPAdapter(pool_connections=4, pool_maxsize=32, max_retries=Retry(total=2, backoff_factor=0.1)))
+    _POLL_SESSION = requests.Session()
+    _POLL_SESSION.mount("https://", HTTPAdapter(pool_connections=1, pool_maxsize=2))
+
+# Fans out the sendMessage/answerCallbackQuery POSTs for a burst of button taps
+_REPLY_POOL = ThreadPoolExecutor(max_workers=8, thread_name_prefix="telegram-reply")
+
 # Load config
+@functools.lru_cache(maxsize=1)
 def _load_config():
+    """config.yaml as a dict, parsed once per process; callers only read it."""
     cfg = {}
     try:
         from fabio_bot.config_loader import load_config
@@ -39,28 +73,99 @@ def _load_config():
         pass
     return cfg
 
+MNQ_PARAMS_PATH = ROOT / "data" / "best_params_mnq_1m.json"
+
+
+@functools.lru_cache(maxsize=4)
+def _cached_json(path_str: str, mtime_ns: int) -> dict:
+    """Parsed JSON for path at a given mtime; a rewrite of the file changes the key."""
+    with open(path_str) as f:
+        return json.load(f)
+
+
+def _read_json(p_path: Path) -> dict:
+    """Read a JSON file, re-parsing only when it has changed on disk. Raises OSError/ValueError."""
+    return _cached_json(str(p_path), p_path.stat().st_mtime_ns)
+
+
 def _load_mnq_params():
-    p_path = ROOT / "data" / "best_params_mnq_1m.json"
-    if not p_path.exists():
-        return {}
     try:
-        with open(p_path) as f:
-            return json.load(f).get("params", {})
+        return dict(_read_json(MNQ_PARAMS_PATH).get("params", {}))
     except Exception:
         return {}
 
+_FORM_HEADERS = {"Content-Type": "application/x-www-form-urlencoded"}
+
+
+def _post_form(url: str, payload, timeout: float) -> int:
+    """POST a form (dict, or an already-encoded body) and return the HTTP status. Uses the pooled
+    session; falls back to urllib (one connection per call) when requests is not installed."""
+    data = payload if isinstance(payload, bytes) else urllib.parse.urlencode(payload).encode()
+    if _SESSION is not None:
+        return _SESSION.post(url, data=data, headers=_FORM_HEADERS, timeout=timeout).status_code
+    req = urllib.request.Request(url, data=data, method="POST", headers=_FORM_HEADERS)
+    try:
+        with urllib.request.urlopen(req, timeout=timeout) as resp:
+            return resp.status
+    except urllib.error.HTTPError as e:
+        return e.code
+
+
+def _loads(content: bytes):
+    """Decode a getUpdates body; orjson when installed (15 nested updates per long poll)."""
+    if orjson is not None:
+        return orjson.loads(content)
+    return json.loads(content)
+
+
+def _dumps(obj) -> str:
+    if orjson is not None:
+        return orjson.dumps(obj).decode()
+    return json.dumps(obj)
+
+
+# Body of a getUpdates poll with nothing pending (the common idle case)
+_NO_UPDATES = b'{"ok":true,"result":[]}'
+
+
+def _get_json(url: str, timeout: float) -> dict:
+    if _POLL_SESSION is not None:
+        resp = _POLL_SESSION.get(url, timeout=timeout)
+        resp.raise_for_status()  # 401/409 etc. must reach the caller's backoff, like urllib's HTTPError
+        raw = resp.content
+    else:
+        with urllib.request.urlopen(url, timeout=timeout) as resp:
+            raw = resp.read()
+    if raw == _NO_UPDATES:
+        return {"ok": True, "result": []}
+    return _loads(raw)
+
+
+@functools.lru_cache(maxsize=4)
+def _bot_urls(token: str) -> tuple:
+    """(sendMessage, answerCallbackQuery, getUpdates) endpoints, built once per token."""
+    base = f"https://api.telegram.org/bot{token}/"
+    return base + "sendMessage", base + "answerCallbackQuery", base + "getUpdates?limit=15"
+
+
+@functools.lru_cache(maxsize=16)
+def _chat_prefix(chat_id: str) -> bytes:
+    """Encoded chat_id/parse_mode fields; only the text varies between sends to a chat."""
+    return urllib.parse.urlencode({"chat_id": chat_id, "parse_mode": "HTML"}).encode()
+
+
 def _send_telegram(token: str, chat_id: str, text: str, reply_markup: Optional[dict] = None) -> bool:
     try:
-        import urllib.request
-        import urllib.parse
-        url = f"https://api.telegram.org/bot{token}/sendMessage"
-        payload = {"chat_id": chat_id, "text": text, "parse_mode": "HTML"}
-        if reply_markup:
-            payload["reply_markup"] = json.dumps(reply_markup)
-        data = urllib.parse.urlencode(payload).encode()
-        req = urllib.request.Request(url, data=data, method="POST", headers={"Content-Type": "application/x-www-form-urlencoded"})
-        with urllib.request.urlopen(req, timeout=10) as resp:
-            return resp.status == 200
+        url = _bot_urls(token)[0]
+        body = _chat_prefix(chat_id) + b"&text=" + urllib.parse.quote_from_bytes(text.encode(), safe=b"").encode()
+        if reply_markup is _INLINE_MENU:
+            body += _INLINE_MENU_FIELD
+        elif reply_markup:
+            body += b"&reply_markup=" + urllib.parse.quote(_dumps(reply_markup), safe="").encode()
+        status = _post_form(url, body, timeout=10)
+        if status != 200:
+            logger.warning("Telegram send failed: HTTP %s", status)
+        return status == 200
     except Exception as e:
         logger.warning("Telegram send failed: %s", e)
         return False
@@ -69,72 +174,77 @@ def _send_telegram(token: str, chat_id: str, text: str, reply_markup: Optional[d
 def _answer_callback(token: str, callback_query_id: str) -> bool:
     """Answer a callback query so Telegram clears the loading state. 400 = already answered or expired (expected)."""
     try:
-        import urllib.request
-        import urllib.parse
-        import urllib.error
-        url = f"https://api.telegram.org/bot{token}/answerCallbackQuery"
+        url = _bot_urls(token)[1]
         # Telegram expects callback_query_id as string
         cq_id_str = str(callback_query_id).strip()
         if not cq_id_str:
             return False
-        data = urllib.parse.urlencode({"callback_query_id": cq_id_str}).encode()
-        req = urllib.request.Request(url, data=data, method="POST", headers={"Content-Type": "application/x-www-form-urlencoded"})
-        with urllib.request.urlopen(req, timeout=5) as resp:
-            return resp.status == 200
-    except urllib.error.HTTPError as e:
-        if e.code == 400:
+        status = _post_form(url, {"callback_query_id": cq_id_str}, timeout=5)
+        if status == 400:
             # Query already answered or expired (normal when processing is delayed)
-            logger.debug("answerCallbackQuery 400 (already answered or expired): %s", e.reason)
-        else:
-            logger.warning("answerCallbackQuery failed: %s", e)
-        return False
+            logger.debug("answerCallbackQuery 400 (already answered or expired)")
+        elif status != 200:
+            logger.warning("answerCallbackQuery failed: HTTP %s", status)
+        return status == 200
     except Exception as e:
         logger.warning("answerCallbackQuery failed: %s", e)
         return False
 
 
+# Inline keyboard for main menu (tap instead of typing commands); shared, treat as read-only
+_INLINE_MENU = {
+    "inline_keyboard": [
+        [
+            {"text": "Status", "callback_data": "status"},
+            {"text": "Strategy", "callback_data": "strategy"},
+        ],
+        [
+            {"text": "Params", "callback_data": "params"},
+            {"text": "Settings", "callback_data": "settings"},
+        ],
+        [{"text": "Help", "callback_data": "help"}],
+    ]
+}
+# Its sendMessage form field, serialized and percent-encoded once
+_INLINE_MENU_FIELD = b"&reply_markup=" + urllib.parse.quote(_dumps(_INLINE_MENU), safe="").encode()
+
+
 def _inline_menu() -> dict:
     """Inline keyboard for main menu (tap instead of typing commands)."""
-    return {
-        "inline_keyboard": [
-            [
-                {"text": "Status", "callback_data": "status"},
-                {"text": "Strategy", "callback_data": "strategy"},
-            ],
-            [
-                {"text": "Params", "callback_data": "params"},
-                {"text": "Settings", "callback_data": "settings"},
-            ],
-            [{"text": "Help", "callback_data": "help"}],
-        ]
-    }
+    return _INLINE_MENU
 
 
 # --- Formatted replies for commands ---
+# /start and /help never change, so they are built once at import
+_START_TEXT = (
+    "<b>Fabio Bot – Order Flow Signals</b>\n\n"
+    "I send MNQ/NQ trading signals and status.\n\n"
+    "<b>Commands</b>\n"
+    "/status  – Last cycle (bars, signal, strength)\n"
+    "/strategy – Backtest win rate &amp; metrics\n"
+    "/params  – Strategy parameters\n"
+    "/settings – Bot config (symbol, filters)\n"
+    "/help    – This list\n\n"
+    "Signals use Yahoo 1m data (volume approximated)."
+)
+
+_HELP_TEXT = (
+    "<b>Commands</b>\n"
+    "/start   – Welcome &amp; command list\n"
+    "/status  – Last run: bars, signal, strength, reason\n"
+    "/strategy – Win rate, profit factor, max DD (from backtest)\n"
+    "/params  – min_strength, min_delta, R:R, etc.\n"
+    "/settings – Symbol, interval, ML filter, regime filter\n"
+    "/help    – Show this"
+)
+
+
 def _format_start() -> str:
-    return (
-        "<b>Fabio Bot – Order Flow Signals</b>\n\n"
-        "I send MNQ/NQ trading signals and status.\n\n"
-        "<b>Commands</b>\n"
-        "/status  – Last cycle (bars, signal, strength)\n"
-        "/strategy – Backtest win rate &amp; metrics\n"
-        "/params  – Strategy parameters\n"
-        "/settings – Bot config (symbol, filters)\n"
-        "/help    – This list\n\n"
-        "Signals use Yahoo 1m data (volume approximated)."
-    )
+    return _START_TEXT
 
 
 def _format_help() -> str:
-    return (
-        "<b>Commands</b>\n"
-        "/start   – Welcome &amp; command list\n"
-        "/status  – Last run: bars, signal, strength, reason\n"
-        "/strategy – Win rate, profit factor, max DD (from backtest)\n"
-        "/params  – min_strength, min_delta, R:R, etc.\n"
-        "/settings – Symbol, interval, ML filter, regime filter\n"
-        "/help    – Show this"
-    )
+    return _HELP_TEXT
 
 
 def _format_status(state: dict) -> str:
@@ -159,12 +269,10 @@ def _format_status(state: dict) -> str:
 
 
 def _format_strategy() -> str:
-    p_path = ROOT / "data" / "best_params_mnq_1m.json"
-    if not p_path.exists():
+    if not MNQ_PARAMS_PATH.exists():
         return "<b>Strategy</b>\nNo backtest metrics found (run backtest and save to data/best_params_mnq_1m.json)."
     try:
-        with open(p_path) as f:
-            data = json.load(f)
+        data = _read_json(MNQ_PARAMS_PATH)
     except Exception:
         return "<b>Strategy</b>\nCould not read metrics."
     m = data.get("metrics", {})
@@ -190,8 +298,18 @@ def _format_params() -> str:
     params = _load_mnq_params()
     if not params:
         return "<b>Params</b>\nNo saved params (data/best_params_mnq_1m.json)."
+    items = tuple(sorted(params.items()))
+    try:
+        hash(items)
+    except TypeError:  # a list/dict value (hand-edited file) cannot key the cache
+        return _render_params.__wrapped__(items)
+    return _render_params(items)
+
+
+@functools.lru_cache(maxsize=8)
+def _render_params(items: tuple) -> str:
     lines = ["<b>Strategy parameters</b>\n"]
-    for k, v in sorted(params.items()):
+    for k, v in items:
         if isinstance(v, float) and 0 < v < 1 and "pct" not in k.lower():
             lines.append(f"{k}: {v:.3f}")
         elif isinstance(v, float):
@@ -211,6 +329,11 @@ def _format_settings(cfg: dict) -> str:
     use_ml = tg.get("use_ml_filter", False)
     use_regime = tg.get("use_regime_filter", True)
     model_path = ml.get("model_path", "data/ml_signal_model.pkl")
+    return _render_settings(symbol, interval, period, interval_sec, use_ml, use_regime, model_path)
+
+
+@functools.lru_cache(maxsize=8)
+def _render_settings(symbol, interval, period, interval_sec, use_ml, use_regime, model_path) -> str:
     return (
         "<b>Settings</b>\n\n"
         f"Symbol: {symbol}\n"
@@ -222,7 +345,60 @@ def _format_settings(cfg: dict) -> str:
     )
 
 
-def _update_open_trade(open_trade: dict, last_price: float, token: str, chat_id: str, symbol: str) -> None:
+def _scale_volume(df: pd.DataFrame, data_source: str) -> None:
+    """Scale buy/sell volume in place so the strategy (tuned for ~hundreds delta) sees comparable magnitude."""
+    # Own float64 copies, so the scaling below can run in place
+    bv = df["buy_volume"].to_numpy(dtype=np.float64, copy=True)
+    sv = df["sell_volume"].to_numpy(dtype=np.float64, copy=True)
+    total = bv + sv
+    total[total == 0] = 1.0
+    mean_vol = float(np.nanmean(total))
+    if mean_vol > 500:
+        scale = 120.0 / mean_vol
+        if scale >= 1.0:
+            return
+    elif data_source in ("binance", "alpaca") and 0 < mean_vol < 400:
+        scale = 120.0 / mean_vol
+    else:
+        return
+    for col, arr in (("buy_volume", bv), ("sell_volume", sv)):
+        np.multiply(arr, scale, out=arr)
+        np.maximum(arr, 1.0, out=arr)
+        df[col] = arr
+
+
+# Outgoing trade messages; LONG and SHORT share one layout per event
+_TPL_SIGNAL = (
+    "<b>Signal {direction}</b> {label}\n\n"
+    "Entry: {entry:.2f}\n"
+    "SL: {sl:.2f}\n"
+    "TP1: {tp1:.2f}\n"
+    "TP2: {tp2:.2f}\n\n"
+    "Strength: {strength:.2f}  ·  R:R {rr1:.2f} / {rr2:.2f}"
+)
+_TPL_TP2 = "<b>TP2 hit</b> {label} {direction}\nEntry: {entry:.2f}\nExit: {exit:.2f}\nResult: +{result:.2f}"
+_TPL_TP1 = "<b>TP1 hit</b> {label} {direction}\nSL moved to breakeven at {entry:.2f}"
+_TPL_SL = "<b>SL hit</b> {label} {direction}\nEntry: {entry:.2f}\nExit: {exit:.2f}\nResult: {result:.2f}"
+
+
+def _format_signal(direction, label, entry, sl, tp1, tp2, strength, rr1, rr2) -> str:
+    """Signal alert text. Inputs are rounded to the 2 dp the message shows before the cached render,
+    so arbitrary strength / R:R floats still hit the cache (and the output is unchanged)."""
+    return _render_signal(
+        direction, label, round(entry, 2), round(sl, 2), round(tp1, 2), round(tp2, 2),
+        round(strength, 2), round(rr1, 2), round(rr2, 2),
+    )
+
+
+@functools.lru_cache(maxsize=256)
+def _render_signal(direction, label, entry, sl, tp1, tp2, strength, rr1, rr2) -> str:
+    return _TPL_SIGNAL.format(
+        direction=direction, label=label, entry=entry, sl=sl, tp1=tp1, tp2=tp2,
+        strength=strength, rr1=rr1, rr2=rr2,
+    )
+
+
+def _update_open_trade(open_trade: dict, last_price: float, token: str, chat_id: str, label: str) -> None:
     """
     Simple trailing logic for the last signal:
     - LONG: if price hits TP2 -> close; if hits TP1 first -> move SL to BE; if falls to SL -> stopped.
@@ -243,11 +419,7 @@ def _update_open_trade(open_trade: dict, last_price: float, token: str, chat_id:
     if direction == "LONG":
         # Full target first
         if not tp2_hit and last_price >= tp2:
-            msg = (
-                f"<b>TP2 hit</b> {symbol.replace('=F', '').strip()} LONG\n"
-                f"Entry: {entry:.2f}\nExit: {last_price:.2f}\n"
-                f"Result: +{last_price - entry:.2f}"
-            )
+            msg = _TPL_TP2.format(label=label, direction="LONG", entry=entry, exit=last_price, result=last_price - entry)
             _send_telegram(token, chat_id, msg)
             open_trade["active"] = False
             open_trade["tp2_hit"] = True
@@ -256,19 +428,12 @@ def _update_open_trade(open_trade: dict, last_price: float, token: str, chat_id:
         if not moved_to_be and last_price >= tp1:
             open_trade["sl"] = entry
             open_trade["moved_to_be"] = True
-            msg = (
-                f"<b>TP1 hit</b> {symbol.replace('=F', '').strip()} LONG\n"
-                f"SL moved to breakeven at {entry:.2f}"
-            )
+            msg = _TPL_TP1.format(label=label, direction="LONG", entry=entry)
             _send_telegram(token, chat_id, msg)
             return
         # Stop loss
         if last_price <= sl:
-            msg = (
-                f"<b>SL hit</b> {symbol.replace('=F', '').strip()} LONG\n"
-                f"Entry: {entry:.2f}\nExit: {last_price:.2f}\n"
-                f"Result: {last_price - entry:.2f}"
-            )
+            msg = _TPL_SL.format(label=label, direction="LONG", entry=entry, exit=last_price, result=last_price - entry)
             _send_telegram(token, chat_id, msg)
             open_trade["active"] = False
             return
@@ -276,11 +441,7 @@ def _update_open_trade(open_trade: dict, last_price: float, token: str, chat_id:
     # SHORT trade
     if direction == "SHORT":
         if not tp2_hit and last_price <= tp2:
-            msg = (
-                f"<b>TP2 hit</b> {symbol.replace('=F', '').strip()} SHORT\n"
-                f"Entry: {entry:.2f}\nExit: {last_price:.2f}\n"
-                f"Result: +{entry - last_price:.2f}"
-            )
+            msg = _TPL_TP2.format(label=label, direction="SHORT", entry=entry, exit=last_price, result=entry - last_price)
             _send_telegram(token, chat_id, msg)
             open_trade["active"] = False
             open_trade["tp2_hit"] = True
@@ -288,39 +449,35 @@ def _update_open_trade(open_trade: dict, last_price: float, token: str, chat_id:
         if not moved_to_be and last_price <= tp1:
             open_trade["sl"] = entry
             open_trade["moved_to_be"] = True
-            msg = (
-                f"<b>TP1 hit</b> {symbol.replace('=F', '').strip()} SHORT\n"
-                f"SL moved to breakeven at {entry:.2f}"
-            )
+            msg = _TPL_TP1.format(label=label, direction="SHORT", entry=entry)
             _send_telegram(token, chat_id, msg)
             return
         if last_price >= sl:
-            msg = (
-                f"<b>SL hit</b> {symbol.replace('=F', '').strip()} SHORT\n"
-                f"Entry: {entry:.2f}\nExit: {last_price:.2f}\n"
-                f"Result: {entry - last_price:.2f}"
-            )
+            msg = _TPL_SL.format(label=label, direction="SHORT", entry=entry, exit=last_price, result=entry - last_price)
             _send_telegram(token, chat_id, msg)
             open_trade["active"] = False
             return
 
 
-def _handle_commands(token: str, state: dict, cfg: dict) -> None:
-    """Poll getUpdates; handle button taps (callback_query) and text commands. Uses state['last_update_id'] for offset."""
+def _handle_commands(token: str, state: dict, cfg: dict, poll_timeout: int = 2) -> bool:
+    """Poll getUpdates; handle button taps (callback_query) and text commands. Uses state['last_update_id'] for offset.
+    poll_timeout is Telegram's long-poll hold time. Returns False if getUpdates itself failed."""
     try:
-        import urllib.request
         offset = state.get("last_update_id", -1) + 1
-        url = f"https://api.telegram.org/bot{token}/getUpdates?timeout=2&limit=15&offset={offset}"
-        with urllib.request.urlopen(url, timeout=5) as resp:
-            data = json.loads(resp.read().decode())
+        url = f"{_bot_urls(token)[2]}&timeout={poll_timeout}&offset={offset}"
+        data = _get_json(url, timeout=poll_timeout + 10)
     except Exception:
-        return
+        return False
+    if not data.get("ok"):
+        return False  # e.g. {"ok":false,"error_code":409}: another instance polls this token
     results = data.get("result", [])
     if not results:
-        return
-    state["last_update_id"] = max(upd["update_id"] for upd in results)
+        return True
+    state["last_update_id"] = results[-1]["update_id"]  # getUpdates returns ascending update_id
 
-    # 1) Handle all button taps first (callback_query) so every button gets a reply
+    # 1) Handle all button taps first (callback_query) so every button gets a reply;
+    #    the POSTs run concurrently so K taps cost about one round-trip, not 2*K
+    calls = []
     for upd in results:
         cq = upd.get("callback_query")
         if not cq:
@@ -343,8 +500,10 @@ def _handle_commands(token: str, state: dict, cfg: dict) -> None:
             body = _format_help()
         else:
             body = "Use /help for commands."
-        _send_telegram(token, reply_chat, body)
-        _answer_callback(token, str(cq_id))
+        calls.append((_send_telegram, (token, reply_chat, body)))
+        calls.append((_answer_callback, (token, str(cq_id))))
+    if calls:
+        list(_REPLY_POOL.map(lambda call: call[0](*call[1]), calls))
 
     # 2) Handle one text command per cycle (/start, /status, etc.)
     for upd in results:
@@ -375,6 +534,34 @@ def _handle_commands(token: str, state: dict, cfg: dict) -> None:
         else:
             _send_telegram(token, reply_chat, "Use /help for commands.", reply_markup=_inline_menu())
         break  # one text command per cycle
+    return True
+
+
+def _poll_updates_forever(token: str, state: dict, cfg: dict, stop: threading.Event) -> None:
+    """Long-poll getUpdates (Telegram holds the request up to 50s) so taps are answered as they arrive."""
+    while not stop.is_set():
+        if not _handle_commands(token, state, cfg, poll_timeout=50):
+            stop.wait(5)  # network/API error: back off instead of spinning
+
+
+def _build_filters(use_ml: bool, use_regime: bool) -> tuple:
+    """(ml_filter, regime_detector); either is None when disabled or unavailable."""
+    ml_filter = None
+    if use_ml:
+        try:
+            from fabio_bot.ml_filter import MLSignalFilter
+            ml_filter = MLSignalFilter(ROOT / "data" / "ml_signal_model.pkl", threshold=0.52)
+        except Exception as e:
+            logger.warning("ML filter disabled: %s", e)
+    regime_detector = None
+    if use_regime:
+        try:
+            from fabio_bot.ml_filter import RegimeDetector
+            regime_detector = RegimeDetector(window=20, allowed_regimes=(0, 1))
+        except Exception as e:
+            logger.warning("Regime filter disabled: %s", e)
+    return ml_filter, regime_detector
+
 
 def main():
     cfg = _load_config()
@@ -397,6 +584,7 @@ def main():
         display_symbol = binance_symbol
     else:
         display_symbol = symbol
+    label = display_symbol.replace("=F", "").strip()  # symbol as shown in signal/trailing messages
     interval = telegram_cfg.get("interval", "1m")
     period = telegram_cfg.get("period", "7d")
     interval_sec = telegram_cfg.get("interval_seconds", 60)
@@ -418,23 +606,11 @@ def main():
     except ImportError:
         logger.error("fetch_market_data not available. pip install yfinance")
         return 1
-    from backtest import get_latest_signal
-    from fabio_bot.signal_generator import Signal
-
-    ml_filter = None
-    if use_ml:
-        try:
-            from fabio_bot.ml_filter import MLSignalFilter
-            ml_filter = MLSignalFilter(ROOT / "data" / "ml_signal_model.pkl", threshold=0.52)
-        except Exception as e:
-            logger.warning("ML filter disabled: %s", e)
-    regime_detector = None
-    if use_regime:
-        try:
-            from fabio_bot.ml_filter import RegimeDetector
-            regime_detector = RegimeDetector(window=20, allowed_regimes=(0, 1))
-        except Exception as e:
-            logger.warning("Regime filter disabled: %s", e)
+    # Signal stack and the filters (ml_filter pulls in sklearn/joblib) load on first use:
+    # the backtest module once bars arrive, the filters once a signal reaches them
+    get_latest_signal = Signal = None
+    filters_ready = False
+    ml_filter = regime_detector = None
 
     logger.info("Telegram signal bot started. data_source=%s, symbol=%s, interval=%ss, ML=%s, regime=%s", data_source, display_symbol, interval_sec, use_ml, use_regime)
     logger.info("Commands: /start /status /strategy /params /settings /help")
@@ -455,56 +631,62 @@ def main():
     last_strength = 0.0
     last_reason = "no_setup"
     n_bars_last = 0
+    # Commands are served by a long-polling thread; it reads the state dict this loop updates
+    stop = threading.Event()
+    threading.Thread(
+        target=_poll_updates_forever, args=(token, state, cfg, stop), name="telegram-updates", daemon=True
+    ).start()
     try:
-        with ThreadPoolExecutor(max_workers=1) as pool:
-            while True:
+        # Several workers so a fetch that outlives its 35s timeout doesn't queue the next
+        # cycle's fetch (or the Yahoo fallback) behind it
+        with ThreadPoolExecutor(max_workers=4, thread_name_prefix="bot") as pool:
+            # A fetch still running at the 35s mark is kept rather than abandoned: the next
+            # cycle takes its (late) result instead of starting a duplicate request.
+            future = None
+            # Every cycle ends the same way, so the single sleep sits at the top of the next one;
+            # /status keeps showing the last good cycle whenever this one bails out early
+            for cycle in itertools.count():
+                if cycle:
+                    time.sleep(interval_sec)
+                fetching = data_source  # which fetch a timeout below belongs to
                 try:
-                    if data_source == "binance":
-                        future = pool.submit(fetch_binance_1m, symbol=binance_symbol)
-                    elif data_source == "alpaca":
-                        future = pool.submit(
-                            fetch_alpaca_1m,
-                            symbol=alpaca_symbol,
-                            key_id=alpaca_key_id or None,
-                            secret_key=alpaca_secret_key or None,
-                        )
-                    else:
-                        future = pool.submit(fetch_nq_or_mnq_1m, symbol=symbol, interval=interval, period=period)
+                    if future is None:
+                        if data_source == "binance":
+                            future = pool.submit(fetch_binance_1m, symbol=binance_symbol)
+                        elif data_source == "alpaca":
+                            future = pool.submit(
+                                fetch_alpaca_1m,
+                                symbol=alpaca_symbol,
+                                key_id=alpaca_key_id or None,
+                                secret_key=alpaca_secret_key or None,
+                            )
+                        else:
+                            future = pool.submit(fetch_nq_or_mnq_1m, symbol=symbol, interval=interval, period=period)
                     df, data_symbol = future.result(timeout=35)
+                    future = None
                     # If Alpaca returns 403/empty, fall back to Yahoo (MNQ) so bot still runs
                     min_bars = 50 if data_source == "alpaca" else 100
                     if data_source == "alpaca" and (df.empty or len(df) < min_bars):
-                        df, data_symbol = fetch_nq_or_mnq_1m(symbol=symbol, interval=interval, period=period)
+                        fetching = "yahoo fallback"
+                        df, data_symbol = pool.submit(
+                            fetch_nq_or_mnq_1m, symbol=symbol, interval=interval, period=period
+                        ).result(timeout=35)
                         if not df.empty and len(df) >= 100:
                             logger.info("Alpaca failed or too few bars; using Yahoo %s for this cycle", data_symbol)
                 except FuturesTimeoutError:
-                    logger.warning("Fetch timed out (35s)")
-                    state["n_bars"] = n_bars_last
-                    state["signal"] = last_sig_str
-                    state["strength"] = last_strength
-                    state["reason"] = last_reason
-                    _handle_commands(token, state, cfg)
-                    time.sleep(interval_sec)
+                    if future is not None:
+                        logger.warning("%s fetch timed out (35s); keeping last data, result picked up next cycle", fetching)
+                    else:
+                        logger.warning("%s fetch timed out (35s); keeping last data, retrying next cycle", fetching)
                     continue
                 except Exception as e:
                     logger.warning("Fetch error: %s", e)
-                    state["n_bars"] = n_bars_last
-                    state["signal"] = last_sig_str
-                    state["strength"] = last_strength
-                    state["reason"] = last_reason
-                    _handle_commands(token, state, cfg)
-                    time.sleep(interval_sec)
+                    future = None
                     continue
 
                 min_bars = 50 if data_source == "alpaca" else 100
                 if df.empty or len(df) < min_bars:
                     logger.warning("No data for %s (tried %s, got %d bars)", display_symbol, data_symbol, len(df) if not df.empty else 0)
-                    state["n_bars"] = n_bars_last
-                    state["signal"] = last_sig_str
-                    state["strength"] = last_strength
-                    state["reason"] = last_reason
-                    _handle_commands(token, state, cfg)
-                    time.sleep(interval_sec)
                     continue
                 if data_source not in ("binance", "alpaca") and data_symbol != symbol:
                     logger.debug("Using %s for data (signals apply to %s)", data_symbol, symbol)
@@ -515,27 +697,19 @@ def main():
                     df["buy_volume"] = 50
                 if "sell_volume" not in df.columns:
                     df["sell_volume"] = 50
-                df["bar_idx"] = range(len(df))
-                total_vol = df["buy_volume"] + df["sell_volume"]
-                # Scale volume so strategy (tuned for ~hundreds delta) sees comparable magnitude
-                mean_vol = total_vol.replace(0, 1).mean()
-                if mean_vol > 500:
-                    scale = (120.0 / mean_vol)
-                    if scale < 1.0:
-                        df["buy_volume"] = (df["buy_volume"] * scale).clip(lower=1)
-                        df["sell_volume"] = (df["sell_volume"] * scale).clip(lower=1)
-                elif (data_source == "binance" or data_source == "alpaca") and mean_vol > 0 and mean_vol < 400:
-                    scale = 120.0 / mean_vol
-                    df["buy_volume"] = (df["buy_volume"] * scale).clip(lower=1)
-                    df["sell_volume"] = (df["sell_volume"] * scale).clip(lower=1)
+                df["bar_idx"] = np.arange(len(df), dtype=np.int32)
+                _scale_volume(df, data_source)
 
                 # Trailing updates for any open trade (using last close)
                 try:
-                    last_close = float(df["close"].iloc[-1])
-                    _update_open_trade(open_trade, last_close, token, chat_id, display_symbol)
+                    last_close = float(df["close"].iat[-1])
+                    _update_open_trade(open_trade, last_close, token, chat_id, label)
                 except Exception:
                     pass
 
+                if get_latest_signal is None:
+                    from backtest import get_latest_signal
+                    from fabio_bot.signal_generator import Signal
                 sig, strength, price, features = get_latest_signal(
                     df,
                     min_signal_strength=min_strength,
@@ -561,42 +735,29 @@ def main():
 
                 bar_idx = len(df) - 1
                 if sig == Signal.NONE or strength < min_strength:
-                    _handle_commands(token, state, cfg)
-                    time.sleep(interval_sec)
                     continue
 
+                if not filters_ready:
+                    filters_ready = True
+                    ml_filter, regime_detector = _build_filters(use_ml, use_regime)
                 if regime_detector and not regime_detector.should_trade(df, bar_idx):
                     logger.debug("Regime filter: skip")
-                    _handle_commands(token, state, cfg)
-                    time.sleep(interval_sec)
                     continue
 
                 if ml_filter and not ml_filter.should_take_signal(features):
                     logger.debug("ML filter: skip (P(win)=%.2f)", ml_filter.predict_win_probability(features))
-                    _handle_commands(token, state, cfg)
-                    time.sleep(interval_sec)
                     continue
 
                 if bar_idx == last_signal_bar:
-                    _handle_commands(token, state, cfg)
-                    time.sleep(interval_sec)
                     continue
                 last_signal_bar = bar_idx
 
                 direction = "LONG" if sig == Signal.LONG else "SHORT"
-                label = display_symbol.replace("=F", "").strip()
                 entry = price
                 sl = features.get("sl_price", entry)
                 tp1 = features.get("tp1_price", entry)
                 tp2 = features.get("tp2_price", entry)
-                msg = (
-                    f"<b>Signal {direction}</b> {label}\n\n"
-                    f"Entry: {entry:.2f}\n"
-                    f"SL: {sl:.2f}\n"
-                    f"TP1: {tp1:.2f}\n"
-                    f"TP2: {tp2:.2f}\n\n"
-                    f"Strength: {strength:.2f}  ·  R:R {rr1:.2f} / {rr2:.2f}"
-                )
+                msg = _format_signal(direction, label, entry, sl, tp1, tp2, strength, rr1, rr2)
                  # Track open trade for trailing notifications
                 open_trade.clear()
                 open_trade.update(
@@ -613,10 +774,10 @@ def main():
                 )
                 if _send_telegram(token, chat_id, msg):
                     logger.info("Sent %s at %.2f", direction, price)
-                _handle_commands(token, state, cfg)
-                time.sleep(interval_sec)
     except KeyboardInterrupt:
         logger.info("Stopped")
+    finally:
+        stop.set()
 
 if __name__ == "__main__":
     sys.exit(main() or 0)
@@ -9,16 +9,52 @@ import json
 import logging
 import os
 import sys
+import time
 from pathlib import Path
 
+import numpy as np
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
 ROOT = Path(__file__).resolve().parent
 sys.path.insert(0, str(ROOT))
 os.chdir(ROOT)
 
+# Imported once at load so a warm interpreter (or a loop calling main()) reuses them;
+# a missing fetch dependency is reported by main() rather than at import
+try:
+    from fabio_bot.fetch_market_data import fetch_orderflow_bars
+    _FETCH_IMPORT_ERROR = None
+except ImportError as e:
+    fetch_orderflow_bars = None
+    _FETCH_IMPORT_ERROR = e
+from backtest import get_latest_signal
+from fabio_bot.signal_generator import Signal
+
 logging.basicConfig(level=logging.WARNING, format="%(message)s")
 logger = logging.getLogger("signal_once")
 
 OPEN_TRADE_FILE = ROOT / "data" / "open_trade.json"
+PARAMS_FILE = ROOT / "data" / "best_params_mnq_1m.json"
+
+# path -> ((st_mtime_ns, st_size), parsed JSON)
+_JSON_CACHE: dict = {}
+
+
+def _cached_json(path: Path) -> dict:
+    """Parsed JSON for path, re-read only when its mtime/size change. Raises OSError/ValueError."""
+    st = os.stat(path)
+    key = (st.st_mtime_ns, st.st_size)
+    hit = _JSON_CACHE.get(path)
+    if hit is not None and hit[0] == key:
+        return hit[1]
+    raw = path.read_bytes()
+    data = orjson.loads(raw) if orjson is not None else json.loads(raw)
+    _JSON_CACHE[path] = (key, data)
+    return data
 
 
 def _load_config():
@@ -29,54 +65,137 @@ def _load_config():
         return {}
 
 
-def _load_params():
-    p_path = ROOT / "data" / "best_params_mnq_1m.json"
-    if not p_path.exists():
-        return {}
+def get_params() -> dict:
+    """Strategy params from PARAMS_FILE, memoized on its mtime/size so a long-lived caller
+    running main() in a loop only re-parses after the optimizer rewrites it. Treat as read-only."""
     try:
-        with open(p_path) as f:
-            return json.load(f).get("params", {})
+        return _cached_json(PARAMS_FILE).get("params", {})
     except Exception:
         return {}
 
 
+class _TokenBucket:
+    """Blocking token bucket: at most `rate` sends/sec, bursts up to `capacity`."""
+
+    def __init__(self, rate: float, capacity: float):
+        self.rate = rate
+        self.capacity = capacity
+        self.tokens = capacity
+        self.last = time.monotonic()
+
+    def take(self) -> None:
+        now = time.monotonic()
+        self.tokens = min(self.capacity, self.tokens + (now - self.last) * self.rate)
+        self.last = now
+        if self.tokens < 1.0:
+            time.sleep((1.0 - self.tokens) / self.rate)
+            self.last = time.monotonic()
+            self.tokens = 1.0
+        self.tokens -= 1.0
+
+
+# Telegram caps bots at ~30 messages/sec; trailing + signal messages share one bucket
+_SEND_BUCKET = _TokenBucket(rate=30.0, capacity=30.0)
+_SESSION = None
+
+
+def _session():
+    """Keep-alive session, created on first send so a no-signal run never builds it."""
+    global _SESSION
+    if _SESSION is None:
+        import requests
+        _SESSION = requests.Session()
+    return _SESSION
+
+
 def _send(token: str, chat_id: str, text: str) -> bool:
     try:
-        import urllib.request
-        import urllib.parse
         url = f"https://api.telegram.org/bot{token}/sendMessage"
-        data = urllib.parse.urlencode({"chat_id": chat_id, "text": text, "parse_mode": "HTML"}).encode()
-        req = urllib.request.Request(url, data=data, method="POST", headers={"Content-Type": "application/x-www-form-urlencoded"})
-        with urllib.request.urlopen(req, timeout=10) as r:
-            return r.status == 200
+        _SEND_BUCKET.take()
+        r = _session().post(url, data={"chat_id": chat_id, "text": text, "parse_mode": "HTML"}, timeout=10)
+        if r.status_code != 200:
+            logger.warning("Telegram send failed: HTTP %s", r.status_code)
+        return r.status_code == 200
     except Exception as e:
         logger.warning("Telegram send failed: %s", e)
         return False
 
 
+# (source, symbol) -> (monotonic expiry, bars, data_symbol). Only pays off when main() runs
+# more than once per process (a loop/worker wrapper); a cron run fetches each pair once.
+FETCH_TTL_SEC = 60.0
+_FETCH_CACHE: dict = {}
+
+
+def _fetch_bars(fetch, source: str, symbol: str, **kwargs):
+    """fetch(source=, symbol=, **kwargs) with a short TTL cache; callers get a private copy to mutate."""
+    key = (source, symbol)
+    hit = _FETCH_CACHE.get(key)
+    if hit is not None and time.monotonic() < hit[0]:
+        return hit[1].copy(), hit[2]
+    df, data_symbol = fetch(source=source, symbol=symbol, **kwargs)
+    if df is not None and not df.empty:
+        _FETCH_CACHE[key] = (time.monotonic() + FETCH_TTL_SEC, df, data_symbol)
+        df = df.copy()
+    return df, data_symbol
+
+
+def _scale_volume(df, data_source: str) -> None:
+    """Fill missing buy/sell volume with 50 and apply telegram_bot's rescale in the same pass."""
+    n = len(df)
+    cols = {}
+    for col in ("buy_volume", "sell_volume"):
+        if col in df.columns:
+            cols[col] = df[col].to_numpy(dtype=np.float64, copy=True)
+        else:
+            cols[col] = np.full(n, 50.0)
+            df[col] = cols[col]
+    bv, sv = cols["buy_volume"], cols["sell_volume"]
+    total = bv + sv
+    total[total == 0] = 1.0
+    mean_vol = float(np.nanmean(total))
+    if not (mean_vol > 500 or (data_source in ("binance", "alpaca") and 0 < mean_vol < 400)):
+        return
+    scale = 120.0 / mean_vol
+    for col, arr in cols.items():
+        np.multiply(arr, scale, out=arr)
+        np.maximum(arr, 1.0, out=arr)
+        df[col] = arr
+
+
 def _load_open_trade():
-    if not OPEN_TRADE_FILE.exists():
-        return {}
     try:
-        with open(OPEN_TRADE_FILE) as f:
-            return json.load(f)
+        return dict(_cached_json(OPEN_TRADE_FILE))  # caller mutates it before saving
     except Exception:
         return {}
 
 
 def _save_open_trade(open_trade: dict):
+    """Write via a temp file + os.replace so a killed run never leaves half-written state."""
     OPEN_TRADE_FILE.parent.mkdir(parents=True, exist_ok=True)
+    tmp = OPEN_TRADE_FILE.with_suffix(".tmp")
     try:
-        with open(OPEN_TRADE_FILE, "w") as f:
-            json.dump(open_trade, f)
+        if orjson is not None:
+            # entry/sl/tp prices can be numpy float64 straight from get_latest_signal
+            raw = orjson.dumps(open_trade, option=orjson.OPT_SERIALIZE_NUMPY)
+        else:
+            raw = json.dumps(open_trade).encode()
+        tmp.write_bytes(raw)
+        os.replace(tmp, OPEN_TRADE_FILE)
     except Exception:
         pass
 
 
-def _update_trailing(open_trade: dict, last_price: float, token: str, chat_id: str, symbol: str):
-    """Same logic as telegram_bot._update_open_trade; then save state."""
-    if not open_trade.get("active"):
-        return
+# Same message layouts as telegram_bot._TPL_*; filled with format_map from one dict per branch.
+_TPL_TP2 = "<b>TP2 hit</b> {label} {direction}\nEntry: {entry:.2f}\nExit: {exit:.2f}\nResult: +{result:.2f}"
+_TPL_TP1 = "<b>TP1 hit</b> {label} {direction}\nSL moved to breakeven at {entry:.2f}"
+_TPL_SL = "<b>SL hit</b> {label} {direction}\nEntry: {entry:.2f}\nExit: {exit:.2f}\nResult: {result:.2f}"
+
+
+def _update_trailing(open_trade: dict, last_price: float, token: str, chat_id: str, symbol: str) -> bool:
+    """Same logic as telegram_bot._update_open_trade. Returns True if open_trade changed (needs saving)."""
+    if not open_trade or not open_trade.get("active"):
+        return False
     direction = open_trade.get("direction", "LONG")
     entry = open_trade.get("entry", 0)
     sl = open_trade.get("sl", 0)
@@ -86,36 +205,24 @@ def _update_trailing(open_trade: dict, last_price: float, token: str, chat_id: s
     tp2_hit = open_trade.get("tp2_hit", False)
     label = symbol.replace("=F", "").strip()
 
-    if direction == "LONG":
-        if not tp2_hit and last_price >= tp2:
-            _send(token, chat_id, f"<b>TP2 hit</b> {label} LONG\nEntry: {entry:.2f}\nExit: {last_price:.2f}\nResult: +{last_price - entry:.2f}")
-            open_trade["active"] = False
-            open_trade["tp2_hit"] = True
-            return
-        if not moved_to_be and last_price >= tp1:
-            open_trade["sl"] = entry
-            open_trade["moved_to_be"] = True
-            _send(token, chat_id, f"<b>TP1 hit</b> {label} LONG\nSL moved to breakeven at {entry:.2f}")
-            return
-        if last_price <= sl:
-            _send(token, chat_id, f"<b>SL hit</b> {label} LONG\nEntry: {entry:.2f}\nExit: {last_price:.2f}\nResult: {last_price - entry:.2f}")
-            open_trade["active"] = False
-            return
-    else:
-        if not tp2_hit and last_price <= tp2:
-            _send(token, chat_id, f"<b>TP2 hit</b> {label} SHORT\nEntry: {entry:.2f}\nExit: {last_price:.2f}\nResult: +{entry - last_price:.2f}")
-            open_trade["active"] = False
-            open_trade["tp2_hit"] = True
-            return
-        if not moved_to_be and last_price <= tp1:
-            open_trade["sl"] = entry
-            open_trade["moved_to_be"] = True
-            _send(token, chat_id, f"<b>TP1 hit</b> {label} SHORT\nSL moved to breakeven at {entry:.2f}")
-            return
-        if last_price >= sl:
-            _send(token, chat_id, f"<b>SL hit</b> {label} SHORT\nEntry: {entry:.2f}\nExit: {last_price:.2f}\nResult: {entry - last_price:.2f}")
-            open_trade["active"] = False
-            return
+    # +1 for LONG, -1 for SHORT: every SHORT comparison is the LONG one on sign-flipped distances
+    side, sgn = ("LONG", 1.0) if direction == "LONG" else ("SHORT", -1.0)
+    fields = {"label": label, "direction": side, "entry": entry, "exit": last_price, "result": sgn * (last_price - entry)}
+    if not tp2_hit and sgn * (last_price - tp2) >= 0:
+        _send(token, chat_id, _TPL_TP2.format_map(fields))
+        open_trade["active"] = False
+        open_trade["tp2_hit"] = True
+        return True
+    if not moved_to_be and sgn * (last_price - tp1) >= 0:
+        open_trade["sl"] = entry
+        open_trade["moved_to_be"] = True
+        _send(token, chat_id, _TPL_TP1.format_map(fields))
+        return True
+    if sgn * (last_price - sl) <= 0:
+        _send(token, chat_id, _TPL_SL.format_map(fields))
+        open_trade["active"] = False
+        return True
+    return False
 
 
 def main():
@@ -135,7 +242,7 @@ def main():
     binance_symbol = (tg.get("binance_symbol") or "BTCUSDT").strip()
     display_symbol = alpaca_symbol if data_source == "alpaca" else (binance_symbol if data_source == "binance" else symbol)
 
-    params = _load_params()
+    params = get_params()
     min_strength = params.get("min_signal_strength", 0.56)
     min_delta = params.get("min_delta", 432)
     min_delta_mult = params.get("min_delta_multiplier", 1.32)
@@ -145,15 +252,12 @@ def main():
     rr2 = params.get("rr_second", 1.42)
     atr_stop = params.get("atr_stop_multiplier", 1.32)
 
-    try:
-        from fabio_bot.fetch_market_data import fetch_orderflow_bars
-    except ImportError:
-        logger.error("pip install -r requirements.txt")
+    if _FETCH_IMPORT_ERROR is not None:
+        logger.error("pip install -r requirements.txt (%s)", _FETCH_IMPORT_ERROR)
         return 1
-    from backtest import get_latest_signal
-    from fabio_bot.signal_generator import Signal
 
-    df, data_symbol = fetch_orderflow_bars(
+    df, data_symbol = _fetch_bars(
+        fetch_orderflow_bars,
         source=data_source,
         symbol=symbol if data_source == "yahoo" else (alpaca_symbol if data_source == "alpaca" else binance_symbol),
         alpaca_key_id=alpaca_key or None,
@@ -162,31 +266,17 @@ def main():
     min_bars = 50 if data_source == "alpaca" else 100
     if df is None or df.empty or len(df) < min_bars:
         if data_source == "alpaca":
-            df, data_symbol = fetch_orderflow_bars(source="yahoo", symbol=symbol)
+            df, data_symbol = _fetch_bars(fetch_orderflow_bars, source="yahoo", symbol=symbol)
         if df is None or df.empty or len(df) < min_bars:
             logger.warning("No data (got %d bars)", len(df) if df is not None and not df.empty else 0)
             return 0
-    if "buy_volume" not in df.columns:
-        df["buy_volume"] = 50
-    if "sell_volume" not in df.columns:
-        df["sell_volume"] = 50
-    df["bar_idx"] = range(len(df))
-    total_vol = df["buy_volume"] + df["sell_volume"]
-    mean_vol = total_vol.replace(0, 1).mean()
-    if mean_vol > 500:
-        scale = (120.0 / mean_vol)
-        if scale < 1.0:
-            df["buy_volume"] = (df["buy_volume"] * scale).clip(lower=1)
-            df["sell_volume"] = (df["sell_volume"] * scale).clip(lower=1)
-    elif data_source in ("binance", "alpaca") and 0 < mean_vol < 400:
-        scale = 120.0 / mean_vol
-        df["buy_volume"] = (df["buy_volume"] * scale).clip(lower=1)
-        df["sell_volume"] = (df["sell_volume"] * scale).clip(lower=1)
+    df["bar_idx"] = np.arange(len(df), dtype=np.int64)
+    _scale_volume(df, data_source)
 
     open_trade = _load_open_trade()
-    last_close = float(df["close"].iloc[-1])
-    _update_trailing(open_trade, last_close, token, chat_id, display_symbol)
-    _save_open_trade(open_trade)
+    last_close = df["close"].to_numpy()[-1]  # float64 scalar, no indexer
+    if _update_trailing(open_trade, last_close, token, chat_id, display_symbol):
+        _save_open_trade(open_trade)
 
     sig, strength, price, features = get_latest_signal(
         df,
@@ -0,0 +1,45 @@
+"""Shared test helpers."""
+from __future__ import annotations
+
+import numpy as np
+import pandas as pd
+import pytest
+
+
+def _mk_bars(**columns) -> pd.DataFrame:
+    """OHLCV/order-flow bars from explicit float64 arrays plus an int64 bar_idx."""
+    data = {name: np.asarray(values, dtype=np.float64) for name, values in columns.items()}
+    n = len(next(iter(data.values()))) if data else 0
+    data["bar_idx"] = np.arange(n, dtype=np.int64)
+    return pd.DataFrame(data)
+
+
+@pytest.fixture
+def mk_bars():
+    return _mk_bars
+
+
+class _FakeFetch:
+    """Stands in for fetch_nq_or_mnq_1m: returns `bars` and echoes the requested symbol."""
+
+    def __init__(self, bars: pd.DataFrame):
+        self.bars = bars
+
+    def __call__(self, symbol: str = "MNQ=F", **kwargs):
+        return self.bars, symbol
+
+
+@pytest.fixture
+def mock_yahoo_fetch(monkeypatch):
+    """Patch the Yahoo fetcher with two MNQ bars; tests may swap `.bars` before the request."""
+    fake = _FakeFetch(_mk_bars(
+        open=[21400.0, 21401.0],
+        high=[21402.0, 21403.0],
+        low=[21399.0, 21400.0],
+        close=[21401.0, 21402.0],
+        volume=[100.0, 110.0],
+        buy_volume=[60.0, 65.0],
+        sell_volume=[40.0, 45.0],
+    ))
+    monkeypatch.setattr("fabio_bot.fetch_market_data.fetch_nq_or_mnq_1m", fake)
+    return fake
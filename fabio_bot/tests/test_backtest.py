@@ -0,0 +1,66 @@
+"""Tests for backtest helpers shared with the optimizers."""
+from __future__ import annotations
+
+import sys
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+
+import numpy as np
+import pandas as pd
+
+from backtest import PIPS_NQ, SIZE_MULT, _bar_tick_batch, generate_sample_bars, prepare_bars, run_backtest, synthetic_bar_deltas
+from fabio_bot.order_flow_analyzer import OrderFlowAnalyzer
+
+
+def test_synthetic_bar_deltas_match_analyzer():
+    df = pd.DataFrame({
+        "close": [20000.0] * 7,
+        "buy_volume": [50, 3, 44, 45, 120, 9.9, 0],
+        "sell_volume": [50, 80, 46, 12, 5, 10, 1],
+    })
+    analyzer = OrderFlowAnalyzer(pips=PIPS_NQ, size_multiplier=SIZE_MULT)
+    seen = []
+    for c, bv, sv in zip(df["close"], df["buy_volume"], df["sell_volume"]):
+        analyzer.on_trades_batch(*_bar_tick_batch(int(c / PIPS_NQ), bv, sv, SIZE_MULT))
+        seen.append(analyzer.start_new_bar().delta)
+    np.testing.assert_allclose(synthetic_bar_deltas(df), seen)
+
+
+def test_run_backtest_reuses_prepared_bars():
+    df = generate_sample_bars(1500, seed=3, order_flow_rich=True)
+    df["date"] = (df.index // 400).astype(str)
+    prepared = prepare_bars(df)
+    for min_delta in (200, 300):
+        fresh = run_backtest(df, min_delta=min_delta).to_metrics()
+        reused = run_backtest(df, min_delta=min_delta, prepared=prepared).to_metrics()
+        assert fresh == reused
+    assert fresh["total_trades"] > 0
+
+
+def test_run_backtest_caches_filter_arrays_on_prepared():
+    df = generate_sample_bars(1500, seed=5, order_flow_rich=True)
+    prepared = prepare_bars(df)
+    filters = [
+        dict(trend_ma_bars=8),
+        dict(session_bars_per_day=400, session_start_bar=50, session_end_bar=300),
+        dict(trend_ma_bars=8, session_bars_per_day=400, session_start_bar=50, session_end_bar=300),
+    ]
+    for _ in range(2):
+        for kw in filters:
+            fresh = run_backtest(df, min_delta=200, **kw).to_metrics()
+            assert run_backtest(df, min_delta=200, prepared=prepared, **kw).to_metrics() == fresh
+    assert list(prepared["trend_ma"]) == [8]
+    assert list(prepared["in_session"]) == [(400, 50, 300)]
+
+
+def test_run_backtest_stops_replay_once_drawdown_cap_is_permanent():
+    df = generate_sample_bars(1500, seed=3, order_flow_rich=True)
+    capped = run_backtest(df, min_delta=200, max_daily_drawdown_pct=0.002)
+    uncapped = run_backtest(df, min_delta=200, max_daily_drawdown_pct=0.5)
+    assert 0 < capped.total_trades < uncapped.total_trades
+    # Curve still covers every bar, flat after the last trade
+    assert len(capped.equity_curve) == len(uncapped.equity_curve) == len(df) + 1
+    assert capped.equity_curve[-1] == capped.final_balance
+    assert capped.trades[-1].pnl < 0
@@ -0,0 +1,89 @@
+"""Tests for the optimize_1m search helpers (pruning bound, grid sampling, early stop, disk cache)."""
+from __future__ import annotations
+
+import itertools
+import random
+import sys
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+
+import numpy as np
+
+from backtest import generate_sample_bars, synthetic_bar_deltas
+from optimize_1m import BASE_SPACE, DiskCache, candidate_bars, early_stop, param_key, run_params, sample_grid
+
+
+def test_candidate_bars_bounds_trades():
+    df = generate_sample_bars(1500, seed=3, order_flow_rich=True)
+    delta = synthetic_bar_deltas(df)
+    cvd = np.cumsum(delta)
+    random.seed(11)
+    grid = sample_grid(BASE_SPACE, 4)
+    grid += [dict(p, min_delta=md) for p, md in zip(sample_grid(BASE_SPACE, 4), (200, 1000, 4000, 8000))]
+    traded = 0
+    for p in grid:
+        _, m = run_params(df, p, 1.0)
+        assert m["total_trades"] <= candidate_bars(delta, cvd, p)
+        traded += m["total_trades"]
+    assert traded > 0
+
+
+def test_sample_grid_matches_sampling_the_product():
+    names = list(BASE_SPACE)
+    product = [dict(zip(names, combo)) for combo in itertools.product(*BASE_SPACE.values())]
+    for seed, k in ((789, 150), (3, 60)):
+        random.seed(seed)
+        expected = random.sample(product, k)
+        random.seed(seed)
+        assert sample_grid(BASE_SPACE, k) == expected
+    small = {"a": [1, 2], "b": [3]}
+    random.seed(0)
+    assert sorted(param["a"] for param in sample_grid(small, 5)) == [1, 2]
+
+
+def _scored(scores):
+    return ((sc, {}, {"i": i}) for i, sc in enumerate(scores))
+
+
+def test_early_stop_patience_and_min_improvement():
+    scores = [1.0, 2.0, 2.3, 2.4, 5.0]
+    # 2.3 and 2.4 do not beat 2.0 by more than 0.5: two stale runs end the stage
+    assert [r[0] for r in early_stop(_scored(scores), 2, 0.5)] == [1.0, 2.0, 2.3, 2.4]
+    assert [r[0] for r in early_stop(_scored(scores), 3, 0.5)] == scores
+    assert [r[0] for r in early_stop(_scored(scores), 2, 0.0)] == scores
+    assert [r[0] for r in early_stop(_scored(scores), 0, 10.0)] == scores
+    # The starting best counts: nothing beats 10, so the first two runs are stale
+    assert [r[0] for r in early_stop(_scored(scores), 2, 0.0, best=10.0)] == [1.0, 2.0]
+
+
+def test_early_stop_closes_source():
+    src = _scored([1.0, 1.0, 1.0, 1.0])
+    assert len(list(early_stop(src, 1, 0.0))) == 2
+    assert src.gi_frame is None
+
+
+def test_disk_cache_round_trip_and_scope(tmp_path):
+    path = tmp_path / "cache.sqlite"
+    df = generate_sample_bars(300, seed=1)
+    key = param_key(dict(sample_grid(BASE_SPACE, 1)[0]))
+    metrics = {"win_rate": 61.5, "total_trades": 24, "pruned": False}
+
+    cache = DiskCache(path, df, 1.0)
+    assert len(cache) == 0 and key not in cache
+    cache[key] = (12.5, metrics)
+    cache.close()
+
+    cache = DiskCache(path, df, 1.0)
+    assert len(cache) == 1 and key in cache
+    assert cache[key] == (12.5, metrics)
+    cache.close()
+
+    other_tick = DiskCache(path, df, 5.0)
+    assert len(other_tick) == 0 and key not in other_tick
+    other_tick.close()
+
+    other_bars = DiskCache(path, generate_sample_bars(300, seed=2), 1.0)
+    assert len(other_bars) == 0 and key not in other_bars
+    other_bars.close()
@@ -5,7 +5,9 @@ import sys
 from pathlib import Path
 sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
 
-from fabio_bot.order_flow_analyzer import OrderFlowAnalyzer, BarSnapshot, VolumeProfileResult
+import numpy as np
+
+from fabio_bot.order_flow_analyzer import OrderFlowAnalyzer, BarSnapshot, VolumeProfileResult, _value_area_bounds
 
 
 def test_cvd_accumulates():
@@ -13,10 +15,10 @@ def test_cvd_accumulates():
     size_mult = 1.0
     a = OrderFlowAnalyzer(pips=pips, size_multiplier=size_mult, big_trade_threshold=30)
     # 10 buys at 20000, 5 sells at 20000
-    for _ in range(10):
-        a.on_trade(int(20000 / pips), int(5 * size_mult), True)
-    for _ in range(5):
-        a.on_trade(int(20000 / pips), int(5 * size_mult), False)
+    prices = np.full(15, int(20000 / pips), dtype=np.int64)
+    sizes = np.full(15, int(5 * size_mult), dtype=np.int64)
+    buys = np.arange(15) < 10
+    a.on_trades_batch(prices, sizes, buys)
     assert a.get_cvd() == (10 * 5 - 5 * 5)
 
 
@@ -37,12 +39,10 @@ def test_volume_profile_poc():
     pips = 0.25
     a = OrderFlowAnalyzer(pips=pips, size_multiplier=1.0, value_area_pct=0.70)
     # Most volume at 20000
-    for _ in range(100):
-        a.on_trade(int(20000 / pips), 10, True)
-    for _ in range(20):
-        a.on_trade(int(20001 / pips), 10, False)
-    for _ in range(10):
-        a.on_trade(int(19999 / pips), 10, False)
+    prices = np.repeat(np.array([int(20000 / pips), int(20001 / pips), int(19999 / pips)], dtype=np.int64), [100, 20, 10])
+    sizes = np.full(len(prices), 10, dtype=np.int64)
+    buys = np.arange(len(prices)) < 100
+    a.on_trades_batch(prices, sizes, buys)
     profile = a.build_volume_profile()
     assert profile.total_volume > 0
     assert profile.poc == 20000.0
@@ -56,3 +56,77 @@ def test_big_trades():
     buys, sells = a.get_big_trade_cluster(10)
     assert buys == 1
     assert sells == 1
+
+
+def test_recent_bars_wrap_rolling_window():
+    a = OrderFlowAnalyzer(pips=0.25, size_multiplier=1.0, profile_rolling_bars=5)
+    for i in range(12):
+        a.on_trade(80000 + i, 10 + i, True)
+        a.start_new_bar()
+    arr = a.get_recent_bar_array(20)
+    assert len(arr) == 5
+    assert list(arr["buy_volume"]) == [17, 18, 19, 20, 21]
+    bars = a.get_recent_bars(3)
+    assert all(isinstance(b, BarSnapshot) for b in bars)
+    assert [b.close for b in bars] == [(80000 + i) * 0.25 for i in (9, 10, 11)]
+
+
+def test_on_trades_batch_matches_on_trade():
+    trades = [(80000, 35, True), (80000, 5, True), (80001, 5, False), (80012, 40, False), (80013, 5, True)]
+    one = OrderFlowAnalyzer(pips=0.25, size_multiplier=1.0, big_trade_threshold=30)
+    batch = OrderFlowAnalyzer(pips=0.25, size_multiplier=1.0, big_trade_threshold=30)
+    for p, s, b in trades:
+        one.on_trade(p, s, b)
+    pl, sl, bid = (np.array(col) for col in zip(*trades))
+    batch.on_trades_batch(pl, sl, bid)
+    assert batch.get_cvd() == one.get_cvd()
+    assert batch.get_big_trade_cluster(30) == one.get_big_trade_cluster(30)
+    assert batch.get_absorption() == one.get_absorption()
+    assert dict(batch._volume_at_price) == dict(one._volume_at_price)
+    assert batch.start_new_bar() == one.start_new_bar()
+
+
+def test_on_trades_batch_profile_matches_on_trade_with_tied_volumes():
+    rng = np.random.default_rng(3)
+    for _ in range(200):
+        n = int(rng.integers(2, 30))
+        # Few levels, equal sizes: lots of ties, in non-sorted first-seen order
+        pl = 80000 + rng.integers(-6, 7, size=n)
+        sl = rng.choice([5, 10], size=n)
+        bid = rng.random(n) < 0.5
+        one = OrderFlowAnalyzer(pips=0.25, size_multiplier=1.0)
+        batch = OrderFlowAnalyzer(pips=0.25, size_multiplier=1.0)
+        for p, sz, b in zip(pl.tolist(), sl.tolist(), bid.tolist()):
+            one.on_trade(p, sz, b)
+        batch.on_trades_batch(pl, sl, bid)
+        assert list(batch._volume_at_price.items()) == list(one._volume_at_price.items())
+        assert batch.build_volume_profile() == one.build_volume_profile()
+
+
+def _greedy_value_area(vols, idx_poc, target_vol):
+    """Reference: the original scalar expansion from the POC."""
+    vol, lo, hi, n = vols[idx_poc], idx_poc, idx_poc, len(vols)
+    while vol < target_vol and (lo > 0 or hi < n - 1):
+        add_lo = vols[lo - 1] if lo > 0 else 0
+        add_hi = vols[hi + 1] if hi < n - 1 else 0
+        if add_lo >= add_hi and lo > 0:
+            lo -= 1
+            vol += add_lo
+        elif hi < n - 1:
+            hi += 1
+            vol += add_hi
+        else:
+            lo -= 1
+            vol += add_lo
+    return lo, hi
+
+
+def test_value_area_bounds_match_greedy_walk():
+    rng = np.random.default_rng(0)
+    for _ in range(2000):
+        n = int(rng.integers(1, 15))
+        # Small integers force ties between the two sides
+        vols = rng.choice([0.0, 1.0, 2.0, 3.0, 7.5], size=n)
+        idx_poc = int(rng.integers(n))
+        target = float(vols.sum()) * float(rng.choice([0.0, 0.3, 0.7, 1.0]))
+        assert _value_area_bounds(vols, idx_poc, target) == _greedy_value_area(vols.tolist(), idx_poc, target)
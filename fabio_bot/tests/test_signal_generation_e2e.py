@@ -11,30 +11,34 @@ from pathlib import Path
 ROOT = Path(__file__).resolve().parent.parent
 sys.path.insert(0, str(ROOT))
 
+import numpy as np
 import pandas as pd
 import pytest
 
+try:
+    import pyarrow  # noqa: F401  (enables pandas' multithreaded pyarrow CSV engine)
+    CSV_ENGINE = "pyarrow"
+except ImportError:
+    CSV_ENGINE = "c"
+
 from backtest import get_latest_signal
 from fabio_bot.signal_generator import Signal
 
 
 def _synthetic_bars(n: int = 200, seed: int = 42) -> pd.DataFrame:
     """Minimal OHLCV + buy/sell for get_latest_signal."""
-    import random
-    random.seed(seed)
-    base = 20000.0
-    rows = []
-    for i in range(n):
-        o = base + (i % 15) * 0.25
-        h = o + 0.5
-        l = o - 0.5
-        c = o + (random.random() - 0.5) * 0.5
-        bv = 40 + (i % 25)
-        sv = 40 + (24 - i % 25)
-        rows.append({"open": o, "high": h, "low": l, "close": c, "buy_volume": bv, "sell_volume": sv})
-    df = pd.DataFrame(rows)
-    df["bar_idx"] = range(len(df))
-    return df
+    rng = np.random.default_rng(seed)
+    i = np.arange(n, dtype=np.int64)
+    o = 20000.0 + (i % 15) * 0.25
+    return pd.DataFrame({
+        "open": o,
+        "high": o + 0.5,
+        "low": o - 0.5,
+        "close": o + (rng.random(n) - 0.5) * 0.5,
+        "buy_volume": 40 + (i % 25),
+        "sell_volume": 40 + (24 - i % 25),
+        "bar_idx": i,
+    })
 
 
 def test_get_latest_signal_e2e_synthetic():
@@ -120,12 +124,19 @@ def test_get_latest_signal_respects_min_strength(min_strength):
     assert "sl_price" in features and "tp1_price" in features
 
 
+_CSV_DTYPES = dict.fromkeys(("open", "high", "low", "close", "buy_volume", "sell_volume"), "float32")
+_CSV_COLUMNS = frozenset(_CSV_DTYPES) | {"bar_idx"}
+
+
 def test_signal_e2e_on_real_csv_if_present():
     """If data/mnq_1m.csv exists, run get_latest_signal on it; validate structure (no crash)."""
     csv_path = ROOT / "data" / "mnq_1m.csv"
     if not csv_path.exists():
         pytest.skip("data/mnq_1m.csv not found (run backtest --fetch-real --save-csv data/mnq_1m.csv)")
-    df = pd.read_csv(csv_path)
+    # Only the columns get_latest_signal reads; float32 prices/volumes halve parse memory
+    usecols = [c for c in pd.read_csv(csv_path, nrows=0).columns if c in _CSV_COLUMNS]
+    dtype = {c: t for c, t in _CSV_DTYPES.items() if c in usecols}
+    df = pd.read_csv(csv_path, engine=CSV_ENGINE, usecols=usecols, dtype=dtype)
     for col in ["open", "high", "low", "close"]:
         if col not in df.columns:
             pytest.skip(f"CSV missing {col}")
@@ -134,9 +145,9 @@ def test_signal_e2e_on_real_csv_if_present():
     if "sell_volume" not in df.columns:
         df["sell_volume"] = 50
     if "bar_idx" not in df.columns:
-        df["bar_idx"] = range(len(df))
+        df["bar_idx"] = np.arange(len(df), dtype=np.int64)
     # Use last 500 bars to keep test fast
-    df = df.tail(500).reset_index(drop=True)
+    df = df.iloc[-500:].reset_index(drop=True)
     params_file = ROOT / "data" / "best_params_mnq_1m.json"
     if params_file.exists():
         with open(params_file) as f:
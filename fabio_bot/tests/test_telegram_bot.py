@@ -5,25 +5,27 @@ and one-cycle pipeline with mock data. No real Telegram API calls.
 from __future__ import annotations
 
 import json
+import os
 import sys
 from pathlib import Path
 from unittest.mock import patch, MagicMock
 
 # Run from repo root or fabio_bot so telegram_bot and backtest are importable
 ROOT = Path(__file__).resolve().parent.parent
-sys.path.insert(0, str(ROOT))
+if str(ROOT) not in sys.path:
+    sys.path.insert(0, str(ROOT))
 
 import pytest
 
 
-# --- Import bot module (after path is set) ---
-def _import_bot():
-    import telegram_bot as tb
-    return tb
+# --- Import bot module once per test session (after path is set) ---
+@pytest.fixture(scope="session")
+def tb():
+    import telegram_bot
+    return telegram_bot
 
 
-def test_inline_menu_structure():
-    tb = _import_bot()
+def test_inline_menu_structure(tb):
     menu = tb._inline_menu()
     assert "inline_keyboard" in menu
     rows = menu["inline_keyboard"]
@@ -38,206 +40,158 @@ def test_inline_menu_structure():
     assert "Help" in texts and "help" in datas
 
 
-def test_format_start_contains_commands():
-    tb = _import_bot()
-    s = tb._format_start()
-    assert "Fabio" in s or "Order Flow" in s
-    assert "/status" in s or "Status" in s
-    assert "/strategy" in s or "Strategy" in s
-    assert "/help" in s or "Help" in s
-
-
-def test_format_help_contains_all_commands():
-    tb = _import_bot()
-    s = tb._format_help()
-    for cmd in ["/start", "/status", "/strategy", "/params", "/settings", "/help"]:
-        assert cmd in s
-
-
-def test_format_status_with_state():
-    tb = _import_bot()
-    state = {
-        "n_bars": 1000,
-        "signal": "NONE",
-        "strength": 0.45,
-        "reason": "no_setup",
+_STATUS_STATE = {
+    "n_bars": 1000,
+    "signal": "NONE",
+    "strength": 0.45,
+    "reason": "no_setup",
+    "symbol": "MNQ=F",
+    "data_symbol": "NQ=F",
+}
+_SETTINGS_CFG = {
+    "telegram": {
         "symbol": "MNQ=F",
-        "data_symbol": "NQ=F",
-    }
-    s = tb._format_status(state)
-    assert "1000" in s
-    assert "NONE" in s
-    assert "0.45" in s
-    assert "no_setup" in s
-    assert "MNQ" in s or "NQ" in s
-
-
-def test_format_settings_with_config():
-    tb = _import_bot()
-    cfg = {
-        "telegram": {
-            "symbol": "MNQ=F",
-            "interval": "1m",
-            "period": "7d",
-            "interval_seconds": 60,
-            "use_ml_filter": False,
-            "use_regime_filter": True,
-        },
-        "ml": {"model_path": "data/ml_signal_model.pkl"},
-    }
-    s = tb._format_settings(cfg)
-    assert "MNQ" in s
-    assert "1m" in s
-    assert "60" in s
-    assert "Off" in s or "On" in s
-
-
-def test_format_strategy_handles_missing_file():
-    tb = _import_bot()
-    # May or may not have best_params file; either way should not crash
-    s = tb._format_strategy()
-    assert "Strategy" in s or "strategy" in s.lower()
-    assert len(s) > 0
-
-
-def test_format_params_handles_missing_file():
-    tb = _import_bot()
-    s = tb._format_params()
-    assert "param" in s.lower() or "Params" in s
-    assert len(s) > 0
+        "interval": "1m",
+        "period": "7d",
+        "interval_seconds": 60,
+        "use_ml_filter": False,
+        "use_regime_filter": True,
+    },
+    "ml": {"model_path": "data/ml_signal_model.pkl"},
+}
+
+
+# Substrings are matched case-insensitively; strategy/params may or may not have a best_params file
+@pytest.mark.parametrize("fn_name,arg,expected", [
+    ("_format_start", None, ("order flow", "/status", "/strategy", "/help")),
+    ("_format_help", None, ("/start", "/status", "/strategy", "/params", "/settings", "/help")),
+    ("_format_status", _STATUS_STATE, ("1000", "none", "0.45", "no_setup", "nq")),
+    ("_format_settings", _SETTINGS_CFG, ("mnq", "1m", "60", "off")),
+    ("_format_strategy", None, ("strategy",)),
+    ("_format_params", None, ("param",)),
+])
+def test_formatters(tb, fn_name, arg, expected):
+    fn = getattr(tb, fn_name)
+    s = (fn() if arg is None else fn(arg)).lower()
+    assert s
+    for sub in expected:
+        assert sub in s
 
 
 # --- Trailing logic: _update_open_trade (mock _send_telegram) ---
-def test_trailing_long_tp2_hit_closes_trade():
-    tb = _import_bot()
-    open_trade = {
-        "active": True,
-        "direction": "LONG",
-        "entry": 100.0,
-        "sl": 98.0,
-        "tp1": 102.0,
-        "tp2": 105.0,
-        "moved_to_be": False,
-        "tp2_hit": False,
-    }
-    with patch.object(tb, "_send_telegram", return_value=True) as send:
-        tb._update_open_trade(open_trade, 105.5, "token", "chat", "MNQ=F")
-    assert send.called
-    assert "TP2 hit" in send.call_args[0][2]
-    assert open_trade["active"] is False
-    assert open_trade.get("tp2_hit") is True
-
-
-def test_trailing_long_tp1_moves_sl_to_be():
-    tb = _import_bot()
-    open_trade = {
-        "active": True,
-        "direction": "LONG",
-        "entry": 100.0,
-        "sl": 98.0,
-        "tp1": 102.0,
-        "tp2": 105.0,
-        "moved_to_be": False,
-        "tp2_hit": False,
-    }
-    with patch.object(tb, "_send_telegram", return_value=True) as send:
-        tb._update_open_trade(open_trade, 102.5, "token", "chat", "MNQ=F")
-    assert send.called
-    assert "TP1 hit" in send.call_args[0][2]
-    assert open_trade["sl"] == 100.0
-    assert open_trade["moved_to_be"] is True
-    assert open_trade["active"] is True
-
-
-def test_trailing_long_sl_hit_closes_trade():
-    tb = _import_bot()
-    open_trade = {
-        "active": True,
-        "direction": "LONG",
-        "entry": 100.0,
-        "sl": 98.0,
-        "tp1": 102.0,
-        "tp2": 105.0,
-        "moved_to_be": False,
-        "tp2_hit": False,
-    }
-    with patch.object(tb, "_send_telegram", return_value=True) as send:
-        tb._update_open_trade(open_trade, 97.5, "token", "chat", "MNQ=F")
-    assert send.called
-    assert "SL hit" in send.call_args[0][2]
-    assert open_trade["active"] is False
-
-
-def test_trailing_short_tp2_hit_closes_trade():
-    tb = _import_bot()
-    open_trade = {
-        "active": True,
-        "direction": "SHORT",
-        "entry": 100.0,
-        "sl": 102.0,
-        "tp1": 98.0,
-        "tp2": 95.0,
-        "moved_to_be": False,
-        "tp2_hit": False,
-    }
-    with patch.object(tb, "_send_telegram", return_value=True) as send:
-        tb._update_open_trade(open_trade, 94.0, "token", "chat", "MNQ=F")
-    assert send.called
-    assert "TP2 hit" in send.call_args[0][2]
-    assert open_trade["active"] is False
-
-
-def test_trailing_short_sl_hit_closes_trade():
-    tb = _import_bot()
-    open_trade = {
-        "active": True,
-        "direction": "SHORT",
-        "entry": 100.0,
-        "sl": 102.0,
-        "tp1": 98.0,
-        "tp2": 95.0,
-        "moved_to_be": False,
-        "tp2_hit": False,
-    }
+_TRADE_TEMPLATES = {
+    "LONG": {"active": True, "direction": "LONG", "entry": 100.0, "sl": 98.0, "tp1": 102.0, "tp2": 105.0,
+             "moved_to_be": False, "tp2_hit": False},
+    "SHORT": {"active": True, "direction": "SHORT", "entry": 100.0, "sl": 102.0, "tp1": 98.0, "tp2": 95.0,
+              "moved_to_be": False, "tp2_hit": False},
+}
+
+
+@pytest.mark.parametrize("direction,price,expect_msg,expect_fields", [
+    ("LONG", 105.5, "TP2 hit", {"active": False, "tp2_hit": True}),
+    ("LONG", 102.5, "TP1 hit", {"active": True, "sl": 100.0, "moved_to_be": True}),
+    ("LONG", 97.5, "SL hit", {"active": False}),
+    ("SHORT", 94.0, "TP2 hit", {"active": False, "tp2_hit": True}),
+    ("SHORT", 103.0, "SL hit", {"active": False}),
+])
+def test_trailing_updates_open_trade(tb, direction, price, expect_msg, expect_fields):
+    open_trade = _TRADE_TEMPLATES[direction].copy()  # _update_open_trade mutates it
     with patch.object(tb, "_send_telegram", return_value=True) as send:
-        tb._update_open_trade(open_trade, 103.0, "token", "chat", "MNQ=F")
+        tb._update_open_trade(open_trade, price, "token", "chat", "MNQ")
     assert send.called
-    assert "SL hit" in send.call_args[0][2]
-    assert open_trade["active"] is False
+    assert expect_msg in send.call_args[0][2]
+    assert {k: open_trade[k] for k in expect_fields} == expect_fields
 
 
-def test_trailing_inactive_trade_does_nothing():
-    tb = _import_bot()
+def test_trailing_inactive_trade_does_nothing(tb):
     open_trade = {"active": False, "direction": "LONG", "entry": 100.0}
     with patch.object(tb, "_send_telegram", return_value=True) as send:
-        tb._update_open_trade(open_trade, 105.0, "token", "chat", "MNQ=F")
+        tb._update_open_trade(open_trade, 105.0, "token", "chat", "MNQ")
     assert not send.called
 
 
-def test_trailing_empty_trade_does_nothing():
-    tb = _import_bot()
+def test_trailing_empty_trade_does_nothing(tb):
     with patch.object(tb, "_send_telegram", return_value=True) as send:
-        tb._update_open_trade({}, 100.0, "token", "chat", "MNQ=F")
+        tb._update_open_trade({}, 100.0, "token", "chat", "MNQ")
     assert not send.called
 
 
+def test_send_telegram_encodes_form_body(tb):
+    from urllib.parse import parse_qs
+    with patch.object(tb, "_post_form", return_value=200) as post:
+        assert tb._send_telegram("token", "-100123", "<b>TP1</b> & 100% · ok\nx", reply_markup=tb._inline_menu())
+    fields = parse_qs(post.call_args[0][1].decode())
+    assert fields["chat_id"] == ["-100123"] and fields["parse_mode"] == ["HTML"]
+    assert fields["text"] == ["<b>TP1</b> & 100% · ok\nx"]
+    assert json.loads(fields["reply_markup"][0]) == tb._inline_menu()
+
+
+def test_handle_commands_long_poll_answers_callback(tb):
+    updates = {"ok": True, "result": [{"update_id": 7, "callback_query": {"id": "cq1", "data": "help", "message": {"chat": {"id": 42}}}}]}
+    state = {"last_update_id": 6}
+    with patch.object(tb, "_get_json", return_value=updates) as get, \
+            patch.object(tb, "_send_telegram", return_value=True) as send, \
+            patch.object(tb, "_answer_callback", return_value=True) as answer:
+        assert tb._handle_commands("token", state, {}, poll_timeout=50) is True
+    url = get.call_args[0][0]
+    assert "timeout=50" in url and "offset=7" in url
+    assert get.call_args[1]["timeout"] > 50
+    assert state["last_update_id"] == 7
+    assert send.call_args[0][1] == "42"
+    answer.assert_called_once_with("token", "cq1")
+
+
+def test_handle_commands_replies_to_every_callback_in_burst(tb):
+    updates = {"ok": True, "result": [
+        {"update_id": 10 + i, "callback_query": {"id": f"cq{i}", "data": "status", "message": {"chat": {"id": 42}}}}
+        for i in range(5)
+    ]}
+    state = {"last_update_id": 9}
+    with patch.object(tb, "_get_json", return_value=updates), \
+            patch.object(tb, "_send_telegram", return_value=True) as send, \
+            patch.object(tb, "_answer_callback", return_value=True) as answer:
+        tb._handle_commands("token", state, {})
+    assert send.call_count == 5
+    assert sorted(c[0][1] for c in answer.call_args_list) == [f"cq{i}" for i in range(5)]
+    assert state["last_update_id"] == 14
+
+
+def test_handle_commands_reports_poll_failure(tb):
+    with patch.object(tb, "_get_json", side_effect=OSError("down")):
+        assert tb._handle_commands("token", {}, {}) is False
+
+
+def test_poll_loop_backs_off_on_api_error(tb):
+    conflict = {"ok": False, "error_code": 409, "description": "Conflict: terminated by other getUpdates request"}
+    stop = MagicMock()
+    stop.is_set.side_effect = [False, True]
+    with patch.object(tb, "_get_json", return_value=conflict) as get:
+        assert tb._handle_commands("token", {}, {}) is False
+        tb._poll_updates_forever("token", {}, {}, stop)
+    assert get.call_count == 2
+    stop.wait.assert_called_once_with(5)
+
+
 # --- Pipeline: get_latest_signal with minimal bar data ---
 def test_get_latest_signal_returns_tuple_of_four():
     """Backtest.get_latest_signal returns (signal, strength, price, features)."""
+    import numpy as np
     import pandas as pd
     from backtest import get_latest_signal
 
     # Minimal OHLCV + buy/sell volume (enough bars so analyzer runs)
     n = 150
+    i = np.arange(n, dtype=np.int64)
+    cyc = (i % 10) * 0.25
     df = pd.DataFrame({
-        "open": [20000.0 + (i % 10) * 0.25 for i in range(n)],
-        "high": [20000.5 + (i % 10) * 0.25 for i in range(n)],
-        "low": [19999.5 + (i % 10) * 0.25 for i in range(n)],
-        "close": [20000.25 + (i % 10) * 0.25 for i in range(n)],
-        "buy_volume": [50 + (i % 20) for i in range(n)],
-        "sell_volume": [50 + (19 - i % 20) for i in range(n)],
+        "open": 20000.0 + cyc,
+        "high": 20000.5 + cyc,
+        "low": 19999.5 + cyc,
+        "close": 20000.25 + cyc,
+        "buy_volume": 50 + i % 20,
+        "sell_volume": 50 + (19 - i % 20),
+        "bar_idx": i,
     })
-    df["bar_idx"] = range(len(df))
 
     sig, strength, price, features = get_latest_signal(
         df,
@@ -260,25 +214,11 @@ def test_get_latest_signal_returns_tuple_of_four():
     assert "tp2_price" in features
 
 
-def test_signal_message_contains_entry_sl_tp():
-    """Build the same message string the bot sends; must contain Entry, SL, TP1, TP2."""
-    entry = 21450.25
-    sl = 21445.50
-    tp1 = 21456.00
-    tp2 = 21462.25
-    direction = "LONG"
-    label = "MNQ"
-    strength = 0.72
-    rr1, rr2 = 0.5, 1.1
-
-    msg = (
-        f"<b>Signal {direction}</b> {label}\n\n"
-        f"Entry: {entry:.2f}\n"
-        f"SL: {sl:.2f}\n"
-        f"TP1: {tp1:.2f}\n"
-        f"TP2: {tp2:.2f}\n\n"
-        f"Strength: {strength:.2f}  ·  R:R {rr1:.2f} / {rr2:.2f}"
-    )
+def test_signal_message_contains_entry_sl_tp(tb):
+    """Render the message the bot sends; must contain Entry, SL, TP1, TP2."""
+    msg = tb._format_signal("LONG", "MNQ", 21450.25, 21445.50, 21456.00, 21462.25, 0.72, 0.5, 1.1)
+    # Values that display the same share one cached render
+    assert tb._format_signal("LONG", "MNQ", 21450.25, 21445.5, 21456.0, 21462.251, 0.7231, 0.5004, 1.0999) is msg
     assert "Entry:" in msg and "21450.25" in msg
     assert "SL:" in msg and "21445.50" in msg
     assert "TP1:" in msg and "21456" in msg
@@ -286,13 +226,48 @@ def test_signal_message_contains_entry_sl_tp():
     assert "LONG" in msg and "MNQ" in msg
 
 
-def test_load_config_returns_dict():
-    tb = _import_bot()
+def test_load_config_returns_dict(tb):
     cfg = tb._load_config()
     assert isinstance(cfg, dict)
+    assert tb._load_config() is cfg  # parsed once per process
 
 
-def test_load_mnq_params_returns_dict():
-    tb = _import_bot()
+def test_load_mnq_params_returns_dict(tb):
     params = tb._load_mnq_params()
     assert isinstance(params, dict)
+
+
+def test_format_params_renders_unhashable_values(tb):
+    params = {"min_delta": 400, "sessions": [1, 2], "risk": {"pct": 0.5}}
+    with patch.object(tb, "_load_mnq_params", return_value=params):
+        s = tb._format_params()
+    assert "sessions: [1, 2]" in s and "risk: {'pct': 0.5}" in s and "min_delta: 400" in s
+
+
+def test_load_mnq_params_rereads_after_file_changes(tb, tmp_path):
+    path = tmp_path / "best_params_mnq_1m.json"
+    path.write_text(json.dumps({"params": {"min_delta": 400}}))
+    with patch.object(tb, "MNQ_PARAMS_PATH", path):
+        assert tb._load_mnq_params() == {"min_delta": 400}
+        assert tb._load_mnq_params() == {"min_delta": 400}
+        path.write_text(json.dumps({"params": {"min_delta": 450}}))
+        st = path.stat()
+        os.utime(path, ns=(st.st_atime_ns, st.st_mtime_ns + 1_000_000))
+        assert tb._load_mnq_params() == {"min_delta": 450}
+
+
+def test_scale_volume_rescales_heavy_and_thin_feeds(tb):
+    import pandas as pd
+    heavy = pd.DataFrame({"buy_volume": [600, 1800, 0], "sell_volume": [600, 0, 0]})
+    tb._scale_volume(heavy, "yahoo")
+    # mean total = (1200 + 1800 + 1) / 3; zero rows floor at 1
+    scale = 120.0 / ((1200 + 1800 + 1) / 3)
+    assert heavy["buy_volume"].tolist() == pytest.approx([600 * scale, 1800 * scale, 1.0])
+    assert heavy["sell_volume"].tolist() == pytest.approx([600 * scale, 1.0, 1.0])
+
+    thin = pd.DataFrame({"buy_volume": [10, 30], "sell_volume": [10, 10]})
+    untouched = thin.copy()
+    tb._scale_volume(untouched, "yahoo")
+    assert untouched.equals(thin)
+    tb._scale_volume(thin, "binance")
+    assert thin["buy_volume"].tolist() == pytest.approx([40.0, 120.0])
@@ -0,0 +1,138 @@
+"""Unit tests for TradovateClient response parsing (no network)."""
+import sys
+import time
+from pathlib import Path
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from unittest.mock import patch
+
+from fabio_bot.tradovate_client import TradovateClient
+
+FILLS = [
+    {"id": 11, "contractSymbol": "mnqz5", "side": "Buy", "quantity": 2, "price": 21000.25,
+     "realizedPnl": 0, "timestamp": "2025-11-03T14:30:05.250Z", "orderId": 901},
+    {"id": 12, "contractSymbol": "MNQZ5", "side": "Sell", "quantity": -2, "price": 21004.5,
+     "realizedPnl": 17.0, "timestamp": "2025-11-03T14:41:00Z", "orderId": 902},
+    {"id": 13, "symbol": "NQZ5", "quantity": 1, "price": "21010", "time": 1762181000},
+    {"id": 14, "contractSymbol": "MNQZ5", "side": "S", "size": 3, "price": 21001, "timestamp": "bad-T-value"},
+]
+
+
+def _client():
+    return TradovateClient("https://example.invalid", "u", "p", "cid", "sec", symbol="MNQZ5")
+
+
+def test_deals_history_parses_and_sorts_newest_first():
+    c = _client()
+    with patch.object(c, "ensure_connected", return_value=True), \
+            patch.object(c, "_fetch", return_value=FILLS), \
+            patch("fabio_bot.tradovate_client.time.time", return_value=1762200000.0):
+        deals = c.get_deals_history()
+    assert [d.ticket for d in deals] == [14, 13, 12, 11]
+    by_id = {d.ticket: d for d in deals}
+    assert by_id[11].symbol == "MNQZ5" and by_id[11].type == 0 and by_id[11].time == 1762180205
+    assert by_id[12].type == 1 and by_id[12].volume == 2.0 and by_id[12].profit == 17.0
+    assert by_id[13].time == 1762181000 and by_id[13].price == 21010.0 and by_id[13].comment == ""
+    assert by_id[14].volume == 3.0 and by_id[14].time == 1762200000
+
+
+def test_deals_history_symbol_filter():
+    c = _client()
+    with patch.object(c, "ensure_connected", return_value=True), patch.object(c, "_fetch", return_value=FILLS):
+        deals = c.get_deals_history(symbol="nqz5")
+    assert [d.ticket for d in deals] == [13]
+
+
+def test_snapshot_checks_connection_once():
+    c = _client()
+    responses = {"account/list": [{"id": 7, "balance": 5000}], "position/list": [], "fill/list": FILLS}
+    with patch.object(c, "ensure_connected", return_value=True) as ensure, \
+            patch.object(c, "_fetch", side_effect=lambda path, params=None: responses[path]):
+        acc, positions, deals = c.get_snapshot(symbol="MNQZ5")
+    assert ensure.call_count == 1
+    assert acc.login == 7 and acc.balance == 5000.0
+    assert positions == []
+    assert [d.ticket for d in deals] == [14, 12, 11]
+
+
+def test_resolve_contract_id_prefers_exact_then_root():
+    c = _client()
+    contracts = [{"id": 1, "name": "MNQZ5"}, {"id": 2, "name": "NQZ5"}, {"id": 3, "name": "NQH6"}, {"id": 4, "name": "ESZ5"}]
+    with patch.object(c, "_get", return_value=contracts) as get:
+        assert c._resolve_contract_id("NQH6") == 3
+        assert c._resolve_contract_id("nq") == 2  # root match, not the MNQ substring hit
+        assert c._resolve_contract_id("ESZ") == 4  # substring fallback
+        assert c._resolve_contract_id("CL") is None
+    assert get.call_count == 1  # contract/list served from the TTL cache after the first call
+
+
+def test_resolve_contract_id_stream_match_fills_cache():
+    c = _client()
+    seen = []
+
+    def stream(path):
+        for row in [{"id": 1, "name": "MNQZ5"}, {"id": 2, "name": "NQZ5"}, {"id": 3, "name": "NQH6"}]:
+            seen.append(row["id"])
+            yield row
+
+    with patch("fabio_bot.tradovate_client.ijson", object()), patch.object(c, "_iter_stream", side_effect=stream), \
+            patch.object(c, "_get") as get:
+        assert c._resolve_contract_id("NQZ5") == 2
+        assert c._resolve_contract_id("NQH6") == 3  # served from the cache the stream filled
+    assert seen == [1, 2, 3]  # read to the end past the exact match, once
+    assert [row["id"] for row in c._contracts_cache[1]] == [1, 2, 3]
+    get.assert_not_called()
+
+
+def test_resolve_contract_id_does_not_cache_cut_off_stream():
+    c = _client()
+
+    def stream(path):
+        yield {"id": 1, "name": "MNQZ5"}
+        raise ValueError("truncated JSON")
+
+    full = [{"id": 1, "name": "MNQZ5"}, {"id": 2, "name": "NQZ5"}]
+    with patch("fabio_bot.tradovate_client.ijson", object()), patch.object(c, "_iter_stream", side_effect=stream), \
+            patch.object(c, "_get", return_value=full) as get:
+        assert c._resolve_contract_id("NQZ5") == 2
+    get.assert_called_once_with("contract/list")  # fell back to a complete read
+    assert c._contracts_cache[1] == full
+
+
+def test_reconnect_starts_new_token_refresher_while_old_one_winds_down():
+    c = _client()
+    c._token_expiry = time.time() + 10_000  # nothing to refresh: the loop just waits
+    c._start_token_refresh()
+    old_thread, old_stop = c._refresh_thread, c._stop_refresh
+    c.disconnect()
+    c._start_token_refresh()  # reconnect before the old thread has necessarily exited
+    try:
+        assert old_stop.is_set()
+        assert c._refresh_thread is not old_thread and c._refresh_thread.is_alive()
+        assert not c._stop_refresh.is_set()
+    finally:
+        c.disconnect()
+    old_thread.join(timeout=1)
+    c._refresh_thread.join(timeout=1)
+    assert not old_thread.is_alive() and not c._refresh_thread.is_alive()
+
+
+def test_get_contracts_returns_a_copy_of_the_cached_list():
+    c = _client()
+    with patch.object(c, "_get", return_value=[{"id": 2, "name": "NQZ5"}, {"id": 1, "name": "MNQZ5"}]):
+        first = c.get_contracts()
+        first.clear()
+        assert [r["id"] for r in c.get_contracts()] == [1, 2]
+
+
+def test_deals_history_reads_naive_timestamps_as_local_time():
+    from datetime import datetime
+    fills = [
+        {"id": 21, "contractSymbol": "MNQZ5", "side": "Buy", "quantity": 1, "price": 1, "timestamp": "2025-11-03T14:30:05"},
+        {"id": 22, "contractSymbol": "MNQZ5", "side": "Buy", "quantity": 1, "price": 1, "timestamp": "2025-11-03T14:30:05-05:00"},
+    ]
+    c = _client()
+    with patch.object(c, "ensure_connected", return_value=True), patch.object(c, "_fetch", return_value=fills):
+        by_id = {d.ticket: d.time for d in c.get_deals_history()}
+    assert by_id[21] == int(datetime.fromisoformat("2025-11-03T14:30:05").timestamp())
+    assert by_id[22] == 1762198205
@@ -0,0 +1,291 @@
+"""
+MNQ 1m tuning sweeps in one module: --mode 70wr (high WR + good PF + min DD with session/trend
+filters), push (fine grid, very fast targets) or quick (small sweep). --mode all loads the bars
+once and runs the three back to back on one worker pool. tune_mnq_{70wr,push,quick}.py are thin
+wrappers around main().
+"""
+import argparse
+import json
+import os
+import sys
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+from typing import Tuple
+
+ROOT = Path(__file__).resolve().parent
+sys.path.insert(0, str(ROOT))
+
+from _data_cache import load_mnq_bars
+from backtest import BACKTEST_COLUMNS, prepare_bars, run_backtest
+import numpy as np
+import pandas as pd
+
+DATA = ROOT / "data" / "mnq_1m.csv"
+OUT = ROOT / "data" / "best_params_mnq_1m.json"
+
+MIN_TRADES = 12
+# US RTH 9:30-16:00 ET: 570-960 min from midnight (1m bars, 1440/day)
+SESSION_1440, SESSION_START, SESSION_END = 1440, 570, 960
+
+# --- 70wr: base param sets combined with the filter options ---
+TRIALS_70WR = [
+    # Tier 1: 0.62-0.66 strength, 420-470 delta, fast rr, tight DD
+    {"min_strength": 0.63, "min_delta": 430, "min_delta_mult": 1.28, "rr1": 0.50, "rr2": 1.08, "risk": 0.006, "atr": 1.52, "max_dd": 0.016, "big": 29},
+    {"min_strength": 0.64, "min_delta": 445, "min_delta_mult": 1.30, "rr1": 0.49, "rr2": 1.06, "risk": 0.0055, "atr": 1.54, "max_dd": 0.015, "big": 30},
+    {"min_strength": 0.62, "min_delta": 420, "min_delta_mult": 1.26, "rr1": 0.51, "rr2": 1.10, "risk": 0.006, "atr": 1.50, "max_dd": 0.017, "big": 28},
+    {"min_strength": 0.65, "min_delta": 460, "min_delta_mult": 1.32, "rr1": 0.48, "rr2": 1.04, "risk": 0.005, "atr": 1.56, "max_dd": 0.014, "big": 31},
+    {"min_strength": 0.63, "min_delta": 438, "min_delta_mult": 1.28, "rr1": 0.50, "rr2": 1.08, "risk": 0.0055, "atr": 1.53, "max_dd": 0.015, "big": 29},
+    {"min_strength": 0.64, "min_delta": 450, "min_delta_mult": 1.30, "rr1": 0.49, "rr2": 1.06, "risk": 0.0055, "atr": 1.55, "max_dd": 0.014, "big": 30},
+    {"min_strength": 0.62, "min_delta": 425, "min_delta_mult": 1.26, "rr1": 0.51, "rr2": 1.10, "risk": 0.006, "atr": 1.51, "max_dd": 0.016, "big": 28},
+    {"min_strength": 0.66, "min_delta": 470, "min_delta_mult": 1.34, "rr1": 0.47, "rr2": 1.02, "risk": 0.005, "atr": 1.58, "max_dd": 0.013, "big": 31},
+    {"min_strength": 0.63, "min_delta": 442, "min_delta_mult": 1.29, "rr1": 0.49, "rr2": 1.07, "risk": 0.0055, "atr": 1.53, "max_dd": 0.015, "big": 29},
+    {"min_strength": 0.61, "min_delta": 412, "min_delta_mult": 1.24, "rr1": 0.52, "rr2": 1.12, "risk": 0.006, "atr": 1.49, "max_dd": 0.017, "big": 28},
+    # Tier 2: Slightly stricter for more WR, same fast targets
+    {"min_strength": 0.64, "min_delta": 448, "min_delta_mult": 1.30, "rr1": 0.48, "rr2": 1.04, "risk": 0.005, "atr": 1.55, "max_dd": 0.014, "big": 30},
+    {"min_strength": 0.65, "min_delta": 455, "min_delta_mult": 1.32, "rr1": 0.48, "rr2": 1.04, "risk": 0.005, "atr": 1.56, "max_dd": 0.013, "big": 30},
+    {"min_strength": 0.62, "min_delta": 418, "min_delta_mult": 1.25, "rr1": 0.51, "rr2": 1.10, "risk": 0.006, "atr": 1.50, "max_dd": 0.016, "big": 28},
+    {"min_strength": 0.60, "min_delta": 400, "min_delta_mult": 1.22, "rr1": 0.52, "rr2": 1.12, "risk": 0.0065, "atr": 1.46, "max_dd": 0.018, "big": 27},
+    {"min_strength": 0.63, "min_delta": 435, "min_delta_mult": 1.28, "rr1": 0.50, "rr2": 1.08, "risk": 0.0055, "atr": 1.52, "max_dd": 0.015, "big": 29},
+    # Tier 3: Fastest targets (lock profit very fast) with moderate strictness
+    {"min_strength": 0.61, "min_delta": 408, "min_delta_mult": 1.23, "rr1": 0.50, "rr2": 1.08, "risk": 0.006, "atr": 1.48, "max_dd": 0.016, "big": 28},
+    {"min_strength": 0.62, "min_delta": 422, "min_delta_mult": 1.26, "rr1": 0.50, "rr2": 1.08, "risk": 0.006, "atr": 1.51, "max_dd": 0.015, "big": 28},
+    {"min_strength": 0.64, "min_delta": 443, "min_delta_mult": 1.30, "rr1": 0.48, "rr2": 1.04, "risk": 0.0055, "atr": 1.54, "max_dd": 0.014, "big": 30},
+    {"min_strength": 0.59, "min_delta": 392, "min_delta_mult": 1.20, "rr1": 0.53, "rr2": 1.14, "risk": 0.007, "atr": 1.44, "max_dd": 0.018, "big": 26},
+    {"min_strength": 0.60, "min_delta": 402, "min_delta_mult": 1.22, "rr1": 0.52, "rr2": 1.12, "risk": 0.0065, "atr": 1.46, "max_dd": 0.017, "big": 27},
+    # big_trade_edge=3 (stricter order flow)
+    {"min_strength": 0.61, "min_delta": 415, "min_delta_mult": 1.24, "rr1": 0.51, "rr2": 1.10, "risk": 0.006, "atr": 1.49, "max_dd": 0.016, "big": 29, "bte": 3},
+    {"min_strength": 0.62, "min_delta": 428, "min_delta_mult": 1.26, "rr1": 0.50, "rr2": 1.08, "risk": 0.0055, "atr": 1.52, "max_dd": 0.015, "big": 30, "bte": 3},
+    {"min_strength": 0.60, "min_delta": 405, "min_delta_mult": 1.22, "rr1": 0.52, "rr2": 1.11, "risk": 0.0065, "atr": 1.47, "max_dd": 0.016, "big": 28, "bte": 3},
+    # Extra: very fast targets (lock profit ASAP) + slightly stricter to push WR 59-62%
+    {"min_strength": 0.61, "min_delta": 410, "min_delta_mult": 1.24, "rr1": 0.46, "rr2": 1.00, "risk": 0.0055, "atr": 1.48, "max_dd": 0.015, "big": 28},
+    {"min_strength": 0.62, "min_delta": 422, "min_delta_mult": 1.26, "rr1": 0.45, "rr2": 0.98, "risk": 0.005, "atr": 1.51, "max_dd": 0.014, "big": 29},
+    {"min_strength": 0.60, "min_delta": 398, "min_delta_mult": 1.21, "rr1": 0.48, "rr2": 1.04, "risk": 0.006, "atr": 1.46, "max_dd": 0.016, "big": 27},
+    {"min_strength": 0.63, "min_delta": 435, "min_delta_mult": 1.28, "rr1": 0.44, "rr2": 0.96, "risk": 0.005, "atr": 1.53, "max_dd": 0.014, "big": 29},
+    {"min_strength": 0.61, "min_delta": 415, "min_delta_mult": 1.24, "rr1": 0.47, "rr2": 1.02, "risk": 0.0055, "atr": 1.49, "max_dd": 0.015, "big": 28},
+    {"min_strength": 0.62, "min_delta": 428, "min_delta_mult": 1.27, "rr1": 0.45, "rr2": 0.98, "risk": 0.005, "atr": 1.52, "max_dd": 0.014, "big": 29},
+    {"min_strength": 0.60, "min_delta": 405, "min_delta_mult": 1.22, "rr1": 0.49, "rr2": 1.06, "risk": 0.006, "atr": 1.47, "max_dd": 0.016, "big": 27},
+    {"min_strength": 0.59, "min_delta": 388, "min_delta_mult": 1.19, "rr1": 0.50, "rr2": 1.08, "risk": 0.0065, "atr": 1.44, "max_dd": 0.017, "big": 26},
+]
+# Filter options: (session_on, trend_ma_bars). Add more trend lengths to push WR.
+FILTERS_70WR = [
+    (False, 0),
+    (True, 0),
+    (True, 5),
+    (True, 8),
+    (True, 6),
+    (True, 10),
+    (False, 5),
+    (False, 8),
+    (False, 6),
+]
+
+# --- push: fine grid around current best (0.60, 402, 0.52/1.12) to try to reach 58%+ ---
+# Axes are decoded row-major from evenly spaced flat indices, so the 60-run cap
+# (~3 min) samples every axis instead of only the first min_strength value.
+_PUSH_AXES = [
+    ("min_strength", [0.585, 0.59, 0.595, 0.60, 0.605, 0.61]),
+    ("min_delta", [392, 398, 402, 408, 415]),
+    ("rr1", [0.50, 0.51, 0.52, 0.53]),
+    ("rr2", [1.08, 1.10, 1.12, 1.14]),
+]
+_PUSH_SIZES = [len(values) for _, values in _PUSH_AXES]
+_PUSH_FIXED = {"min_delta_mult": 1.22, "risk": 0.0065, "atr": 1.46, "max_dd": 0.017, "big": 27}
+TRIALS_PUSH = [
+    {**{name: values[j] for (name, values), j in zip(_PUSH_AXES, combo)}, **_PUSH_FIXED}
+    for combo in zip(*np.unravel_index(np.linspace(0, int(np.prod(_PUSH_SIZES)) - 1, 60).astype(int), _PUSH_SIZES))
+]
+FILTERS_PUSH = [(False, 0)]
+
+# --- quick: combine best — fast targets (57.8% WR) + moderate filters for PF/DD ---
+TRIALS_QUICK = [
+    {"min_strength": 0.60, "min_delta": 400, "min_delta_mult": 1.22, "rr1": 0.52, "rr2": 1.12, "risk": 0.007, "atr": 1.46, "max_dd": 0.018, "big": 27},
+    {"min_strength": 0.60, "min_delta": 398, "min_delta_mult": 1.21, "rr1": 0.52, "rr2": 1.11, "risk": 0.0065, "atr": 1.47, "max_dd": 0.017, "big": 27},
+    {"min_strength": 0.59, "min_delta": 392, "min_delta_mult": 1.20, "rr1": 0.53, "rr2": 1.13, "risk": 0.007, "atr": 1.44, "max_dd": 0.018, "big": 26},
+    {"min_strength": 0.61, "min_delta": 408, "min_delta_mult": 1.23, "rr1": 0.51, "rr2": 1.10, "risk": 0.0065, "atr": 1.48, "max_dd": 0.016, "big": 28},
+    {"min_strength": 0.60, "min_delta": 402, "min_delta_mult": 1.22, "rr1": 0.52, "rr2": 1.12, "risk": 0.0065, "atr": 1.46, "max_dd": 0.017, "big": 27},
+]
+FILTERS_QUICK = [(False, 0)]
+
+
+# Scores take float64 metric arrays; invalid configs get -inf. Bonuses are added one mask at a
+# time in a fixed order, so scores match a scalar if-chain exactly.
+def _score_70wr(wr, pf, dd, pnl, trades):
+    """Heavy weight on WR, then PF, then low DD; only profitable configs with enough trades."""
+    score = wr * 1.4 + np.minimum(pf, 3) * 12 + (2.0 - dd) * 6
+    for mask, bonus in ((wr >= 58, 10), (wr >= 59, 14), (wr >= 60, 18), (wr >= 62, 22), (dd <= 1.5, 10), (pf >= 1.08, 5)):
+        score[mask] += bonus
+    score[(trades < MIN_TRADES) | (pnl < 0)] = -np.inf
+    return score
+
+
+def _score_push(wr, pf, dd, pnl, trades):
+    score = wr * 1.8 + np.minimum(pf, 3) * 12 + (2 - dd) * 5
+    for mask, bonus in ((wr >= 58, 15), (wr >= 58.5, 20), (wr >= 59, 25), (pf >= 1.05, 5)):
+        score[mask] += bonus
+    score[(trades < MIN_TRADES) | (pnl < 0)] = -np.inf
+    return score
+
+
+def _score_quick(wr, pf, dd, pnl, trades):
+    """Heavy weight on WR and PF; bonus for low DD; losing configs penalized, not dropped."""
+    score = wr * 0.8 + np.minimum(pf, 4) * 18 + np.maximum(0, 2.5 - dd) * 12
+    score[pnl < 0] -= 50
+    score[trades < 15] = -np.inf
+    return score
+
+
+# mode -> (trials, filters, scorer, title, message and exit code when nothing qualifies)
+MODES = {
+    "70wr": (TRIALS_70WR, FILTERS_70WR, _score_70wr, "high WR + good PF + min DD",
+             "No profitable config with enough trades. Keeping previous best.", 0),
+    "push": (TRIALS_PUSH, FILTERS_PUSH, _score_push, "push", "No better config found.", 0),
+    "quick": (TRIALS_QUICK, FILTERS_QUICK, _score_quick, "quick sweep", "No valid run with enough trades.", 1),
+}
+
+# Trial dict key -> run_backtest kwarg. Trials are flattened once into tuples in this order,
+# so workers get a fixed positional layout instead of re-reading (and defaulting) dict keys.
+_TRIAL_FIELDS = (
+    ("min_strength", "min_signal_strength"),
+    ("min_delta", "min_delta"),
+    ("min_delta_mult", "min_delta_multiplier"),
+    ("rr1", "rr_first"),
+    ("rr2", "rr_second"),
+    ("risk", "risk_pct"),
+    ("atr", "atr_stop_multiplier"),
+    ("max_dd", "max_daily_drawdown_pct"),
+    ("big", "big_trade_threshold"),
+    ("bte", "big_trade_edge"),
+)
+_TRIAL_KW = tuple(kw for _, kw in _TRIAL_FIELDS)
+_BASE_KW = {"initial_balance": 50_000.0, "tick_value": 1.0}
+
+
+def _trial_row(p: dict) -> tuple:
+    return tuple(p.get(k, 2) if k == "bte" else p[k] for k, _ in _TRIAL_FIELDS)
+
+
+def _filter_kw(session_on: bool, trend_ma: int) -> dict:
+    kw = {}
+    if session_on:
+        kw["session_bars_per_day"] = SESSION_1440
+        kw["session_start_bar"] = SESSION_START
+        kw["session_end_bar"] = SESSION_END
+    if trend_ma > 0:
+        kw["trend_ma_bars"] = trend_ma
+    return kw
+
+
+# Worker-side bars, set once per process by the pool initializer (see optimize.py).
+_WORKER_DF: pd.DataFrame = None
+_WORKER_PREPARED: dict = None
+
+
+def _init_worker(df: pd.DataFrame) -> None:
+    global _WORKER_DF, _WORKER_PREPARED
+    _WORKER_DF = df
+    _WORKER_PREPARED = prepare_bars(df)
+
+
+def _eval(args):
+    """Backtest one (filter kwargs, trial row) combo; returns its metrics."""
+    filter_kw, row = args
+    return run_backtest(
+        _WORKER_DF, prepared=_WORKER_PREPARED, **_BASE_KW, **filter_kw, **dict(zip(_TRIAL_KW, row))
+    ).to_metrics()
+
+
+def _save_best(metrics: dict, p: dict, session_on: bool, trend_ma: int) -> None:
+    params = {
+        "min_signal_strength": p["min_strength"],
+        "min_delta": p["min_delta"],
+        "rr_first": p["rr1"],
+        "rr_second": p["rr2"],
+        "min_delta_multiplier": p["min_delta_mult"],
+        "big_trade_edge": p.get("bte", 2),
+        "big_trade_threshold": p["big"],
+        "risk_pct": p["risk"],
+        "atr_stop_multiplier": p["atr"],
+        "max_daily_drawdown_pct": p["max_dd"],
+    }
+    if session_on:
+        params["session_bars_per_day"] = SESSION_1440
+        params["session_start_bar"] = SESSION_START
+        params["session_end_bar"] = SESSION_END
+    if trend_ma > 0:
+        params["trend_ma_bars"] = trend_ma
+    # Write-then-rename: the bot's mtime-keyed params cache never sees a half-written file
+    tmp = OUT.with_suffix(".json.tmp")
+    with open(tmp, "w") as f:
+        json.dump({"metrics": metrics, "params": params, "tick_value": 1.0}, f, indent=2)
+    os.replace(tmp, OUT)
+    print(f"Saved to {OUT}")
+
+
+def _run_mode(ex: ProcessPoolExecutor, mode: str, done: dict) -> Tuple[int, bool]:
+    """Run one sweep; returns (exit code, whether it wrote OUT). done maps
+    (session_on, trend_ma, row) -> metrics for combos already backtested."""
+    trials, filters, scorer, title, none_msg, none_rc = MODES[mode]
+    args_list = [(s, t, p) for s, t in filters for p in trials]
+    rows = [_trial_row(p) for p in trials]
+    keys = [(s, t, row) for s, t in filters for row in rows]
+    # Only backtest combos not seen yet (repeats within or across modes); results are read back
+    # in grid order, so argmax ties still resolve as in a sequential loop.
+    todo = {k: (_filter_kw(k[0], k[1]), k[2]) for k in keys if k not in done}
+    done.update(zip(todo, ex.map(_eval, todo.values(), chunksize=4)))
+    results = [done[k] for k in keys]
+    score = scorer(*(
+        np.array([m[k] for m in results], dtype=np.float64)
+        for k in ("win_rate", "profit_factor", "max_drawdown_pct", "total_pnl", "total_trades")
+    ))
+    best = int(np.argmax(score))
+    if not np.isfinite(score[best]):
+        print(none_msg)
+        return none_rc, False
+
+    session_on, trend_ma, best_p = args_list[best]
+    m = results[best]
+    print(f"\n--- Best MNQ 1m ({title}) ---")
+    print(f"  Win Rate:       {m['win_rate']:.1f}%")
+    print(f"  Profit Factor:  {m['profit_factor']:.2f}")
+    print(f"  Max Drawdown:   {m['max_drawdown_pct']:.1f}%")
+    print(f"  Total Trades:   {m['total_trades']}")
+    print(f"  Total P/L:     ${m['total_pnl']:,.2f}")
+    print(f"  Filters: session(RTH)={session_on}, trend_ma={trend_ma}")
+    print("  Best params:", best_p)
+    _save_best(m, best_p, session_on, trend_ma)
+    return 0, True
+
+
+def main(mode: str) -> int:
+    modes = list(MODES) if mode == "all" else [mode]
+    df = load_mnq_bars(DATA)
+    n_runs = sum(len(MODES[m][0]) * len(MODES[m][1]) for m in modes)
+    workers = min(n_runs, os.cpu_count() or 1)
+    # One pool for every selected mode: workers get the bars once via the initializer (inherited
+    # under fork, one pickle per worker under spawn), trimmed to the columns the backtest reads.
+    bars = df.filter(items=BACKTEST_COLUMNS)
+    rc = 0
+    done = {}
+    saved_by = None
+    with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker, initargs=(bars,)) as ex:
+        for m in modes:
+            mode_rc, saved = _run_mode(ex, m, done)
+            rc = mode_rc or rc
+            if saved:
+                saved_by = m
+    if len(modes) > 1:
+        # Every mode overwrites the same file with its own scorer's pick: say whose is left
+        if saved_by:
+            print(f"\n{OUT.name} holds the '{saved_by}' sweep's result (written last).")
+        else:
+            print(f"\nNo sweep found a qualifying config; {OUT.name} left unchanged.")
+    return rc
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="MNQ 1m parameter sweeps (writes data/best_params_mnq_1m.json)")
+    parser.add_argument(
+        "--mode", choices=[*MODES, "all"], required=True,
+        help="Sweep to run; all runs 70wr, push, quick in turn (each overwrites the params file; the last pick wins).",
+    )
+    sys.exit(main(parser.parse_args().mode))